@@ -0,0 +1,87 @@
+"""
+Employee directory search benchmark
+Compares the old unanchored case-insensitive $regex scan with the indexed
+search_terms prefix query at growing directory sizes.
+
+Usage (from backend/):  MONGO_URL=mongodb://localhost:27017 python benchmarks/bench_employee_search.py
+Uses a throwaway database that is dropped afterwards.
+"""
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from services.employee_search import search_query, search_terms, rank, SEARCH_CANDIDATES
+
+SIZES = [1_000, 10_000, 50_000, 200_000]
+QUERIES = ["budi", "dewi lest", "prod", "santoso", "qc super", "rudi.h", "zzzz"]
+ROUNDS = 20
+
+FIRST = ["Budi", "Siti", "Ahmad", "Dewi", "Rudi", "Maya", "Eko", "Linda", "Agus", "Rina", "Hendra", "Putri", "Joko", "Sri", "Wahyu"]
+LAST = ["Santoso", "Rahayu", "Wijaya", "Lestari", "Hartono", "Sari", "Prasetyo", "Kusuma", "Gunawan", "Susanto", "Halim", "Nugroho"]
+DEPARTMENTS = ["Production", "Human Resources", "Finance", "IT", "Quality Control", "Safety", "Marketing", "Logistics"]
+POSITIONS = ["Manager", "Supervisor", "Officer", "Engineer", "Analyst", "Operator", "Director", "Staff"]
+
+
+def make_employee(i):
+    first, last = random.choice(FIRST), random.choice(LAST)
+    doc = {
+        "id": str(uuid.uuid4()),
+        "name": f"{first} {last} {i}",
+        "email": f"{first.lower()}.{last.lower()}{i}@gys.co.id",
+        "department": random.choice(DEPARTMENTS),
+        "position": f"{random.choice(DEPARTMENTS)} {random.choice(POSITIONS)}",
+    }
+    doc["search_terms"] = search_terms(doc)
+    return doc
+
+
+def legacy_query(search):
+    return {"$or": [{field: {"$regex": search, "$options": "i"}} for field in ("name", "email", "position", "department")]}
+
+
+async def time_query(collection, make_query, search, sort_by_name):
+    samples = []
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        if sort_by_name:
+            await collection.find(make_query(search), {"_id": 0}).sort("name", 1).to_list(100)
+        else:
+            docs = await collection.find(make_query(search), {"_id": 0, "search_terms": 0}).sort([("name", 1), ("id", 1)]).limit(SEARCH_CANDIDATES).to_list(SEARCH_CANDIDATES)
+            rank(docs, search)[:100]
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return statistics.median(samples), samples[int(len(samples) * 0.95) - 1]
+
+
+async def main():
+    client = AsyncIOMotorClient(os.environ.get("MONGO_URL", "mongodb://localhost:27017"))
+    db = client[f"bench_employees_{uuid.uuid4().hex[:8]}"]
+    collection = db.employees
+    await collection.create_index("search_terms")
+    await collection.create_index([("name", 1), ("id", 1)])
+    inserted = 0
+    try:
+        print(f"{'employees':>10} {'query':>10} {'legacy p50':>11} {'legacy p95':>11} {'indexed p50':>12} {'indexed p95':>12}")
+        for size in SIZES:
+            while inserted < size:
+                batch = [make_employee(i) for i in range(inserted, min(size, inserted + 5000))]
+                await collection.insert_many(batch)
+                inserted += len(batch)
+            for search in QUERIES:
+                legacy = await time_query(collection, legacy_query, search, True)
+                indexed = await time_query(collection, search_query, search, False)
+                print(f"{size:>10} {search:>10} {legacy[0]:>9.2f}ms {legacy[1]:>9.2f}ms {indexed[0]:>10.2f}ms {indexed[1]:>10.2f}ms")
+    finally:
+        await client.drop_database(db.name)
+        client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,133 @@
+"""
+Response serialization benchmark
+Times the CPU spent turning list-endpoint documents into a JSON body, per route and list size:
+  fastapi    the previous handlers: models built by hand, validated again against response_model,
+             jsonable_encoder, stdlib json (raw-dict routes skip the hand-built models)
+  once       model_response with FAST_JSON off: one validation, stdlib json, identical bytes
+  fast       FAST_JSON on: one validation, native pydantic-core encoding
+  trusted    FAST_JSON on for routes that mark their documents trusted: no validation, orjson
+
+Every path is checked to decode to the same JSON as the fastapi path before it is timed.
+
+Usage (from backend/):  python benchmarks/bench_serialization.py [rounds]
+No database is needed; documents are synthetic and shaped like the stored ones.
+"""
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "bench_serialization")
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+import services.serialization as serialization
+from models.album import AlbumResponse, PhotoResponse
+from models.menu import MenuItemResponse
+from models.page import PageResponse
+from routes.albums import router as albums_router
+from routes.menus import router as menus_router
+from routes.pages import router as pages_router
+
+SIZES = (20, 100, 1000)
+DEFAULT_ROUNDS = 50
+BASE = datetime(2026, 1, 1, 8, 0, 0, 123000)
+
+
+def page(i):
+    blocks = [{"id": str(uuid.uuid4()), "type": "text", "order": n,
+               "content": {"heading": f"Section {n}", "body": "Lorem ipsum dolor sit amet. " * 20}} for n in range(4)]
+    return {"id": str(uuid.uuid4()), "title": f"Page {i}", "slug": f"page-{i}", "description": "Company page " * 5,
+            "template": "standard", "blocks": blocks, "is_published": True, "meta_title": f"Page {i}",
+            "meta_description": None, "created_at": BASE + timedelta(minutes=i), "updated_at": BASE + timedelta(hours=i)}
+
+
+def album(i):
+    photos = [{"id": str(uuid.uuid4()), "title": f"Photo {n}", "image_url": f"/api/media/{uuid.uuid4().hex}.jpg",
+               "created_at": (BASE + timedelta(minutes=n)).isoformat()} for n in range(4)]
+    return {"id": str(uuid.uuid4()), "title": f"Album {i}", "description": "Plant visit and safety day",
+            "cover_image_url": f"/api/media/{uuid.uuid4().hex}.jpg", "photo_count": 40 + i, "latest_photos": photos,
+            "created_at": (BASE + timedelta(days=i)).isoformat()}
+
+
+def menu(i):
+    return {"id": str(uuid.uuid4()), "label": f"Menu {i}", "path": f"/menu-{i}", "page_id": None, "icon": "home",
+            "parent_id": None, "order": i, "is_visible": True, "open_in_new_tab": False}
+
+
+def photo(i):
+    return {"id": str(uuid.uuid4()), "title": f"Photo {i}", "description": "Annual meeting", "album_id": "album-1",
+            "image_url": f"/api/media/{uuid.uuid4().hex}.jpg", "thumbnail_url": f"/api/media/{uuid.uuid4().hex}.jpg",
+            "created_at": (BASE + timedelta(minutes=i)).isoformat()}
+
+
+def response_field(router, path):
+    route = next(r for r in router.routes if r.path == path and "GET" in r.methods)
+    return route.secure_cloned_response_field
+
+
+# route -> (document factory, response model, previous handler built models by hand, response field)
+ROUTES = {
+    "GET /api/pages": (page, PageResponse, True, response_field(pages_router, "/pages")),
+    "GET /api/albums": (album, AlbumResponse, True, response_field(albums_router, "/albums")),
+    "GET /api/menus/flat": (menu, MenuItemResponse, True, response_field(menus_router, "/menus/flat")),
+    "GET /api/albums/{id}/photos": (photo, PhotoResponse, False, response_field(albums_router, "/albums/{album_id}/photos")),
+}
+
+
+def fastapi_path(loop, field, model, build_models):
+    def render(docs):
+        content = [model(**doc) for doc in docs] if build_models else docs
+        return JSONResponse(loop.run_until_complete(serialize_response(field=field, response_content=content))).body
+    return render
+
+
+def fast_path(model, fast, trusted):
+    def render(docs):
+        serialization.FAST_JSON = fast
+        return serialization.encode_models(docs, model, trusted=trusted)
+    return render
+
+
+def timed(render, docs, rounds):
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        render(docs)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def main():
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_ROUNDS
+    loop = asyncio.new_event_loop()
+    print(f"orjson: {'yes' if serialization.orjson is not None else 'no (trusted uses the stdlib encoder)'}")
+    print(f"{'route':>28} {'items':>6} {'fastapi':>9} {'once':>9} {'fast':>9} {'trusted':>9} {'saved':>7}")
+    for name, (factory, model, build_models, field) in ROUTES.items():
+        paths = {
+            "fastapi": fastapi_path(loop, field, model, build_models),
+            "once": fast_path(model, False, False),
+            "fast": fast_path(model, True, False),
+            "trusted": fast_path(model, True, True),
+        }
+        for size in SIZES:
+            docs = [factory(i) for i in range(size)]
+            expected = json.loads(paths["fastapi"](docs))
+            for label, render in paths.items():
+                assert json.loads(render(docs)) == expected, f"{name}: {label} output differs from FastAPI's"
+            assert paths["once"](docs) == paths["fastapi"](docs), f"{name}: FAST_JSON off must keep FastAPI's bytes"
+            ms = {label: timed(render, docs, rounds) for label, render in paths.items()}
+            saved = 1 - ms["trusted"] / ms["fastapi"]
+            print(f"{name:>28} {size:>6} " + " ".join(f"{ms[label]:>7.2f}ms" for label in paths) + f" {saved:>6.0%}")
+    serialization.FAST_JSON = False
+    loop.close()
+
+
+if __name__ == "__main__":
+    main()
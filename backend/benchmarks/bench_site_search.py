@@ -0,0 +1,92 @@
+"""
+Site search benchmark
+Builds the in-memory /api/search index from a synthetic corpus sized like the
+intranet (news, published pages, events, employees) and reports query latency.
+
+Target: p99 under 25 ms per query at the default volume on a single worker.
+
+Usage (from backend/):  python benchmarks/bench_site_search.py [scale]
+No database is needed; scale multiplies every collection size (default 1).
+"""
+import os
+import random
+import statistics
+import string
+import sys
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "bench_site_search")
+
+from services.site_search import SiteSearchIndex
+
+VOLUME = {"news": 5_000, "pages": 500, "events": 2_000, "employees": 10_000}
+QUERIES = ["safety", "production record", "steel plant", "annual meeting", "budi", "finance manager",
+           "pro", "carbon neutral 2030", "training workshop", "zzzz", "the", "quality control team"]
+ROUNDS = 200
+TARGET_P99_MS = 25
+
+COMMON = ["safety", "production", "steel", "plant", "record", "annual", "meeting", "team", "quality", "control",
+          "training", "workshop", "employee", "carbon", "neutral", "2030", "finance", "manager", "the", "and", "of"]
+FIRST = ["Budi", "Siti", "Ahmad", "Dewi", "Rudi", "Maya", "Eko", "Linda", "Agus", "Rina", "Hendra", "Putri"]
+LAST = ["Santoso", "Rahayu", "Wijaya", "Lestari", "Hartono", "Sari", "Prasetyo", "Kusuma", "Gunawan"]
+DEPARTMENTS = ["Production", "Human Resources", "Finance", "IT", "Quality Control", "Safety", "Marketing"]
+
+
+def make_vocabulary(size=20_000):
+    words = COMMON + ["".join(random.choices(string.ascii_lowercase, k=random.randint(3, 10))) for _ in range(size)]
+    weights = [1 / (rank + 1) for rank in range(len(words))]
+    return words, weights
+
+
+def text(vocabulary, words):
+    return " ".join(random.choices(vocabulary[0], weights=vocabulary[1], k=words)).capitalize() + "."
+
+
+def build(scale):
+    vocabulary = make_vocabulary()
+    index = SiteSearchIndex()
+    for _ in range(VOLUME["news"] * scale):
+        index.upsert("news", {"id": str(uuid.uuid4()), "title": text(vocabulary, 8), "summary": text(vocabulary, 25),
+                              "content": f"<p>{text(vocabulary, 300)}</p>", "category": "general", "created_at": "2026-01-01"})
+    for i in range(VOLUME["pages"] * scale):
+        blocks = [{"type": "text", "content": {"heading": text(vocabulary, 4), "body": text(vocabulary, 120)}, "order": n} for n in range(4)]
+        index.upsert("pages", {"id": str(uuid.uuid4()), "title": text(vocabulary, 4), "slug": f"page-{i}", "description": text(vocabulary, 20),
+                               "blocks": blocks, "is_published": True})
+    for _ in range(VOLUME["events"] * scale):
+        index.upsert("events", {"id": str(uuid.uuid4()), "title": text(vocabulary, 5), "description": text(vocabulary, 30),
+                                "event_date": "2026-02-15", "event_type": "event", "location": text(vocabulary, 2)})
+    for i in range(VOLUME["employees"] * scale):
+        first, last = random.choice(FIRST), random.choice(LAST)
+        index.upsert("employees", {"id": str(uuid.uuid4()), "name": f"{first} {last}", "email": f"{first.lower()}.{last.lower()}{i}@gys.co.id",
+                                   "department": random.choice(DEPARTMENTS), "position": f"{random.choice(DEPARTMENTS)} Manager"})
+    index.reweight()
+    return index
+
+
+def main():
+    scale = int(sys.argv[1]) if len(sys.argv) > 1 else 1
+    random.seed(42)
+    started = time.perf_counter()
+    index = build(scale)
+    print(f"indexed {len(index.docs)} documents, {len(index.postings)} terms in {time.perf_counter() - started:.1f}s")
+    samples = []
+    print(f"{'query':>22} {'p50':>9} {'p99':>9}")
+    for query in QUERIES:
+        timings = []
+        for _ in range(ROUNDS):
+            start = time.perf_counter()
+            index.search(query)
+            timings.append((time.perf_counter() - start) * 1000)
+        timings.sort()
+        samples.extend(timings)
+        print(f"{query:>22} {statistics.median(timings):>7.2f}ms {timings[int(len(timings) * 0.99) - 1]:>7.2f}ms")
+    samples.sort()
+    p99 = samples[int(len(samples) * 0.99) - 1]
+    print(f"{'overall':>22} {statistics.median(samples):>7.2f}ms {p99:>7.2f}ms  (target p99 < {TARGET_P99_MS}ms: {'ok' if p99 < TARGET_P99_MS else 'MISSED'})")
+
+
+if __name__ == "__main__":
+    main()
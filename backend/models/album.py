@@ -1,5 +1,5 @@
 from pydantic import BaseModel, ConfigDict
-from typing import Optional
+from typing import List, Optional
 
 
 class AlbumCreate(BaseModel):
@@ -14,6 +14,14 @@ class AlbumUpdate(BaseModel):
     cover_image_url: Optional[str] = None
 
 
+class PhotoPreview(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+    id: str
+    title: str
+    image_url: str
+    created_at: str
+
+
 class AlbumResponse(BaseModel):
     model_config = ConfigDict(extra="ignore")
     id: str
@@ -21,6 +29,7 @@ class AlbumResponse(BaseModel):
     description: Optional[str] = None
     cover_image_url: Optional[str] = None
     photo_count: int = 0
+    latest_photos: List[PhotoPreview] = []
     created_at: str
 
 
@@ -20,6 +20,16 @@ class EmployeeUpdate(BaseModel):
     avatar_url: Optional[str] = None
 
 
+class EmployeeSuggestion(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+    id: str
+    name: str
+    email: str
+    position: Optional[str] = None
+    department: Optional[str] = None
+    avatar_url: Optional[str] = None
+
+
 class EmployeeResponse(BaseModel):
     model_config = ConfigDict(extra="ignore")
     id: str
@@ -0,0 +1,15 @@
+from pydantic import BaseModel
+from typing import Any, Dict, List, Optional
+
+
+class FacetValue(BaseModel):
+    value: Any = None
+    count: int
+    label: Optional[str] = None
+
+
+class FacetResponse(BaseModel):
+    collection: str
+    total: int
+    filters: Dict[str, Any] = {}
+    facets: Dict[str, List[FacetValue]]
@@ -0,0 +1,36 @@
+from pydantic import BaseModel, ConfigDict
+from typing import List, Optional
+from models.settings import HeroSettingsResponse, TickerSettingsResponse
+from models.event import EventResponse
+from models.employee import EmployeeResponse
+from models.menu import MenuItemResponse
+
+
+class NewsSummary(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+    id: str
+    title: str
+    summary: str
+    image_url: Optional[str] = None
+    category: str
+    is_featured: bool
+    created_at: str
+
+
+class PhotoPreview(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+    id: str
+    title: str
+    description: Optional[str] = None
+    image_url: str
+
+
+class HomeResponse(BaseModel):
+    hero: HeroSettingsResponse
+    ticker: TickerSettingsResponse
+    featured_news: List[NewsSummary]
+    latest_news: List[NewsSummary]
+    events: List[EventResponse]
+    recent_photos: List[PhotoPreview]
+    directory: List[EmployeeResponse]
+    menus: List[MenuItemResponse]
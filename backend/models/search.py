@@ -0,0 +1,24 @@
+from pydantic import BaseModel
+from typing import List, Optional
+
+
+class SearchHit(BaseModel):
+    id: str
+    title: str
+    title_highlighted: str
+    snippet: str
+    score: float
+    meta: dict = {}
+
+
+class SearchGroup(BaseModel):
+    type: str
+    total: int
+    results: List[SearchHit]
+
+
+class SearchResponse(BaseModel):
+    query: str
+    total: int
+    took_ms: Optional[float] = None
+    groups: List[SearchGroup]
@@ -1,23 +1,41 @@
-from fastapi import APIRouter, Depends, HTTPException
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Response
+from typing import List, Optional
 from models.album import AlbumCreate, AlbumUpdate, AlbumResponse, PhotoResponse
 from auth import get_current_user
 from database import db
+from services.albums import reconcile_photo_counts, latest_photos_lookup
+from services.changes import emit
+from services.pagination import apply_cursor, clamp_limit, finish_page
+from services.serialization import model_response
 import uuid
 from datetime import datetime, timezone
 
 router = APIRouter(prefix="/albums", tags=["Albums"])
 
+MAX_PREVIEW_PHOTOS = 12
+ALBUMS_SORT = [("created_at", -1), ("id", -1)]
+
 
 @router.get("", response_model=List[AlbumResponse])
-async def get_albums(limit: int = 50):
-    albums = await db.albums.find({}, {"_id": 0}).sort("created_at", -1).to_list(limit)
-    result = []
-    for album in albums:
-        photo_count = await db.photos.count_documents({"album_id": album["id"]})
-        album["photo_count"] = photo_count
-        result.append(AlbumResponse(**album))
-    return result
+async def get_albums(response: Response, limit: int = 50, with_photos: int = 0, cursor: Optional[str] = None):
+    limit = clamp_limit(limit)
+    pipeline = [
+        {"$match": apply_cursor({}, ALBUMS_SORT, cursor)},
+        {"$sort": dict(ALBUMS_SORT)},
+        {"$limit": limit + 1},
+    ]
+    if with_photos > 0:
+        pipeline.append(latest_photos_lookup(min(with_photos, MAX_PREVIEW_PHOTOS)))
+    pipeline.append({"$project": {"_id": 0}})
+    albums = await db.albums.aggregate(pipeline).to_list(limit + 1)
+    return model_response(finish_page(albums, ALBUMS_SORT, limit, response), AlbumResponse, response, trusted=True)
+
+
+@router.post("/reconcile")
+async def reconcile_album_counts(current_user: dict = Depends(get_current_user)):
+    if current_user.get("role") != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+    return await reconcile_photo_counts()
 
 
 @router.get("/{album_id}", response_model=AlbumResponse)
@@ -25,15 +43,13 @@ async def get_album_by_id(album_id: str):
     album = await db.albums.find_one({"id": album_id}, {"_id": 0})
     if not album:
         raise HTTPException(status_code=404, detail="Album not found")
-    photo_count = await db.photos.count_documents({"album_id": album_id})
-    album["photo_count"] = photo_count
     return AlbumResponse(**album)
 
 
 @router.get("/{album_id}/photos", response_model=List[PhotoResponse])
 async def get_album_photos(album_id: str):
     photos = await db.photos.find({"album_id": album_id}, {"_id": 0}).sort("created_at", -1).to_list(100)
-    return photos
+    return model_response(photos, PhotoResponse, trusted=True)
 
 
 @router.post("", response_model=AlbumResponse)
@@ -42,10 +58,12 @@ async def create_album(album: AlbumCreate, current_user: dict = Depends(get_curr
     album_doc = {
         "id": album_id,
         **album.model_dump(),
+        "photo_count": 0,
         "created_at": datetime.now(timezone.utc).isoformat()
     }
     await db.albums.insert_one(album_doc)
-    return AlbumResponse(**album_doc, photo_count=0)
+    await emit("albums", "insert", doc=album_doc)
+    return AlbumResponse(**album_doc)
 
 
 @router.put("/{album_id}", response_model=AlbumResponse)
@@ -55,8 +73,7 @@ async def update_album(album_id: str, album: AlbumUpdate, current_user: dict = D
     if result.matched_count == 0:
         raise HTTPException(status_code=404, detail="Album not found")
     updated = await db.albums.find_one({"id": album_id}, {"_id": 0})
-    photo_count = await db.photos.count_documents({"album_id": album_id})
-    updated["photo_count"] = photo_count
+    await emit("albums", "update", doc=updated)
     return AlbumResponse(**updated)
 
 
@@ -66,4 +83,6 @@ async def delete_album(album_id: str, current_user: dict = Depends(get_current_u
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Album not found")
     await db.photos.update_many({"album_id": album_id}, {"$set": {"album_id": None}})
+    await emit("albums", "delete", album_id)
+    await emit("photos", "update")
     return {"message": "Album deleted successfully"}
@@ -0,0 +1,22 @@
+from fastapi import APIRouter, Depends, HTTPException
+from auth import get_current_user
+from services.response_cache import response_cache
+from services.invalidation import invalidation_listener
+from services.snapshot import content_snapshot
+
+router = APIRouter(prefix="/cache", tags=["Cache"])
+
+
+@router.get("/stats")
+async def get_cache_stats(current_user: dict = Depends(get_current_user)):
+    if current_user.get("role") != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+    return {**response_cache.snapshot(), "invalidation": invalidation_listener.snapshot(), "snapshot": content_snapshot.snapshot()}
+
+
+@router.post("/clear")
+async def clear_cache(current_user: dict = Depends(get_current_user)):
+    if current_user.get("role") != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+    response_cache.clear()
+    return {"message": "Response cache cleared"}
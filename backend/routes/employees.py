@@ -1,32 +1,68 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response, UploadFile, File
 from typing import List, Optional
-from models.employee import EmployeeCreate, EmployeeUpdate, EmployeeResponse
+from models.employee import EmployeeCreate, EmployeeUpdate, EmployeeResponse, EmployeeSuggestion
 from auth import get_current_user
 from database import db
+from services.pagination import fetch_page
+from services.projection import parse_fields, build_projection, partial_response
+from services.employee_search import search_query, search_terms, rank, search_candidates
+from services.employee_index import employee_index
+from services.changes import emit
+from services.employee_import import import_employees, email_key, ImportFormatError
 import uuid
 
 router = APIRouter(prefix="/employees", tags=["Employees"])
 
+EMPLOYEES_SORT = [("name", 1), ("id", 1)]
+EMPLOYEE_PROJECTION = {"_id": 0, "search_terms": 0, "email_key": 0}
 
-@router.get("", response_model=List[EmployeeResponse])
-async def get_employees(search: Optional[str] = None, department: Optional[str] = None, limit: int = 100):
-    query = {}
-    if search:
-        query["$or"] = [
-            {"name": {"$regex": search, "$options": "i"}},
-            {"email": {"$regex": search, "$options": "i"}},
-            {"position": {"$regex": search, "$options": "i"}},
-            {"department": {"$regex": search, "$options": "i"}}
-        ]
+
+def employee_query(search: Optional[str] = None, department: Optional[str] = None) -> dict:
+    query = search_query(search) if search else {}
     if department:
         query["department"] = department
-    employees = await db.employees.find(query, {"_id": 0}).sort("name", 1).to_list(limit)
-    return employees
+    return query
+
+
+@router.get("", response_model=List[EmployeeResponse])
+async def get_employees(response: Response, search: Optional[str] = None, department: Optional[str] = None, limit: int = 100, cursor: Optional[str] = None,
+                        fields: Optional[str] = None, fuzzy: bool = True):
+    query = employee_query(search, department)
+    field_list = parse_fields(fields, None, EmployeeResponse)
+    if search:
+        if cursor:
+            raise HTTPException(status_code=400, detail="Search results are ranked by relevance and cannot be paged with a cursor")
+        # Relevance-ordered: score a bounded candidate set instead of paging by name
+        projection = build_projection(field_list + ["name", "email"], EMPLOYEES_SORT) if field_list else EMPLOYEE_PROJECTION
+        candidates = await search_candidates(search, department, projection, EMPLOYEES_SORT)
+        docs = rank(candidates, search)[:max(1, limit)]
+        if fuzzy and len(docs) < limit:
+            await employee_index.ensure_loaded()
+            fuzzy_ids = employee_index.fuzzy_ids(search, limit - len(docs), [doc["id"] for doc in docs])
+            if fuzzy_ids:
+                fuzzy_query = {"id": {"$in": fuzzy_ids}}
+                if department:
+                    fuzzy_query["department"] = department
+                matches = {doc["id"]: doc for doc in await db.employees.find(fuzzy_query, projection).to_list(len(fuzzy_ids))}
+                docs.extend(matches[employee_id] for employee_id in fuzzy_ids if employee_id in matches)
+        return partial_response(docs, response) if field_list else docs
+    if field_list:
+        docs = await fetch_page(db.employees, query, EMPLOYEES_SORT, limit, cursor, response, build_projection(field_list, EMPLOYEES_SORT))
+        return partial_response(docs, response)
+    return await fetch_page(db.employees, query, EMPLOYEES_SORT, limit, cursor, response, EMPLOYEE_PROJECTION)
+
+
+@router.get("/suggest", response_model=List[EmployeeSuggestion])
+async def suggest_employees(q: str = "", limit: int = 8, fuzzy: bool = True):
+    await employee_index.ensure_loaded()
+    if fuzzy:
+        return employee_index.suggest_with_fuzzy(q, limit)
+    return employee_index.suggest(q, limit)
 
 
 @router.get("/{employee_id}", response_model=EmployeeResponse)
 async def get_employee_by_id(employee_id: str):
-    employee = await db.employees.find_one({"id": employee_id}, {"_id": 0})
+    employee = await db.employees.find_one({"id": employee_id}, EMPLOYEE_PROJECTION)
     if not employee:
         raise HTTPException(status_code=404, detail="Employee not found")
     return employee
@@ -36,17 +72,34 @@ async def get_employee_by_id(employee_id: str):
 async def create_employee(employee: EmployeeCreate, current_user: dict = Depends(get_current_user)):
     employee_id = str(uuid.uuid4())
     employee_doc = {"id": employee_id, **employee.model_dump()}
+    employee_doc["email_key"] = email_key(employee_doc["email"])
+    employee_doc["search_terms"] = search_terms(employee_doc)
     await db.employees.insert_one(employee_doc)
+    await emit("employees", "insert", doc=employee_doc)
     return EmployeeResponse(**employee_doc)
 
 
+@router.post("/import")
+async def import_employee_file(file: UploadFile = File(...), dry_run: bool = False, current_user: dict = Depends(get_current_user)):
+    try:
+        return await import_employees(file, dry_run)
+    except ImportFormatError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
 @router.put("/{employee_id}", response_model=EmployeeResponse)
 async def update_employee(employee_id: str, employee: EmployeeUpdate, current_user: dict = Depends(get_current_user)):
     update_data = {k: v for k, v in employee.model_dump().items() if v is not None}
+    if "email" in update_data:
+        update_data["email_key"] = email_key(update_data["email"])
     result = await db.employees.update_one({"id": employee_id}, {"$set": update_data})
     if result.matched_count == 0:
         raise HTTPException(status_code=404, detail="Employee not found")
     updated = await db.employees.find_one({"id": employee_id}, {"_id": 0})
+    terms = search_terms(updated)
+    if terms != updated.get("search_terms"):
+        await db.employees.update_one({"id": employee_id}, {"$set": {"search_terms": terms}})
+    await emit("employees", "update", doc=updated)
     return EmployeeResponse(**updated)
 
 
@@ -55,4 +108,5 @@ async def delete_employee(employee_id: str, current_user: dict = Depends(get_cur
     result = await db.employees.delete_one({"id": employee_id})
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Employee not found")
+    await emit("employees", "delete", employee_id)
     return {"message": "Employee deleted successfully"}
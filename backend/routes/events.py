@@ -1,21 +1,30 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from typing import List, Optional
 from models.event import EventCreate, EventUpdate, EventResponse
 from auth import get_current_user
 from database import db
+from services.pagination import fetch_page
+from services.projection import parse_fields, build_projection, partial_response
+from services.changes import emit
 import uuid
 from datetime import datetime, timezone
 
 router = APIRouter(prefix="/events", tags=["Events"])
 
+EVENTS_SORT = [("event_date", 1), ("id", 1)]
+
 
 @router.get("", response_model=List[EventResponse])
-async def get_events(event_type: Optional[str] = None, limit: int = 50):
+async def get_events(response: Response, event_type: Optional[str] = None, limit: int = 50, cursor: Optional[str] = None,
+                     fields: Optional[str] = None):
     query = {}
     if event_type:
         query["event_type"] = event_type
-    events = await db.events.find(query, {"_id": 0}).sort("event_date", 1).to_list(limit)
-    return events
+    field_list = parse_fields(fields, None, EventResponse)
+    if field_list:
+        docs = await fetch_page(db.events, query, EVENTS_SORT, limit, cursor, response, build_projection(field_list, EVENTS_SORT))
+        return partial_response(docs, response)
+    return await fetch_page(db.events, query, EVENTS_SORT, limit, cursor, response)
 
 
 @router.get("/{event_id}", response_model=EventResponse)
@@ -35,6 +44,7 @@ async def create_event(event: EventCreate, current_user: dict = Depends(get_curr
         "created_at": datetime.now(timezone.utc).isoformat()
     }
     await db.events.insert_one(event_doc)
+    await emit("events", "insert", doc=event_doc)
     return EventResponse(**event_doc)
 
 
@@ -45,6 +55,7 @@ async def update_event(event_id: str, event: EventUpdate, current_user: dict = D
     if result.matched_count == 0:
         raise HTTPException(status_code=404, detail="Event not found")
     updated = await db.events.find_one({"id": event_id}, {"_id": 0})
+    await emit("events", "update", doc=updated)
     return EventResponse(**updated)
 
 
@@ -53,4 +64,5 @@ async def delete_event(event_id: str, current_user: dict = Depends(get_current_u
     result = await db.events.delete_one({"id": event_id})
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Event not found")
+    await emit("events", "delete", event_id)
     return {"message": "Event deleted successfully"}
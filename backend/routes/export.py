@@ -0,0 +1,121 @@
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
+from typing import AsyncIterator, List, Optional
+from models.employee import EmployeeResponse
+from models.news import NewsResponse
+from models.event import EventResponse
+from models.album import PhotoResponse
+from auth import get_current_user
+from database import db
+from routes.employees import employee_query, EMPLOYEES_SORT
+from routes.news import NEWS_SORT
+from routes.events import EVENTS_SORT
+from routes.photos import PHOTOS_SORT
+from datetime import datetime, timezone
+import csv
+import io
+import json
+
+router = APIRouter(prefix="/export", tags=["Export"])
+
+EXPORT_BATCH_SIZE = 500
+FLUSH_BYTES = 64 * 1024
+
+EXPORTS = {
+    "employees": (EmployeeResponse, EMPLOYEES_SORT),
+    "news": (NewsResponse, NEWS_SORT),
+    "events": (EventResponse, EVENTS_SORT),
+    "photos": (PhotoResponse, PHOTOS_SORT),
+}
+FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+
+def export_query(collection: str, featured, category, event_type, album_id, search, department) -> dict:
+    if collection == "employees":
+        return employee_query(search, department)
+    query = {}
+    if collection == "news" and featured is not None:
+        query["is_featured"] = featured
+    if collection in ("news", "photos") and category:
+        query["category"] = category
+    if collection == "events" and event_type:
+        query["event_type"] = event_type
+    if collection == "photos" and album_id:
+        query["album_id"] = album_id
+    return query
+
+
+async def iter_documents(collection: str, query: dict, sort) -> AsyncIterator[dict]:
+    # batch_size bounds what the driver holds in memory regardless of collection size
+    cursor = db[collection].find(query, {"_id": 0, "search_terms": 0, "email_key": 0}).sort(sort).batch_size(EXPORT_BATCH_SIZE)
+    async for doc in cursor:
+        yield doc
+
+
+async def ndjson_stream(docs: AsyncIterator[dict]) -> AsyncIterator[bytes]:
+    chunk = []
+    size = 0
+    async for doc in docs:
+        line = json.dumps(doc, default=str, ensure_ascii=False) + "\n"
+        chunk.append(line)
+        size += len(line)
+        if size >= FLUSH_BYTES:
+            yield "".join(chunk).encode()
+            chunk, size = [], 0
+    if chunk:
+        yield "".join(chunk).encode()
+
+
+def csv_cell(value):
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, default=str, ensure_ascii=False)
+    return "" if value is None else value
+
+
+async def csv_stream(docs: AsyncIterator[dict], columns: List[str]) -> AsyncIterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    async for doc in docs:
+        writer.writerow([csv_cell(doc.get(column)) for column in columns])
+        if buffer.tell() >= FLUSH_BYTES:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+@router.get("/{collection}")
+async def export_collection(
+    collection: str,
+    format: str = "ndjson",
+    featured: Optional[bool] = None,
+    category: Optional[str] = None,
+    event_type: Optional[str] = None,
+    album_id: Optional[str] = None,
+    search: Optional[str] = None,
+    department: Optional[str] = None,
+    current_user: dict = Depends(get_current_user),
+):
+    if collection not in EXPORTS:
+        raise HTTPException(status_code=404, detail="Unknown export collection")
+    if format not in FORMATS:
+        raise HTTPException(status_code=400, detail="Format must be ndjson or csv")
+    model, sort = EXPORTS[collection]
+    query = export_query(collection, featured, category, event_type, album_id, search, department)
+    docs = iter_documents(collection, query, sort)
+    if format == "csv":
+        columns = [field for field in model.model_fields if field != "album_title"]
+        body = csv_stream(docs, columns)
+    else:
+        body = ndjson_stream(docs)
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%d")
+    return StreamingResponse(
+        body,
+        media_type=FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="{collection}-{stamp}.{format}"'},
+    )
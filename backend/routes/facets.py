@@ -0,0 +1,19 @@
+from fastapi import APIRouter, HTTPException
+from typing import Optional
+from models.facet import FacetResponse
+from services.facets import FACETS, facet_filters, get_facets
+
+router = APIRouter(prefix="/facets", tags=["Facets"])
+
+
+@router.get("/{collection}", response_model=FacetResponse)
+async def get_collection_facets(collection: str, featured: Optional[bool] = None, category: Optional[str] = None,
+                                event_type: Optional[str] = None, department: Optional[str] = None, album_id: Optional[str] = None):
+    if collection not in FACETS:
+        raise HTTPException(status_code=404, detail="No facets for this collection")
+    params = {"featured": featured, "category": category, "event_type": event_type, "department": department, "album_id": album_id}
+    try:
+        filters = facet_filters(collection, params)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return await get_facets(collection, filters)
@@ -0,0 +1,60 @@
+from fastapi import APIRouter, Response
+from models.home import HomeResponse, NewsSummary, PhotoPreview
+from database import db
+from services.menus import get_menu_tree
+from services.snapshot import content_snapshot
+from routes.settings import HERO_DEFAULTS, TICKER_DEFAULTS
+from routes.news import NEWS_SORT
+from routes.events import EVENTS_SORT
+from routes.photos import PHOTOS_SORT
+from routes.employees import EMPLOYEES_SORT, EMPLOYEE_PROJECTION
+import asyncio
+
+router = APIRouter(prefix="/home", tags=["Home"])
+
+# Sized to what each homepage section requested on its own
+HOME_FEATURED_NEWS = 5
+HOME_LATEST_NEWS = 20
+HOME_EVENTS = 50
+HOME_PHOTOS = 8
+HOME_DIRECTORY = 100
+
+
+def projection_for(model) -> dict:
+    return {"_id": 0, **{field: 1 for field in model.model_fields}}
+
+
+async def get_settings(kind: str, defaults: dict) -> dict:
+    return await db.settings.find_one({"type": kind}, {"_id": 0}) or defaults
+
+
+async def get_visible_menus() -> list:
+    items, _ = await get_menu_tree(visible_only=True)
+    return items
+
+
+@router.get("", response_model=HomeResponse)
+async def get_home():
+    body = content_snapshot.get("home")
+    if body is not None:
+        return Response(content=body, media_type="application/json")
+    return await build_home()
+
+
+@content_snapshot.section("home", ["settings", "news", "events", "photos", "employees", "menus"])
+async def build_home() -> HomeResponse:
+    # One round trip for the whole homepage; sections are independent so they are fetched concurrently
+    hero, ticker, featured_news, latest_news, events, photos, directory, menus = await asyncio.gather(
+        get_settings("hero", HERO_DEFAULTS),
+        get_settings("ticker", TICKER_DEFAULTS),
+        db.news.find({"is_featured": True}, projection_for(NewsSummary)).sort(NEWS_SORT).limit(HOME_FEATURED_NEWS).to_list(HOME_FEATURED_NEWS),
+        db.news.find({}, projection_for(NewsSummary)).sort(NEWS_SORT).limit(HOME_LATEST_NEWS).to_list(HOME_LATEST_NEWS),
+        db.events.find({}, {"_id": 0}).sort(EVENTS_SORT).limit(HOME_EVENTS).to_list(HOME_EVENTS),
+        db.photos.find({}, projection_for(PhotoPreview)).sort(PHOTOS_SORT).limit(HOME_PHOTOS).to_list(HOME_PHOTOS),
+        db.employees.find({}, EMPLOYEE_PROJECTION).sort(EMPLOYEES_SORT).limit(HOME_DIRECTORY).to_list(HOME_DIRECTORY),
+        get_visible_menus(),
+    )
+    return HomeResponse(
+        hero=hero, ticker=ticker, featured_news=featured_news, latest_news=latest_news,
+        events=events, recent_photos=photos, directory=directory, menus=menus,
+    )
@@ -0,0 +1,24 @@
+from fastapi import APIRouter, Depends, HTTPException
+from typing import Optional
+from auth import get_current_user
+from services.index_maintenance import rebuild_indexes, check_consistency, REBUILD_TARGETS
+
+router = APIRouter(prefix="/indexes", tags=["Indexes"])
+
+
+@router.get("/check")
+async def check_indexes(deep: bool = False, current_user: dict = Depends(get_current_user)):
+    if current_user.get("role") != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+    return await check_consistency(deep)
+
+
+@router.post("/rebuild")
+async def rebuild(targets: Optional[str] = None, current_user: dict = Depends(get_current_user)):
+    if current_user.get("role") != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+    selected = [t.strip() for t in targets.split(",") if t.strip()] if targets else list(REBUILD_TARGETS)
+    unknown = set(selected) - set(REBUILD_TARGETS)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown index(es): {', '.join(sorted(unknown))}")
+    return await rebuild_indexes(selected)
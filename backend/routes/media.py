@@ -0,0 +1,142 @@
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request, Response
+from fastapi.responses import FileResponse, StreamingResponse
+from typing import Optional
+from PIL import Image, UnidentifiedImageError
+from auth import get_current_user
+from database import db
+from services.media import INLINE_TYPES, media_store, get_media, parse_range, is_media_id, media_url, serving_headers
+from services.dedup import perceptual_index, DEFAULT_DISTANCE
+from services.data_url_migration import (
+    MigrationRunning, size_report, load_state, claim_migration, describe_state, is_active, run_migration,
+)
+from services.images import VariantError, normalize_variant, get_variant, variant_key, content_type_for
+
+router = APIRouter(prefix="/media", tags=["Media"])
+
+IMMUTABLE_CACHE = "public, max-age=31536000, immutable"
+MAX_DISTANCE = 16
+
+
+async def describe_media(media_ids):
+    docs = await db.media.find({"id": {"$in": list(media_ids)}}, {"_id": 0}).to_list(len(media_ids))
+    return {doc["id"]: {**doc, "url": media_url(doc["id"])} for doc in docs}
+
+
+@router.get("/duplicates")
+async def get_near_duplicates(distance: int = DEFAULT_DISTANCE, current_user: dict = Depends(get_current_user)):
+    if current_user.get("role") != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+    distance = max(0, min(distance, MAX_DISTANCE))
+    groups = await perceptual_index.duplicate_groups(distance)
+    described = await describe_media({media_id for group in groups for media_id in group})
+    return {
+        "distance": distance,
+        "groups": [[described[media_id] for media_id in group if media_id in described] for group in groups],
+    }
+
+
+@router.get("/migrate-inline")
+async def get_inline_migration_status(current_user: dict = Depends(get_current_user)):
+    if current_user.get("role") != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+    state = await load_state()
+    return {"state": describe_state(state), "active": is_active(state), "remaining": await size_report()}
+
+
+@router.post("/migrate-inline")
+async def start_inline_migration(background_tasks: BackgroundTasks, dry_run: bool = True, restart: bool = False,
+                                 current_user: dict = Depends(get_current_user)):
+    if current_user.get("role") != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+    if dry_run:
+        return {"dry_run": True, "report": await size_report()}
+    try:
+        # Claimed here so a second POST gets the 409 rather than a second background run
+        state = await claim_migration(restart)
+    except MigrationRunning as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    background_tasks.add_task(run_migration, state=state)
+    return {"dry_run": False, "message": "Migration started"}
+
+
+@router.get("/{media_id}/similar")
+async def get_similar_media(media_id: str, distance: int = DEFAULT_DISTANCE, current_user: dict = Depends(get_current_user)):
+    if current_user.get("role") != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+    distance = max(0, min(distance, MAX_DISTANCE))
+    matches = await perceptual_index.similar(media_id, distance)
+    described = await describe_media({key for _, key in matches})
+    return [{**described[key], "distance": d} for d, key in matches if key in described]
+
+
+@router.get("/{media_id}")
+async def serve_media(
+    media_id: str,
+    request: Request,
+    w: Optional[int] = None,
+    h: Optional[int] = None,
+    fit: Optional[str] = None,
+    fmt: Optional[str] = None,
+):
+    if not is_media_id(media_id):
+        raise HTTPException(status_code=404, detail="Media not found")
+    media = await get_media(media_id)
+    if not media:
+        raise HTTPException(status_code=404, detail="Media not found")
+    if any(param is not None for param in (w, h, fit, fmt)):
+        return await serve_variant(media, request, w, h, fit, fmt)
+
+    size = media["size"]
+    headers = {
+        "ETag": f'"{media_id}"',
+        "Cache-Control": IMMUTABLE_CACHE,
+        "Accept-Ranges": "bytes",
+        **serving_headers(media["content_type"]),
+    }
+    if request.headers.get("if-none-match") in (headers["ETag"], "*"):
+        return Response(status_code=304, headers=headers)
+
+    try:
+        byte_range = parse_range(request.headers.get("range"), size)
+    except ValueError:
+        return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{size}"})
+
+    if byte_range is None:
+        path = media_store.path_for(media_id)
+        if path:
+            # FileResponse hands the path to the server (pathsend/sendfile) when supported
+            return FileResponse(path, media_type=media["content_type"], headers=headers)
+        start, end, status_code = 0, size - 1, 200
+    else:
+        start, end = byte_range
+        status_code = 206
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+
+    headers["Content-Length"] = str(end - start + 1)
+    return StreamingResponse(
+        media_store.iter_range(media_id, start, end),
+        status_code=status_code,
+        media_type=media["content_type"],
+        headers=headers,
+    )
+
+
+async def serve_variant(media: dict, request: Request, w, h, fit, fmt):
+    if media["content_type"] not in INLINE_TYPES:
+        raise HTTPException(status_code=400, detail="Resizing is only supported for images")
+    try:
+        width, height, fit, fmt = normalize_variant(w, h, fit, fmt)
+    except VariantError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    headers = {
+        "ETag": f'"{variant_key(media["id"], width, height, fit, fmt)}"',
+        "Cache-Control": IMMUTABLE_CACHE,
+        **serving_headers(content_type_for(fmt)),
+    }
+    if request.headers.get("if-none-match") in (headers["ETag"], "*"):
+        return Response(status_code=304, headers=headers)
+    try:
+        path = await get_variant(media["id"], width, height, fit, fmt)
+    except (UnidentifiedImageError, OSError, Image.DecompressionBombError):
+        raise HTTPException(status_code=415, detail="Unable to process image")
+    return FileResponse(path, media_type=content_type_for(fmt), headers=headers)
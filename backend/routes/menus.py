@@ -1,8 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from typing import List
 from models.menu import MenuItemCreate, MenuItemUpdate, MenuItemResponse, ReorderRequest
 from auth import get_current_user
 from database import db
+from services.changes import emit
+from services.menus import get_menu_tree, menu_snapshot_name
+from services.snapshot import content_snapshot
+from services.serialization import model_response
 import uuid
 
 router = APIRouter(prefix="/menus", tags=["Menus"])
@@ -10,32 +14,17 @@ router = APIRouter(prefix="/menus", tags=["Menus"])
 
 @router.get("", response_model=List[MenuItemResponse])
 async def get_menus(visible_only: bool = False):
-    query = {"is_visible": True} if visible_only else {}
-    items = await db.menus.find(query, {"_id": 0}).sort("order", 1).to_list(200)
-
-    # Build 3-level tree: root -> children -> grandchildren
-    items_map = {item["id"]: {**item, "children": []} for item in items}
-    root_items = []
-
-    for item in items:
-        pid = item.get("parent_id")
-        if not pid:
-            root_items.append(items_map[item["id"]])
-        elif pid in items_map:
-            items_map[pid]["children"].append(items_map[item["id"]])
-
-    # Sort children at every level
-    for item_id, item in items_map.items():
-        item["children"].sort(key=lambda x: x.get("order", 0))
-    root_items.sort(key=lambda x: x.get("order", 0))
-
-    return [MenuItemResponse(**item) for item in root_items]
+    # Served from the shared snapshot, else this worker's materialized tree; both rebuild only after a menu write
+    body = content_snapshot.get(menu_snapshot_name(visible_only))
+    if body is None:
+        _, body = await get_menu_tree(visible_only)
+    return Response(content=body, media_type="application/json")
 
 
 @router.get("/flat", response_model=List[MenuItemResponse])
 async def get_menus_flat():
     items = await db.menus.find({}, {"_id": 0}).sort("order", 1).to_list(100)
-    return [MenuItemResponse(**item) for item in items]
+    return model_response(items, MenuItemResponse, trusted=True)
 
 
 @router.post("", response_model=MenuItemResponse)
@@ -45,6 +34,7 @@ async def create_menu_item(item: MenuItemCreate, current_user: dict = Depends(ge
         **item.model_dump()
     }
     await db.menus.insert_one(menu_data)
+    await emit("menus", "insert", doc=menu_data)
     menu_data["children"] = []
     return MenuItemResponse(**menu_data)
 
@@ -56,6 +46,7 @@ async def reorder_menus(request: ReorderRequest, current_user: dict = Depends(ge
             {"id": item["id"]},
             {"$set": {"order": item["order"], "parent_id": item.get("parent_id")}}
         )
+    await emit("menus", "update")
     return {"message": "Menu reordered successfully"}
 
 
@@ -67,6 +58,7 @@ async def update_menu_item(menu_id: str, item: MenuItemUpdate, current_user: dic
     update_data = {k: v for k, v in item.model_dump().items() if v is not None}
     await db.menus.update_one({"id": menu_id}, {"$set": update_data})
     updated = await db.menus.find_one({"id": menu_id}, {"_id": 0})
+    await emit("menus", "update", doc=updated, previous=existing)
     updated["children"] = []
     return MenuItemResponse(**updated)
 
@@ -77,4 +69,5 @@ async def delete_menu_item(menu_id: str, current_user: dict = Depends(get_curren
     result = await db.menus.delete_one({"id": menu_id})
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Menu item not found")
+    await emit("menus", "delete", menu_id)
     return {"message": "Menu item deleted successfully"}
@@ -1,21 +1,35 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from typing import List, Optional
 from models.news import NewsCreate, NewsUpdate, NewsResponse
 from auth import get_current_user
 from database import db
+from services.pagination import fetch_page
+from services.projection import parse_fields, build_projection, partial_response
+from services.changes import emit
 import uuid
 from datetime import datetime, timezone
 
 router = APIRouter(prefix="/news", tags=["News"])
 
+NEWS_SORT = [("created_at", -1), ("id", -1)]
+NEWS_VIEWS = {
+    "summary": ["title", "summary", "image_url", "category", "is_featured", "created_at"],
+}
+
 
 @router.get("", response_model=List[NewsResponse])
-async def get_news(featured: Optional[bool] = None, limit: int = 20):
+async def get_news(response: Response, featured: Optional[bool] = None, category: Optional[str] = None, limit: int = 20,
+                   cursor: Optional[str] = None, fields: Optional[str] = None, view: Optional[str] = None):
     query = {}
     if featured is not None:
         query["is_featured"] = featured
-    news_list = await db.news.find(query, {"_id": 0}).sort("created_at", -1).limit(limit).to_list(limit)
-    return news_list
+    if category:
+        query["category"] = category
+    field_list = parse_fields(fields, view, NewsResponse, NEWS_VIEWS)
+    if field_list:
+        docs = await fetch_page(db.news, query, NEWS_SORT, limit, cursor, response, build_projection(field_list, NEWS_SORT))
+        return partial_response(docs, response)
+    return await fetch_page(db.news, query, NEWS_SORT, limit, cursor, response)
 
 
 @router.get("/{news_id}", response_model=NewsResponse)
@@ -37,6 +51,7 @@ async def create_news(news: NewsCreate, current_user: dict = Depends(get_current
         "updated_at": now
     }
     await db.news.insert_one(news_doc)
+    await emit("news", "insert", doc=news_doc)
     return NewsResponse(**news_doc)
 
 
@@ -48,6 +63,7 @@ async def update_news(news_id: str, news: NewsUpdate, current_user: dict = Depen
     if result.matched_count == 0:
         raise HTTPException(status_code=404, detail="News not found")
     updated = await db.news.find_one({"id": news_id}, {"_id": 0})
+    await emit("news", "update", doc=updated)
     return NewsResponse(**updated)
 
 
@@ -56,4 +72,5 @@ async def delete_news(news_id: str, current_user: dict = Depends(get_current_use
     result = await db.news.delete_one({"id": news_id})
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="News not found")
+    await emit("news", "delete", news_id)
     return {"message": "News deleted successfully"}
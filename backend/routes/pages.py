@@ -1,19 +1,33 @@
-from fastapi import APIRouter, Depends, HTTPException
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Response
+from typing import List, Optional
 from models.page import PageCreate, PageUpdate, PageResponse
 from auth import get_current_user
 from database import db
+from services.pagination import fetch_page
+from services.projection import parse_fields, build_projection, partial_response
+from services.serialization import model_response
+from services.changes import emit
 import uuid
 from datetime import datetime, timezone
 
 router = APIRouter(prefix="/pages", tags=["Pages"])
 
+PAGES_SORT = [("title", 1), ("id", 1)]
+PAGES_VIEWS = {
+    "summary": ["title", "slug", "description", "template", "is_published", "created_at", "updated_at"],
+}
+
 
 @router.get("", response_model=List[PageResponse])
-async def get_pages(published_only: bool = False):
+async def get_pages(response: Response, published_only: bool = False, limit: int = 100, cursor: Optional[str] = None,
+                    fields: Optional[str] = None, view: Optional[str] = None):
     query = {"is_published": True} if published_only else {}
-    pages = await db.pages.find(query, {"_id": 0}).sort("title", 1).to_list(100)
-    return [PageResponse(**page) for page in pages]
+    field_list = parse_fields(fields, view, PageResponse, PAGES_VIEWS)
+    if field_list:
+        docs = await fetch_page(db.pages, query, PAGES_SORT, limit, cursor, response, build_projection(field_list, PAGES_SORT))
+        return partial_response(docs, response)
+    pages = await fetch_page(db.pages, query, PAGES_SORT, limit, cursor, response)
+    return model_response(pages, PageResponse, response, trusted=True)
 
 
 @router.get("/{page_id}", response_model=PageResponse)
@@ -21,7 +35,7 @@ async def get_page(page_id: str):
     page = await db.pages.find_one({"id": page_id}, {"_id": 0})
     if not page:
         raise HTTPException(status_code=404, detail="Page not found")
-    return PageResponse(**page)
+    return model_response(page, PageResponse, many=False, trusted=True)
 
 
 @router.get("/slug/{slug}", response_model=PageResponse)
@@ -29,7 +43,7 @@ async def get_page_by_slug(slug: str):
     page = await db.pages.find_one({"slug": slug, "is_published": True}, {"_id": 0})
     if not page:
         raise HTTPException(status_code=404, detail="Page not found")
-    return PageResponse(**page)
+    return model_response(page, PageResponse, many=False, trusted=True)
 
 
 @router.post("", response_model=PageResponse)
@@ -45,6 +59,7 @@ async def create_page(page: PageCreate, current_user: dict = Depends(get_current
         "updated_at": now
     }
     await db.pages.insert_one(page_data)
+    await emit("pages", "insert", doc=page_data)
     return PageResponse(**page_data)
 
 
@@ -57,6 +72,7 @@ async def update_page(page_id: str, page: PageUpdate, current_user: dict = Depen
     update_data["updated_at"] = datetime.now(timezone.utc)
     await db.pages.update_one({"id": page_id}, {"$set": update_data})
     updated = await db.pages.find_one({"id": page_id}, {"_id": 0})
+    await emit("pages", "update", doc=updated, previous=existing)
     return PageResponse(**updated)
 
 
@@ -65,4 +81,5 @@ async def delete_page(page_id: str, current_user: dict = Depends(get_current_use
     result = await db.pages.delete_one({"id": page_id})
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Page not found")
+    await emit("pages", "delete", page_id)
     return {"message": "Page deleted successfully"}
@@ -1,28 +1,49 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, Response, UploadFile, File, Form
 from typing import List, Optional
 from models.album import PhotoCreate, PhotoUpdate, PhotoResponse
 from auth import get_current_user
 from database import db
+from services.media import INLINE_TYPES, store_upload
+from services.images import pregenerate_variants, GALLERY_VARIANTS
+from services.dedup import register_perceptual_hash
+from services.pagination import fetch_page
+from services.projection import parse_fields, build_projection, partial_response
+from services.albums import resolve_album_titles, get_album_title
+from services.changes import emit, emit_many
+from pymongo import ReturnDocument
+import asyncio
+import os
 import uuid
-import base64
 from datetime import datetime, timezone
 
 router = APIRouter(prefix="/photos", tags=["Photos"])
 
+PHOTOS_SORT = [("created_at", -1), ("id", -1)]
+BULK_UPLOAD_CONCURRENCY = int(os.environ.get('BULK_UPLOAD_CONCURRENCY', '4'))
+
 
 @router.get("", response_model=List[PhotoResponse])
-async def get_photos(album_id: Optional[str] = None, limit: int = 50):
+async def get_photos(response: Response, album_id: Optional[str] = None, category: Optional[str] = None, limit: int = 50,
+                     cursor: Optional[str] = None, fields: Optional[str] = None):
     query = {}
     if album_id:
         query["album_id"] = album_id
-    photos = await db.photos.find(query, {"_id": 0}).sort("created_at", -1).to_list(limit)
-    result = []
-    for photo in photos:
-        if photo.get("album_id"):
-            album = await db.albums.find_one({"id": photo["album_id"]}, {"_id": 0})
-            photo["album_title"] = album.get("title") if album else None
-        result.append(PhotoResponse(**photo))
-    return result
+    if category:
+        query["category"] = category
+    field_list = parse_fields(fields, None, PhotoResponse)
+    if field_list:
+        wants_title = "album_title" in field_list
+        if wants_title:
+            field_list.append("album_id")
+        photos = await fetch_page(db.photos, query, PHOTOS_SORT, limit, cursor, response, build_projection(field_list, PHOTOS_SORT))
+        if wants_title:
+            titles = await resolve_album_titles(photo.get("album_id") for photo in photos)
+            for photo in photos:
+                photo["album_title"] = titles.get(photo.get("album_id"))
+        return partial_response(photos, response)
+    photos = await fetch_page(db.photos, query, PHOTOS_SORT, limit, cursor, response)
+    titles = await resolve_album_titles(photo.get("album_id") for photo in photos)
+    return [PhotoResponse(**{**photo, "album_title": titles.get(photo.get("album_id"))}) for photo in photos]
 
 
 @router.get("/{photo_id}", response_model=PhotoResponse)
@@ -30,9 +51,7 @@ async def get_photo_by_id(photo_id: str):
     photo = await db.photos.find_one({"id": photo_id}, {"_id": 0})
     if not photo:
         raise HTTPException(status_code=404, detail="Photo not found")
-    if photo.get("album_id"):
-        album = await db.albums.find_one({"id": photo["album_id"]}, {"_id": 0})
-        photo["album_title"] = album.get("title") if album else None
+    photo["album_title"] = await get_album_title(photo.get("album_id"))
     return PhotoResponse(**photo)
 
 
@@ -45,35 +64,92 @@ async def create_photo(photo: PhotoCreate, current_user: dict = Depends(get_curr
         "created_at": datetime.now(timezone.utc).isoformat()
     }
     await db.photos.insert_one(photo_doc)
-    album_title = None
-    if photo.album_id:
-        album = await db.albums.find_one({"id": photo.album_id}, {"_id": 0})
-        album_title = album.get("title") if album else None
+    await emit("photos", "insert", doc=photo_doc)
+    album_title = await get_album_title(photo.album_id)
     return PhotoResponse(**photo_doc, album_title=album_title)
 
 
 @router.post("/upload")
 async def upload_photo(file: UploadFile = File(...), current_user: dict = Depends(get_current_user)):
-    contents = await file.read()
-    base64_data = base64.b64encode(contents).decode('utf-8')
-    content_type = file.content_type or "image/jpeg"
-    data_url = f"data:{content_type};base64,{base64_data}"
-    return {"image_url": data_url, "filename": file.filename}
+    media = await store_upload(file)
+    await register_perceptual_hash(media)
+    return {"image_url": media["url"], "media_id": media["id"], "filename": file.filename, "duplicate": media["duplicate"]}
+
+
+@router.post("/bulk")
+async def bulk_upload_photos(
+    files: List[UploadFile] = File(...),
+    album_id: Optional[str] = Form(None),
+    description: Optional[str] = Form(None),
+    current_user: dict = Depends(get_current_user),
+):
+    album_title = None
+    if album_id:
+        album = await db.albums.find_one({"id": album_id}, {"_id": 0, "title": 1})
+        if not album:
+            raise HTTPException(status_code=404, detail="Album not found")
+        album_title = album.get("title")
+
+    semaphore = asyncio.Semaphore(BULK_UPLOAD_CONCURRENCY)
+    now = datetime.now(timezone.utc).isoformat()
+
+    async def process(file: UploadFile):
+        if not (file.content_type or "").startswith("image/"):
+            return {"filename": file.filename, "status": "failed", "error": "Not an image"}, None
+        async with semaphore:
+            try:
+                media = await store_upload(file)
+                if media["content_type"] not in INLINE_TYPES:
+                    # The claimed type passed, but the bytes are not an image
+                    return {"filename": file.filename, "status": "failed", "error": "Not an image"}, None
+                await register_perceptual_hash(media)
+                await pregenerate_variants(media["id"], GALLERY_VARIANTS)
+            except Exception as e:
+                return {"filename": file.filename, "status": "failed", "error": str(e)}, None
+        photo_doc = {
+            "id": str(uuid.uuid4()),
+            "title": os.path.splitext(file.filename or "")[0] or "Untitled",
+            "description": description,
+            "image_url": media["url"],
+            "album_id": album_id,
+            "created_at": now
+        }
+        return {"filename": file.filename, "status": "created", "photo_id": photo_doc["id"], "image_url": media["url"],
+                "duplicate": media["duplicate"]}, photo_doc
+
+    outcomes = await asyncio.gather(*(process(file) for file in files))
+    photo_docs = [doc for _, doc in outcomes if doc is not None]
+    if photo_docs:
+        await db.photos.insert_many(photo_docs)
+        await emit_many("photos", "insert", photo_docs)
+    return {
+        "album_id": album_id,
+        "album_title": album_title,
+        "created": len(photo_docs),
+        "failed": len(files) - len(photo_docs),
+        "results": [result for result, _ in outcomes],
+    }
 
 
 @router.put("/{photo_id}", response_model=PhotoResponse)
 async def update_photo(photo_id: str, photo: PhotoUpdate, current_user: dict = Depends(get_current_user)):
     update_data = {k: v for k, v in photo.model_dump().items() if v is not None}
-    result = await db.photos.update_one({"id": photo_id}, {"$set": update_data})
-    if result.matched_count == 0:
+    previous = await db.photos.find_one_and_update(
+        {"id": photo_id}, {"$set": update_data}, projection={"_id": 0, "album_id": 1},
+        return_document=ReturnDocument.BEFORE
+    )
+    if previous is None:
         raise HTTPException(status_code=404, detail="Photo not found")
     updated = await db.photos.find_one({"id": photo_id}, {"_id": 0})
+    await emit("photos", "update", doc=updated, previous=previous)
+    updated["album_title"] = await get_album_title(updated.get("album_id"))
     return PhotoResponse(**updated)
 
 
 @router.delete("/{photo_id}")
 async def delete_photo(photo_id: str, current_user: dict = Depends(get_current_user)):
-    result = await db.photos.delete_one({"id": photo_id})
-    if result.deleted_count == 0:
+    deleted = await db.photos.find_one_and_delete({"id": photo_id}, projection={"_id": 0, "album_id": 1})
+    if deleted is None:
         raise HTTPException(status_code=404, detail="Photo not found")
+    await emit("photos", "delete", photo_id, previous=deleted)
     return {"message": "Photo deleted successfully"}
@@ -0,0 +1,16 @@
+from fastapi import APIRouter, HTTPException
+from typing import Optional
+from models.search import SearchResponse
+from services.site_search import site_index, SOURCES
+
+router = APIRouter(prefix="/search", tags=["Search"])
+
+
+@router.get("", response_model=SearchResponse)
+async def search(q: str = "", types: Optional[str] = None, limit: int = 5):
+    kinds = [t.strip() for t in types.split(",") if t.strip()] if types else None
+    unknown = set(kinds or []) - set(SOURCES)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown search type(s): {', '.join(sorted(unknown))}")
+    await site_index.ensure_loaded()
+    return site_index.search(q, kinds, limit)
@@ -1,6 +1,10 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Response
 from auth import hash_password
 from database import db
+from services.employee_search import search_terms
+from services.employee_import import email_key
+from services.changes import emit_many
+from services.snapshot import content_snapshot
 import uuid
 from datetime import datetime, timezone
 
@@ -10,6 +14,14 @@ router = APIRouter(tags=["Seed & Templates"])
 @router.get("/templates")
 async def get_templates():
     """Return 7 available page templates + blank option"""
+    body = content_snapshot.get("templates")
+    if body is not None:
+        return Response(content=body, media_type="application/json")
+    return await page_templates()
+
+
+@content_snapshot.section("templates")
+async def page_templates() -> list:
     return [
         {
             "id": "blank",
@@ -144,6 +156,7 @@ async def seed_data():
             {"id": str(uuid.uuid4()), "label": "Photo Gallery", "path": "/gallery", "icon": "", "parent_id": comms_id, "is_visible": True, "open_in_new_tab": False, "order": 2},
         ]
         await db.menus.insert_many(menu_items)
+        await emit_many("menus", "insert", menu_items)
 
     # Check if other data already seeded
     news_count = await db.news.count_documents({})
@@ -173,6 +186,7 @@ async def seed_data():
         {"id": str(uuid.uuid4()), "title": "Strategic Partnership with Japanese Steel Giant", "summary": "PT GYS signs collaboration agreement with Nippon Steel for technology transfer and market expansion.", "content": "PT Garuda Yamato Steel has entered into a strategic partnership with Nippon Steel Corporation.", "image_url": "https://images.unsplash.com/photo-1697281679290-ad7be1b10682?w=800", "category": "business", "is_featured": False, "created_at": now, "updated_at": now},
     ]
     await db.news.insert_many(news_items)
+    await emit_many("news", "insert", news_items)
 
     # Seed Events
     events = [
@@ -183,6 +197,7 @@ async def seed_data():
         {"id": str(uuid.uuid4()), "title": "Independence Day Ceremony", "description": "National flag-raising ceremony followed by team building activities.", "event_date": "2026-08-17", "event_type": "holiday", "location": "Company Plaza", "created_at": now},
     ]
     await db.events.insert_many(events)
+    await emit_many("events", "insert", events)
 
     # Seed Photos
     photos = [
@@ -196,6 +211,7 @@ async def seed_data():
         {"id": str(uuid.uuid4()), "title": "Board Meeting", "description": "Executive leadership quarterly review", "image_url": "https://images.unsplash.com/photo-1560472354-b33ff0c44a43?w=800", "category": "corporate", "created_at": now},
     ]
     await db.photos.insert_many(photos)
+    await emit_many("photos", "insert", photos)
 
     # Seed Employees
     employees = [
@@ -208,6 +224,10 @@ async def seed_data():
         {"id": str(uuid.uuid4()), "name": "Eko Prasetyo", "email": "eko.prasetyo@gys.co.id", "department": "Safety", "position": "Safety Officer", "phone": "+62 812-3456-7896", "avatar_url": "https://images.unsplash.com/photo-1519085360753-af0119f7cbe7?w=150"},
         {"id": str(uuid.uuid4()), "name": "Linda Kusuma", "email": "linda.kusuma@gys.co.id", "department": "Marketing", "position": "Marketing Manager", "phone": "+62 812-3456-7897", "avatar_url": "https://images.unsplash.com/photo-1487412720507-e7ab37603c6f?w=150"},
     ]
+    for employee in employees:
+        employee["search_terms"] = search_terms(employee)
+        employee["email_key"] = email_key(employee["email"])
     await db.employees.insert_many(employees)
+    await emit_many("employees", "insert", employees)
 
     return {"message": "Data seeded successfully"}
@@ -1,7 +1,11 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, BackgroundTasks, Depends, Response
 from models.settings import HeroSettingsUpdate, HeroSettingsResponse, TickerSettingsUpdate, TickerSettingsResponse
 from auth import get_current_user
 from database import db
+from services.media import media_id_from_url
+from services.images import pregenerate_variants, HERO_VARIANTS
+from services.changes import emit
+from services.snapshot import content_snapshot
 
 router = APIRouter(prefix="/settings", tags=["Settings"])
 
@@ -39,16 +43,24 @@ TICKER_DEFAULTS = {
 }
 
 
-@router.get("/hero", response_model=HeroSettingsResponse)
-async def get_hero_settings():
+@content_snapshot.section("hero", ["settings"])
+async def load_hero_settings() -> HeroSettingsResponse:
     settings = await db.settings.find_one({"type": "hero"}, {"_id": 0})
     if not settings:
         return HeroSettingsResponse(**HERO_DEFAULTS)
     return HeroSettingsResponse(**settings)
 
 
+@router.get("/hero", response_model=HeroSettingsResponse)
+async def get_hero_settings():
+    body = content_snapshot.get("hero")
+    if body is not None:
+        return Response(content=body, media_type="application/json")
+    return await load_hero_settings()
+
+
 @router.put("/hero", response_model=HeroSettingsResponse)
-async def update_hero_settings(settings: HeroSettingsUpdate, current_user: dict = Depends(get_current_user)):
+async def update_hero_settings(settings: HeroSettingsUpdate, background_tasks: BackgroundTasks, current_user: dict = Depends(get_current_user)):
     update_data = {k: v for k, v in settings.model_dump().items() if v is not None}
     existing = await db.settings.find_one({"type": "hero"})
     if existing:
@@ -58,17 +70,29 @@ async def update_hero_settings(settings: HeroSettingsUpdate, current_user: dict
         default_settings.update(update_data)
         await db.settings.insert_one(default_settings)
     updated = await db.settings.find_one({"type": "hero"}, {"_id": 0})
+    await emit("settings", "update", doc=updated)
+    hero_media_id = media_id_from_url(update_data.get("hero_image_url"))
+    if hero_media_id:
+        background_tasks.add_task(pregenerate_variants, hero_media_id, HERO_VARIANTS)
     return HeroSettingsResponse(**updated)
 
 
-@router.get("/ticker", response_model=TickerSettingsResponse)
-async def get_ticker_settings():
+@content_snapshot.section("ticker", ["settings"])
+async def load_ticker_settings() -> TickerSettingsResponse:
     settings = await db.settings.find_one({"type": "ticker"}, {"_id": 0})
     if not settings:
         return TickerSettingsResponse(**TICKER_DEFAULTS)
     return TickerSettingsResponse(**settings)
 
 
+@router.get("/ticker", response_model=TickerSettingsResponse)
+async def get_ticker_settings():
+    body = content_snapshot.get("ticker")
+    if body is not None:
+        return Response(content=body, media_type="application/json")
+    return await load_ticker_settings()
+
+
 @router.put("/ticker", response_model=TickerSettingsResponse)
 async def update_ticker_settings(settings: TickerSettingsUpdate, current_user: dict = Depends(get_current_user)):
     update_data = {k: v for k, v in settings.model_dump().items() if v is not None}
@@ -80,4 +104,5 @@ async def update_ticker_settings(settings: TickerSettingsUpdate, current_user: d
         default_settings.update(update_data)
         await db.settings.insert_one(default_settings)
     updated = await db.settings.find_one({"type": "ticker"}, {"_id": 0})
+    await emit("settings", "update", doc=updated)
     return TickerSettingsResponse(**updated)
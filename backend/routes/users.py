@@ -1,19 +1,22 @@
-from fastapi import APIRouter, Depends, HTTPException
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Response
+from typing import List, Optional
 from models.user import UserCreate, UserUpdate, UserResponse
 from auth import hash_password, get_current_user
 from database import db
+from services.pagination import fetch_page
 import uuid
 from datetime import datetime, timezone
 
 router = APIRouter(prefix="/users", tags=["Users"])
 
+USERS_SORT = [("name", 1), ("id", 1)]
+
 
 @router.get("", response_model=List[UserResponse])
-async def get_users(current_user: dict = Depends(get_current_user)):
+async def get_users(response: Response, limit: int = 100, cursor: Optional[str] = None, current_user: dict = Depends(get_current_user)):
     if current_user.get("role") != "admin":
         raise HTTPException(status_code=403, detail="Admin access required")
-    users = await db.users.find({}, {"_id": 0, "password": 0}).to_list(100)
+    users = await fetch_page(db.users, {}, USERS_SORT, limit, cursor, response, projection={"_id": 0, "password": 0})
     return [UserResponse(**u) for u in users]
 
 
@@ -7,6 +7,19 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 from fastapi import FastAPI, APIRouter
 from fastapi.middleware.cors import CORSMiddleware
 from database import client
+from services.images import shutdown_executor
+from services.indexes import ensure_indexes
+from services.albums import reconcile_photo_counts
+from services.employee_search import backfill_search_terms
+from services.employee_import import backfill_email_keys
+from services.index_maintenance import rebuild_indexes
+from services.response_cache import ResponseCacheMiddleware
+from services.conditional import ConditionalGetMiddleware
+from services.compression import CompressionMiddleware
+from services.versions import ensure_versions
+from services.changes import change_bus
+from services.invalidation import invalidation_listener
+from services.snapshot import content_snapshot
 
 from routes.auth import router as auth_router
 from routes.users import router as users_router
@@ -19,6 +32,13 @@ from routes.settings import router as settings_router
 from routes.pages import router as pages_router
 from routes.menus import router as menus_router
 from routes.seed import router as seed_router
+from routes.media import router as media_router
+from routes.export import router as export_router
+from routes.search import router as search_router
+from routes.indexes import router as indexes_router
+from routes.facets import router as facets_router
+from routes.cache import router as cache_router
+from routes.home import router as home_router
 
 app = FastAPI(title="GYS Intranet API")
 
@@ -42,18 +62,47 @@ api_router.include_router(settings_router)
 api_router.include_router(pages_router)
 api_router.include_router(menus_router)
 api_router.include_router(seed_router)
+api_router.include_router(media_router)
+api_router.include_router(export_router)
+api_router.include_router(search_router)
+api_router.include_router(indexes_router)
+api_router.include_router(facets_router)
+api_router.include_router(cache_router)
+api_router.include_router(home_router)
 
 app.include_router(api_router)
 
+# Innermost first: cached entries keep the ETag the conditional layer set and carry their own compressed
+# variants (the compression layer passes those through), and CORS wraps everything
+app.add_middleware(ConditionalGetMiddleware)
+app.add_middleware(ResponseCacheMiddleware)
+app.add_middleware(CompressionMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_credentials=True,
     allow_origins=os.environ.get('CORS_ORIGINS', '*').split(','),
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag", "Last-Modified"],
 )
 
 
+@app.on_event("startup")
+async def prepare_database():
+    await ensure_indexes()
+    await ensure_versions()
+    # Listen before loading in-memory indexes: changes arriving during a load are replayed onto the loaded index
+    invalidation_listener.start(change_bus)
+    await reconcile_photo_counts(only_missing=True)
+    await backfill_search_terms(only_missing=True)
+    await backfill_email_keys(only_missing=True)
+    await rebuild_indexes(["employee_index", "site_search"])
+    await content_snapshot.start()
+
+
 @app.on_event("shutdown")
 async def shutdown_db_client():
+    await invalidation_listener.stop()
+    await content_snapshot.stop()
     client.close()
+    shutdown_executor()
@@ -0,0 +1,81 @@
+from typing import Dict, Iterable, Optional
+from pymongo import UpdateOne
+from database import db
+from services.changes import emit
+
+# album id -> title; albums change rarely, so photo listings resolve titles from here
+_album_titles: Dict[str, Optional[str]] = {}
+
+
+async def resolve_album_titles(album_ids: Iterable[Optional[str]]) -> Dict[str, Optional[str]]:
+    wanted = {album_id for album_id in album_ids if album_id}
+    missing = [album_id for album_id in wanted if album_id not in _album_titles]
+    if missing:
+        found = {album_id: None for album_id in missing}
+        async for album in db.albums.find({"id": {"$in": missing}}, {"_id": 0, "id": 1, "title": 1}):
+            found[album["id"]] = album.get("title")
+        _album_titles.update(found)
+    return {album_id: _album_titles.get(album_id) for album_id in wanted}
+
+
+async def get_album_title(album_id: Optional[str]) -> Optional[str]:
+    if not album_id:
+        return None
+    titles = await resolve_album_titles([album_id])
+    return titles.get(album_id)
+
+
+def cached_album_titles() -> Dict[str, Optional[str]]:
+    return dict(_album_titles)
+
+
+def invalidate_album_title(album_id: Optional[str] = None):
+    if album_id is None:
+        _album_titles.clear()
+    else:
+        _album_titles.pop(album_id, None)
+
+
+async def adjust_photo_count(album_id: Optional[str], delta: int):
+    if album_id and delta:
+        await db.albums.update_one({"id": album_id}, {"$inc": {"photo_count": delta}})
+
+
+async def reconcile_photo_counts(only_missing: bool = False, dry_run: bool = False) -> dict:
+    # Recount from the photos collection with one $group and repair any album that drifted
+    counts = {}
+    async for row in db.photos.aggregate([
+        {"$match": {"album_id": {"$ne": None}}},
+        {"$group": {"_id": "$album_id", "count": {"$sum": 1}}},
+    ]):
+        counts[row["_id"]] = row["count"]
+    query = {"photo_count": {"$exists": False}} if only_missing else {}
+    checked = 0
+    updates = []
+    async for album in db.albums.find(query, {"_id": 0, "id": 1, "photo_count": 1}):
+        checked += 1
+        actual = counts.get(album["id"], 0)
+        if album.get("photo_count") != actual:
+            updates.append(UpdateOne({"id": album["id"]}, {"$set": {"photo_count": actual}}))
+    if dry_run:
+        return {"checked": checked, "drifted": len(updates)}
+    if updates:
+        await db.albums.bulk_write(updates, ordered=False)
+        await emit("albums", "update")
+    return {"checked": checked, "repaired": len(updates)}
+
+
+def latest_photos_lookup(limit: int) -> dict:
+    return {
+        "$lookup": {
+            "from": "photos",
+            "let": {"album_id": "$id"},
+            "pipeline": [
+                {"$match": {"$expr": {"$eq": ["$album_id", "$$album_id"]}}},
+                {"$sort": {"created_at": -1}},
+                {"$limit": limit},
+                {"$project": {"_id": 0, "id": 1, "title": 1, "image_url": 1, "created_at": 1}},
+            ],
+            "as": "latest_photos",
+        }
+    }
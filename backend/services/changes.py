@@ -0,0 +1,109 @@
+from collections import Counter, defaultdict, deque
+from typing import Callable, Dict, Iterable, List, Optional
+from datetime import datetime, timezone
+from database import db
+from services.versions import bump_versions
+from services.invalidation import broadcast
+import asyncio
+import uuid
+
+OPS = ("insert", "update", "delete")
+
+
+class ChangeEvent:
+    # doc is the document after the write (None on delete); previous holds whatever the handler
+    # read before the write. id is None for collection-wide writes such as update_many.
+    # remote events were written by another process: doc is re-read here and previous is unknown.
+    __slots__ = ("collection", "op", "id", "doc", "previous", "remote")
+
+    def __init__(self, collection: str, op: str, doc_id: Optional[str], doc: Optional[dict] = None, previous: Optional[dict] = None,
+                 remote: bool = False):
+        if op not in OPS:
+            raise ValueError(f"Unknown change op: {op}")
+        self.collection = collection
+        self.op = op
+        self.id = doc_id
+        self.doc = doc
+        self.previous = previous
+        self.remote = remote
+
+    def __repr__(self):
+        return f"ChangeEvent({self.collection}.{self.op} {self.id})"
+
+
+class ChangeBus:
+    def __init__(self, origin: Optional[str] = None):
+        # Identifies this process on the invalidation log so it skips its own broadcasts
+        self.origin = origin or uuid.uuid4().hex
+        self.subscribers: Dict[str, List[Callable]] = defaultdict(list)
+        self.published = Counter()
+        self.received = Counter()
+        # Subscribers never fail the write that triggered them; failures are kept for the consistency check
+        self.failures = deque(maxlen=100)
+
+    def subscribe(self, collections: Iterable[str]):
+        def register(handler: Callable):
+            for collection in collections:
+                self.subscribers[collection].append(handler)
+            return handler
+        return register
+
+    async def publish(self, events: List[ChangeEvent], remote: bool = False):
+        by_collection: Dict[str, List[ChangeEvent]] = defaultdict(list)
+        for event in events:
+            by_collection[event.collection].append(event)
+            (self.received if remote else self.published)[f"{event.collection}.{event.op}"] += 1
+        if not remote:
+            # Versions live in Mongo and are bumped by whichever process wrote (workers, CLI migrations),
+            # so conditional GETs stay correct across workers without any subscriber being registered
+            try:
+                await bump_versions(by_collection)
+            except Exception as e:
+                self._record_failure(bump_versions, events, e)
+            # Every other process applies the same change to its in-memory caches and indexes
+            try:
+                await broadcast(events, self.origin)
+            except Exception as e:
+                self._record_failure(broadcast, events, e)
+        for collection, batch in by_collection.items():
+            for handler in self.subscribers.get(collection, ()):
+                try:
+                    result = handler(batch)
+                    if asyncio.iscoroutine(result):
+                        await result
+                except Exception as e:
+                    self._record_failure(handler, batch, e)
+
+    async def receive(self, collection: str, op: str, ids: List[Optional[str]]):
+        docs = {}
+        wanted = [doc_id for doc_id in ids if doc_id is not None]
+        if op != "delete" and wanted:
+            async for doc in db[collection].find({"id": {"$in": wanted}}, {"_id": 0}):
+                docs[doc["id"]] = doc
+        # A document deleted since the broadcast was written arrives as a delete
+        events = [
+            ChangeEvent(collection, op if op == "delete" or doc_id is None or doc_id in docs else "delete", doc_id, docs.get(doc_id), remote=True)
+            for doc_id in ids
+        ]
+        await self.publish(events, remote=True)
+
+    def _record_failure(self, handler: Callable, batch: List[ChangeEvent], error: Exception):
+        self.failures.append({
+            "subscriber": handler.__name__,
+            "events": [repr(event) for event in batch[:5]],
+            "error": repr(error),
+            "at": datetime.now(timezone.utc).isoformat(),
+        })
+
+
+change_bus = ChangeBus()
+
+
+async def emit(collection: str, op: str, doc_id: Optional[str] = None, doc: Optional[dict] = None, previous: Optional[dict] = None):
+    await change_bus.publish([ChangeEvent(collection, op, doc_id or (doc or {}).get("id"), doc, previous)])
+
+
+async def emit_many(collection: str, op: str, docs: Iterable[dict]):
+    events = [ChangeEvent(collection, op, doc.get("id"), doc) for doc in docs]
+    if events:
+        await change_bus.publish(events)
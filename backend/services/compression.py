@@ -0,0 +1,146 @@
+from typing import List, Optional, Tuple
+import gzip
+import os
+import zlib
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always offered
+    brotli = None
+
+COMPRESSION_MIN_BYTES = int(os.environ.get("COMPRESSION_MIN_BYTES", 1024))
+# On-the-fly responses favour speed; cached variants are compressed once per content version, so harder
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+CACHED_GZIP_LEVEL = 9
+CACHED_BROTLI_QUALITY = 9
+COMPRESSIBLE_TYPES = ("application/json", "application/x-ndjson", "application/javascript", "text/", "image/svg+xml")
+
+
+def available_encodings() -> Tuple[str, ...]:
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def choose_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    if not accept_encoding:
+        return None
+    weights = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        if params.strip().startswith("q="):
+            try:
+                q = float(params.strip()[2:])
+            except ValueError:
+                q = 0.0
+        weights[name.strip().lower()] = q
+    # Server preference (br, then gzip) among the codings the client accepts
+    for encoding in available_encodings():
+        if weights.get(encoding, weights.get("*", 0.0)) > 0:
+            return encoding
+    return None
+
+
+def is_compressible(headers: List[Tuple[bytes, bytes]]) -> bool:
+    values = {k.lower(): v for k, v in headers}
+    if b"content-encoding" in values:
+        return False
+    content_type = values.get(b"content-type", b"").decode("latin-1").lower()
+    return content_type.startswith(COMPRESSIBLE_TYPES)
+
+
+def compress(body: bytes, encoding: str, cached: bool = False) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=CACHED_BROTLI_QUALITY if cached else BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=CACHED_GZIP_LEVEL if cached else GZIP_LEVEL, mtime=0)
+
+
+class StreamCompressor:
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=BROTLI_QUALITY)
+        else:
+            self._zlib = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def chunk(self, data: bytes) -> bytes:
+        # Flushed per chunk so streamed exports reach the client as they are produced
+        if self.encoding == "br":
+            return self._brotli.process(data) + self._brotli.flush()
+        return self._zlib.compress(data) + self._zlib.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self, data: bytes = b"") -> bytes:
+        if self.encoding == "br":
+            return self._brotli.process(data) + self._brotli.finish()
+        return self._zlib.compress(data) + self._zlib.flush()
+
+
+def encoded_headers(headers: List[Tuple[bytes, bytes]], encoding: str, length: Optional[int]) -> list:
+    result = []
+    for key, value in headers:
+        name = key.lower()
+        if name == b"content-length" or name == b"vary":
+            continue
+        if name == b"etag" and not value.startswith(b"W/"):
+            # The compressed bytes differ from the identity representation, so its validator is weak
+            value = b"W/" + value
+        result.append((key, value))
+    result.append((b"content-encoding", encoding.encode()))
+    result.append((b"vary", b"Accept-Encoding"))
+    if length is not None:
+        result.append((b"content-length", str(length).encode()))
+    return result
+
+
+def with_vary(headers: List[Tuple[bytes, bytes]]) -> list:
+    return [*(h for h in headers if h[0].lower() != b"vary"), (b"vary", b"Accept-Encoding")]
+
+
+class CompressionMiddleware:
+    # Compresses responses the read cache didn't already serve compressed
+    def __init__(self, app, minimum_size: int = COMPRESSION_MIN_BYTES):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        accept = dict(scope["headers"]).get(b"accept-encoding", b"").decode("latin-1")
+        encoding = choose_encoding(accept)
+        start = {}
+        compressor: Optional[StreamCompressor] = None
+        passthrough = False
+
+        async def compressing_send(message):
+            nonlocal compressor, passthrough
+            if message["type"] == "http.response.start":
+                headers = message.get("headers", [])
+                if message["status"] != 200 or not is_compressible(headers):
+                    passthrough = True
+                    return await send(message)
+                if encoding is None:
+                    passthrough = True
+                    return await send({**message, "headers": with_vary(headers)})
+                start.update(message)
+                return
+            if passthrough or message["type"] != "http.response.body":
+                return await send(message)
+            body = message.get("body", b"")
+            more = message.get("more_body", False)
+            if compressor is None:
+                if not more:
+                    # Whole body known: below the threshold compression costs more than it saves
+                    if len(body) < self.minimum_size:
+                        passthrough = True
+                        await send({**start, "headers": with_vary(start["headers"])})
+                        return await send(message)
+                    compressed = compress(body, encoding)
+                    await send({**start, "headers": encoded_headers(start["headers"], encoding, len(compressed))})
+                    return await send({"type": "http.response.body", "body": compressed})
+                compressor = StreamCompressor(encoding)
+                await send({**start, "headers": encoded_headers(start["headers"], encoding, None)})
+            data = compressor.chunk(body) if more else compressor.finish(body)
+            if data or not more:
+                await send({"type": "http.response.body", "body": data, "more_body": more})
+
+        await self.app(scope, receive, compressing_send)
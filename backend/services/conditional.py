@@ -0,0 +1,122 @@
+from email.utils import format_datetime, parsedate_to_datetime
+from datetime import datetime, timezone
+from typing import List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode
+from services.versions import tags_for_path, get_versions
+import hashlib
+
+# Streaming and file responses that manage their own validators (media sets ETag from the content hash)
+SKIP_PREFIXES = ("/api/export", "/api/media")
+# Larger bodies stream through untouched instead of being buffered for hashing
+MAX_HASHED_BODY = 4 * 1024 * 1024
+
+
+def cache_key(path: str, query_string: bytes) -> str:
+    # Parameter order and empty values don't change the response, so they split neither cache nor ETag
+    params = sorted((k, v) for k, v in parse_qsl(query_string.decode("latin-1"), keep_blank_values=False))
+    return f"{path}?{urlencode(params)}" if params else path
+
+
+def version_etag(key: str, versions: dict) -> str:
+    material = key + "|" + ",".join(f"{name}:{version}" for name, (version, _) in sorted(versions.items()))
+    return '"v-' + hashlib.blake2b(material.encode(), digest_size=12).hexdigest() + '"'
+
+
+def content_etag(body: bytes) -> str:
+    return '"h-' + hashlib.blake2b(body, digest_size=12).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    # Weak comparison (RFC 9110): W/"x" matches "x", which proxies that gzip on the fly rely on
+    return "*" in candidates or etag in (tag[2:] if tag.startswith("W/") else tag for tag in candidates)
+
+
+def not_modified_since(if_modified_since: Optional[str], last_modified) -> bool:
+    if not if_modified_since or last_modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    return last_modified.replace(microsecond=0) <= since
+
+
+class ConditionalGetMiddleware:
+    # Strong ETags on every GET; versioned routes answer 304 from a version lookup without running the handler
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "GET" or scope["path"].startswith(SKIP_PREFIXES):
+            return await self.app(scope, receive, send)
+        headers = {k.decode("latin-1"): v.decode("latin-1") for k, v in scope["headers"]}
+        cache_control = "private, no-cache" if "authorization" in headers else "no-cache"
+        if_none_match = headers.get("if-none-match")
+        if_modified_since = headers.get("if-modified-since")
+
+        etag, last_modified = None, None
+        tags = tags_for_path(scope["path"])
+        if tags:
+            # Read versions before rendering: a write landing mid-render then only costs one extra 200
+            versions = await get_versions(tags)
+            etag = version_etag(cache_key(scope["path"], scope.get("query_string", b"")), versions)
+            stamps = [updated_at for _, updated_at in versions.values() if updated_at is not None]
+            last_modified = max(stamps) if len(stamps) == len(versions) else None
+            # HTTP dates have one-second resolution: until that second is over, another write could share it
+            if last_modified is not None and last_modified.replace(microsecond=0) >= datetime.now(timezone.utc).replace(microsecond=0):
+                last_modified = None
+            if etag_matches(if_none_match, etag) or (if_none_match is None and not_modified_since(if_modified_since, last_modified)):
+                return await send_not_modified(send, etag, last_modified, cache_control)
+
+        start = {}
+        chunks: List[bytes] = []
+        buffering = True
+
+        async def finish(message):
+            nonlocal buffering
+            if message["type"] == "http.response.start":
+                start.update(message)
+                existing = {k.lower() for k, _ in message.get("headers", [])}
+                # Only plain 200s without their own validator are tagged; errors and partial content pass through
+                if message["status"] != 200 or b"etag" in existing:
+                    buffering = False
+                    return await send(message)
+                if etag is not None:
+                    buffering = False
+                    return await send({**message, "headers": validator_headers(message["headers"], etag, last_modified, cache_control, existing)})
+                return
+            if not buffering:
+                return await send(message)
+            chunks.append(message.get("body", b""))
+            if message.get("more_body", False):
+                if sum(len(chunk) for chunk in chunks) > MAX_HASHED_BODY:
+                    buffering = False
+                    await send(start)
+                    await send({"type": "http.response.body", "body": b"".join(chunks), "more_body": True})
+                return
+            body = b"".join(chunks)
+            body_etag = content_etag(body)
+            if etag_matches(if_none_match, body_etag):
+                return await send_not_modified(send, body_etag, None, cache_control)
+            await send({**start, "headers": validator_headers(start.get("headers", []), body_etag, None, cache_control)})
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, finish)
+
+
+def validator_headers(headers: List[Tuple[bytes, bytes]], etag: str, last_modified, cache_control: str, existing=None) -> list:
+    existing = existing if existing is not None else {k.lower() for k, _ in headers}
+    result = [*headers, (b"etag", etag.encode())]
+    if last_modified is not None:
+        result.append((b"last-modified", format_datetime(last_modified, usegmt=True).encode()))
+    if b"cache-control" not in existing:
+        result.append((b"cache-control", cache_control.encode()))
+    return result
+
+
+async def send_not_modified(send, etag: str, last_modified, cache_control: str):
+    await send({"type": "http.response.start", "status": 304, "headers": validator_headers([], etag, last_modified, cache_control)})
+    await send({"type": "http.response.body", "body": b""})
@@ -0,0 +1,281 @@
+# Moves inline "data:...;base64," blobs out of documents and into the media store.
+# Run from the backend directory:  python -m services.data_url_migration [--dry-run] [--batch-size N]
+from pymongo import UpdateOne
+from typing import Optional
+from urllib.parse import unquote_to_bytes
+from database import db
+from services.media import store_bytes
+from services.dedup import register_perceptual_hash
+from services.changes import emit_many
+from datetime import datetime, timedelta, timezone
+import argparse
+import asyncio
+import base64
+import binascii
+import os
+import socket
+import uuid
+
+MIGRATION_ID = "extract-data-urls"
+DEFAULT_BATCH_SIZE = 50
+DATA_URL_PREFIX = "data:"
+# A run whose heartbeat is older than this died without recording it (crash, redeploy) and may be taken over
+MIGRATION_STALE_SECONDS = int(os.environ.get("MIGRATION_STALE_SECONDS", 300))
+
+# collection -> (filter limiting the scan, top-level fields holding URLs); None means walk every string in "blocks"
+TARGETS = {
+    "photos": ({}, ["image_url"]),
+    "news": ({}, ["image_url"]),
+    "albums": ({}, ["cover_image_url"]),
+    "employees": ({}, ["avatar_url"]),
+    "settings": ({"type": "hero"}, ["hero_image_url", "hero_video_url"]),
+    "pages": ({}, None),
+}
+
+
+def decode_data_url(value: str):
+    header, _, payload = value.partition(",")
+    meta = header[len(DATA_URL_PREFIX):].split(";")
+    content_type = meta[0] or "application/octet-stream"
+    if "base64" in meta[1:]:
+        return base64.b64decode(payload, validate=False), content_type
+    return unquote_to_bytes(payload), content_type
+
+
+def is_data_url(value) -> bool:
+    return isinstance(value, str) and value.startswith(DATA_URL_PREFIX)
+
+
+def field_query(fields) -> dict:
+    return {"$or": [{field: {"$regex": f"^{DATA_URL_PREFIX}"}} for field in fields]}
+
+
+async def extract(value: str, filename: Optional[str]) -> str:
+    data, content_type = decode_data_url(value)
+    media = await store_bytes(data, content_type, filename)
+    await register_perceptual_hash(media)
+    return media["url"]
+
+
+async def rewrite_nested(value, filename):
+    if is_data_url(value):
+        try:
+            return await extract(value, filename), True
+        except (binascii.Error, ValueError):
+            return value, False
+    if isinstance(value, list):
+        changed = False
+        items = []
+        for item in value:
+            new_item, item_changed = await rewrite_nested(item, filename)
+            items.append(new_item)
+            changed = changed or item_changed
+        return items, changed
+    if isinstance(value, dict):
+        changed = False
+        result = {}
+        for key, item in value.items():
+            result[key], item_changed = await rewrite_nested(item, filename)
+            changed = changed or item_changed
+        return result, changed
+    return value, False
+
+
+async def rewrite_document(doc: dict, fields) -> dict:
+    label = doc.get("id") or str(doc["_id"])
+    updates = {}
+    if fields is None:
+        blocks, changed = await rewrite_nested(doc.get("blocks") or [], label)
+        if changed:
+            updates["blocks"] = blocks
+        return updates
+    for field in fields:
+        if is_data_url(doc.get(field)):
+            try:
+                updates[field] = await extract(doc[field], f"{label}-{field}")
+            except (binascii.Error, ValueError):
+                continue
+    return updates
+
+
+async def size_report() -> dict:
+    # Top-level fields are summed server-side; block data URLs sit at arbitrary depth, so pages are walked here
+    report = {}
+    for collection, (base_filter, fields) in TARGETS.items():
+        if fields is None:
+            count, total = 0, 0
+            async for doc in db[collection].find(base_filter, {"blocks": 1}):
+                sizes = []
+                stack = [doc.get("blocks") or []]
+                while stack:
+                    value = stack.pop()
+                    if is_data_url(value):
+                        sizes.append(len(value))
+                    elif isinstance(value, list):
+                        stack.extend(value)
+                    elif isinstance(value, dict):
+                        stack.extend(value.values())
+                if sizes:
+                    count += 1
+                    total += sum(sizes)
+            report[collection] = {"documents": count, "inline_bytes": total}
+            continue
+        count, total = 0, 0
+        for field in fields:
+            pipeline = [
+                {"$match": {**base_filter, field: {"$regex": f"^{DATA_URL_PREFIX}"}}},
+                {"$group": {"_id": None, "documents": {"$sum": 1}, "bytes": {"$sum": {"$strLenBytes": f"${field}"}}}},
+            ]
+            async for row in db[collection].aggregate(pipeline):
+                count += row["documents"]
+                total += row["bytes"]
+        report[collection] = {"documents": count, "inline_bytes": total}
+    for entry in report.values():
+        # base64 carries 4 bytes per 3 of payload
+        entry["estimated_savings_bytes"] = entry["inline_bytes"] * 3 // 4
+    return report
+
+
+class MigrationRunning(Exception):
+    pass
+
+
+def heartbeat_cutoff() -> str:
+    return (datetime.now(timezone.utc) - timedelta(seconds=MIGRATION_STALE_SECONDS)).isoformat()
+
+
+def is_active(state: dict) -> bool:
+    return state.get("status") == "running" and (state.get("heartbeat_at") or "") > heartbeat_cutoff()
+
+
+async def load_state() -> dict:
+    state = await db.migrations.find_one({"id": MIGRATION_ID}, {"_id": 0})
+    return state or {"id": MIGRATION_ID, "status": "pending", "collections": {}}
+
+
+def describe_state(state: dict) -> dict:
+    # Checkpoints keep the raw _id for resuming; the status endpoint only needs it readable
+    collections = {}
+    for name, checkpoint in state.get("collections", {}).items():
+        last_id = checkpoint.get("last_id")
+        collections[name] = {**checkpoint, "last_id": None if last_id is None else str(last_id)}
+    return {**state, "collections": collections}
+
+
+async def claim_migration(restart: bool = False) -> dict:
+    # Atomic: of two concurrent starts only one becomes the owner; restart takes over even a live run
+    await db.migrations.update_one(
+        {"id": MIGRATION_ID},
+        {"$setOnInsert": {"id": MIGRATION_ID, "status": "pending", "collections": {}}},
+        upsert=True,
+    )
+    condition = {"id": MIGRATION_ID}
+    if not restart:
+        condition["$or"] = [
+            {"status": {"$ne": "running"}},
+            {"heartbeat_at": {"$exists": False}},
+            {"heartbeat_at": {"$lt": heartbeat_cutoff()}},
+        ]
+    now = datetime.now(timezone.utc).isoformat()
+    claim = {"status": "running", "owner": f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}",
+             "heartbeat_at": now, "updated_at": now}
+    if restart:
+        claim["collections"] = {}
+    result = await db.migrations.update_one(condition, {"$set": claim})
+    if result.modified_count == 0:
+        raise MigrationRunning("Migration already running")
+    return await load_state()
+
+
+async def save_state(state: dict):
+    # Every checkpoint doubles as the heartbeat
+    state["updated_at"] = state["heartbeat_at"] = datetime.now(timezone.utc).isoformat()
+    result = await db.migrations.replace_one({"id": MIGRATION_ID, "owner": state.get("owner")}, state)
+    if result.matched_count == 0:
+        # Taken over by a restart (or a newer run after a missed heartbeat): stop without touching its state
+        raise MigrationRunning("Migration taken over by another run")
+
+
+async def migrate_collection(collection: str, state: dict, batch_size: int, progress=None):
+    base_filter, fields = TARGETS[collection]
+    checkpoint = state["collections"].setdefault(collection, {"last_id": None, "scanned": 0, "rewritten": 0, "done": False})
+    if checkpoint["done"]:
+        return
+    query = dict(base_filter)
+    if fields is not None:
+        query.update(field_query(fields))
+    while True:
+        page_query = dict(query)
+        if checkpoint["last_id"] is not None:
+            page_query["_id"] = {"$gt": checkpoint["last_id"]}
+        batch = await db[collection].find(page_query).sort("_id", 1).limit(batch_size).to_list(batch_size)
+        if not batch:
+            break
+        operations = []
+        ids = []
+        for doc in batch:
+            updates = await rewrite_document(doc, fields)
+            if updates:
+                # Only if the fields still hold what was read: an edit saved while the blobs were being stored wins
+                guard = {"_id": doc["_id"], **{field: doc[field] for field in updates}}
+                operations.append(UpdateOne(guard, {"$set": updates}))
+                ids.append(doc["_id"])
+        rewritten = 0
+        if operations:
+            result = await db[collection].bulk_write(operations, ordered=False)
+            rewritten = result.modified_count
+            # Whole documents, so in-memory indexes holding these fields drop the inline blobs too
+            docs = await db[collection].find({"_id": {"$in": ids}}, {"_id": 0}).to_list(None)
+            await emit_many(collection, "update", docs)
+        checkpoint["last_id"] = batch[-1]["_id"]
+        checkpoint["scanned"] += len(batch)
+        checkpoint["rewritten"] += rewritten
+        await save_state(state)
+        if progress:
+            progress(collection, checkpoint)
+    checkpoint["done"] = True
+    await save_state(state)
+
+
+async def run_migration(batch_size: int = DEFAULT_BATCH_SIZE, collections=None, restart: bool = False, progress=None,
+                        state: Optional[dict] = None) -> dict:
+    state = state or await claim_migration(restart)
+    try:
+        for collection in collections or TARGETS:
+            await migrate_collection(collection, state, batch_size, progress)
+    except MigrationRunning:
+        raise
+    except BaseException:
+        state["status"] = "interrupted"
+        await save_state(state)
+        raise
+    state["status"] = "completed"
+    await save_state(state)
+    return state
+
+
+def print_progress(collection: str, checkpoint: dict):
+    print(f"[{collection}] scanned={checkpoint['scanned']} rewritten={checkpoint['rewritten']}", flush=True)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Extract inline data URLs into the media store")
+    parser.add_argument("--dry-run", action="store_true", help="only report how much inline data exists")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--collection", action="append", choices=list(TARGETS))
+    parser.add_argument("--restart", action="store_true", help="ignore saved checkpoints")
+    args = parser.parse_args()
+    if args.dry_run:
+        for collection, entry in (await size_report()).items():
+            print(f"{collection:10} documents={entry['documents']:>7} inline={entry['inline_bytes'] / 1048576:10.1f} MiB "
+                  f"payload={entry['estimated_savings_bytes'] / 1048576:10.1f} MiB")
+        return
+    try:
+        state = await run_migration(args.batch_size, args.collection, args.restart, print_progress)
+    except MigrationRunning as e:
+        raise SystemExit(f"{e} (use --restart to take it over)")
+    print(f"Migration {state['status']}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
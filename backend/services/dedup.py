@@ -0,0 +1,155 @@
+from typing import Dict, List, Optional, Tuple
+from PIL import Image, ImageOps
+from database import db
+from services.changes import change_bus, emit
+from services.images import run_in_process, source_path
+from services.media import INLINE_TYPES, media_id_from_url
+import asyncio
+
+DEFAULT_DISTANCE = 6
+
+
+def _dhash(path: str) -> int:
+    # 64-bit difference hash: compare each pixel with its right neighbour on a 9x8 greyscale thumbnail
+    with Image.open(path) as img:
+        img = ImageOps.exif_transpose(img).convert("L").resize((9, 8), Image.LANCZOS)
+        pixels = list(img.getdata())
+    value = 0
+    for row in range(8):
+        for col in range(8):
+            left = pixels[row * 9 + col]
+            right = pixels[row * 9 + col + 1]
+            value = (value << 1) | (1 if left > right else 0)
+    return value
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+class BKTree:
+    def __init__(self):
+        # node: [hash, media ids with that exact hash, {distance: child node}]
+        self.root = None
+
+    def add(self, value: int, key: str):
+        if self.root is None:
+            self.root = [value, [key], {}]
+            return
+        node = self.root
+        while True:
+            distance = hamming(value, node[0])
+            if distance == 0:
+                if key not in node[1]:
+                    node[1].append(key)
+                return
+            child = node[2].get(distance)
+            if child is None:
+                node[2][distance] = [value, [key], {}]
+                return
+            node = child
+
+    def search(self, value: int, radius: int) -> List[Tuple[int, str]]:
+        results = []
+        stack = [self.root] if self.root else []
+        while stack:
+            node = stack.pop()
+            distance = hamming(value, node[0])
+            if distance <= radius:
+                results.extend((distance, key) for key in node[1])
+            # Triangle inequality: only subtrees within [d - r, d + r] can hold matches
+            for edge, child in node[2].items():
+                if distance - radius <= edge <= distance + radius:
+                    stack.append(child)
+        return sorted(results)
+
+
+class PerceptualIndex:
+    def __init__(self):
+        self.tree = BKTree()
+        self.hashes: Dict[str, int] = {}
+        self.loaded = False
+        self.lock = asyncio.Lock()
+
+    async def ensure_loaded(self):
+        if self.loaded:
+            return
+        async with self.lock:
+            if self.loaded:
+                return
+            async for media in db.media.find({"dhash": {"$exists": True}}, {"_id": 0, "id": 1, "dhash": 1}):
+                self._add(media["id"], int(media["dhash"], 16))
+            self.loaded = True
+
+    def _add(self, media_id: str, value: int):
+        if media_id not in self.hashes:
+            self.hashes[media_id] = value
+            self.tree.add(value, media_id)
+
+    async def add(self, media_id: str, value: int):
+        await self.ensure_loaded()
+        self._add(media_id, value)
+
+    async def refresh(self, media_ids):
+        # Picks up hashes stored by other processes; an index not loaded yet reads them all on first use
+        if not self.loaded:
+            return
+        wanted = sorted({media_id for media_id in media_ids if media_id and media_id not in self.hashes})
+        if not wanted:
+            return
+        query = {"id": {"$in": wanted}, "dhash": {"$exists": True}}
+        async for media in db.media.find(query, {"_id": 0, "id": 1, "dhash": 1}):
+            self._add(media["id"], int(media["dhash"], 16))
+
+    async def similar(self, media_id: str, radius: int = DEFAULT_DISTANCE) -> List[Tuple[int, str]]:
+        await self.ensure_loaded()
+        value = self.hashes.get(media_id)
+        if value is None:
+            return []
+        return [(distance, key) for distance, key in self.tree.search(value, radius) if key != media_id]
+
+    async def duplicate_groups(self, radius: int = DEFAULT_DISTANCE) -> List[List[str]]:
+        await self.ensure_loaded()
+        seen = set()
+        groups = []
+        for media_id, value in self.hashes.items():
+            if media_id in seen:
+                continue
+            group = [key for _, key in self.tree.search(value, radius) if key not in seen]
+            if len(group) > 1:
+                groups.append(group)
+                seen.update(group)
+        return groups
+
+
+perceptual_index = PerceptualIndex()
+
+
+@change_bus.subscribe(["media", "photos"])
+async def update_perceptual_index(events):
+    media_ids = []
+    for event in events:
+        if event.collection == "media":
+            media_ids.append(event.id)
+        elif event.doc is not None:
+            media_ids.append(media_id_from_url(event.doc.get("image_url")))
+    await perceptual_index.refresh(media_ids)
+
+
+async def register_perceptual_hash(media: dict) -> Optional[str]:
+    if media["content_type"] not in INLINE_TYPES:
+        return None
+    if media.get("dhash"):
+        await perceptual_index.add(media["id"], int(media["dhash"], 16))
+        return media["dhash"]
+    try:
+        value = await run_in_process(_dhash, await source_path(media["id"]))
+    except (OSError, Image.DecompressionBombError):
+        # Undecodable or oversized images are stored but not hashed
+        return None
+    dhash = f"{value:016x}"
+    await db.media.update_one({"id": media["id"]}, {"$set": {"dhash": dhash}})
+    await perceptual_index.add(media["id"], value)
+    # Other workers' indexes learn about the hash through the bus
+    await emit("media", "update", media["id"])
+    return dhash
@@ -0,0 +1,239 @@
+from typing import Iterator, List, Optional, Tuple
+from fastapi import UploadFile
+from pydantic import ValidationError
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+from starlette.concurrency import run_in_threadpool
+from database import db
+from models.employee import EmployeeCreate
+from services.employee_search import search_terms
+from services.changes import emit_many
+import csv
+import io
+import os
+import uuid
+
+try:
+    import openpyxl
+except ImportError:  # XLSX import is unavailable without openpyxl; CSV still works
+    openpyxl = None
+
+IMPORT_BATCH_SIZE = int(os.environ.get("EMPLOYEE_IMPORT_BATCH_SIZE", 1000))
+# Keeps the report bounded when a whole file is malformed
+MAX_REPORTED_ERRORS = 1000
+
+HEADER_ALIASES = {
+    "full_name": "name",
+    "employee_name": "name",
+    "e-mail": "email",
+    "email_address": "email",
+    "dept": "department",
+    "division": "department",
+    "title": "position",
+    "job_title": "position",
+    "phone_number": "phone",
+    "mobile": "phone",
+    "photo": "avatar_url",
+    "avatar": "avatar_url",
+}
+FIELDS = set(EmployeeCreate.model_fields)
+
+
+class ImportFormatError(ValueError):
+    pass
+
+
+def file_format(filename: Optional[str], content_type: Optional[str]) -> str:
+    name = (filename or "").lower()
+    if name.endswith(".xlsx") or content_type == "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet":
+        return "xlsx"
+    if name.endswith(".csv") or content_type in ("text/csv", "application/csv"):
+        return "csv"
+    raise ImportFormatError("Only .csv and .xlsx files can be imported")
+
+
+def normalize_header(header) -> Optional[str]:
+    key = str(header or "").strip().lower().replace(" ", "_")
+    key = HEADER_ALIASES.get(key, key)
+    return key if key in FIELDS else None
+
+
+def _rows(header: list, values: Iterator[tuple], first_row: int) -> Iterator[Tuple[int, dict]]:
+    columns = [normalize_header(h) for h in header]
+    missing = {"name", "email"} - set(columns)
+    if missing:
+        raise ImportFormatError(f"Missing required column(s): {', '.join(sorted(missing))}")
+    for row_number, row in enumerate(values, first_row):
+        record = {}
+        for column, value in zip(columns, row):
+            if column is None or value is None:
+                continue
+            if isinstance(value, float) and value.is_integer():
+                value = int(value)
+            value = str(value).strip()
+            if value:
+                record[column] = value
+        if record:
+            yield row_number, record
+
+
+def iter_csv(raw) -> Iterator[Tuple[int, dict]]:
+    reader = csv.reader(io.TextIOWrapper(raw, encoding="utf-8-sig", newline=""))
+    header = next(reader, None)
+    if header is None:
+        return
+    yield from _rows(header, reader, 2)
+
+
+def iter_xlsx(raw) -> Iterator[Tuple[int, dict]]:
+    if openpyxl is None:
+        raise ImportFormatError("XLSX import requires openpyxl; upload a CSV instead")
+    # read_only streams rows from the sheet XML instead of building the whole workbook
+    try:
+        workbook = openpyxl.load_workbook(raw, read_only=True, data_only=True)
+    except Exception:
+        raise ImportFormatError("File is not a readable XLSX workbook")
+    try:
+        values = workbook.active.iter_rows(values_only=True)
+        header = next(values, None)
+        if header is None:
+            return
+        yield from _rows(list(header), values, 2)
+    finally:
+        workbook.close()
+
+
+def _next_chunk(rows: Iterator[Tuple[int, dict]], size: int) -> List[Tuple[int, dict]]:
+    chunk = []
+    for item in rows:
+        chunk.append(item)
+        if len(chunk) >= size:
+            break
+    return chunk
+
+
+def validation_messages(exc: ValidationError) -> List[str]:
+    return [f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in exc.errors()]
+
+
+def email_key(email: Optional[str]) -> str:
+    # Emails are stored as entered; matching ignores case
+    return (email or "").strip().lower()
+
+
+async def backfill_email_keys(only_missing: bool = True, batch_size: int = 1000) -> int:
+    query = {"email_key": {"$exists": False}} if only_missing else {}
+    updated = 0
+    batch = []
+    async for doc in db.employees.find(query, {"_id": 1, "email": 1}).batch_size(batch_size):
+        batch.append(UpdateOne({"_id": doc["_id"]}, {"$set": {"email_key": email_key(doc.get("email"))}}))
+        if len(batch) >= batch_size:
+            await db.employees.bulk_write(batch, ordered=False)
+            updated += len(batch)
+            batch = []
+    if batch:
+        await db.employees.bulk_write(batch, ordered=False)
+        updated += len(batch)
+    return updated
+
+
+async def duplicate_email_keys(limit: int) -> Tuple[int, List[str]]:
+    # Employees sharing an email in different case; an import updates only one of them
+    pipeline = [
+        {"$group": {"_id": "$email_key", "count": {"$sum": 1}}},
+        {"$match": {"count": {"$gt": 1}}},
+        {"$sort": {"_id": 1}},
+    ]
+    keys = [row["_id"] async for row in db.employees.aggregate(pipeline)]
+    return len(keys), keys[:limit]
+
+
+def build_upsert(record: dict) -> Tuple[str, UpdateOne]:
+    employee = EmployeeCreate(**record)
+    fields = {k: v for k, v in employee.model_dump().items() if v is not None}
+    if "@" not in fields["email"]:
+        raise ValueError("email: not a valid email address")
+    fields["email_key"] = email_key(fields["email"])
+    fields["search_terms"] = search_terms(fields)
+    operation = UpdateOne(
+        {"email_key": fields["email_key"]}, {"$set": fields, "$setOnInsert": {"id": str(uuid.uuid4())}}, upsert=True
+    )
+    return fields["email_key"], operation
+
+
+class ImportReport:
+    def __init__(self):
+        self.total_rows = 0
+        self.inserted = 0
+        self.updated = 0
+        self.unchanged = 0
+        self.failed = 0
+        self.errors = []
+
+    def error(self, row: int, email: Optional[str], messages: List[str]):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"row": row, "email": email, "errors": messages})
+
+    def as_dict(self) -> dict:
+        return {
+            "total_rows": self.total_rows,
+            "inserted": self.inserted,
+            "updated": self.updated,
+            "unchanged": self.unchanged,
+            "failed": self.failed,
+            "errors": self.errors,
+            "errors_truncated": self.failed > len(self.errors),
+        }
+
+
+async def write_batch(operations: List[UpdateOne], row_numbers: List[int], keys: List[str], report: ImportReport):
+    try:
+        result = await db.employees.bulk_write(operations, ordered=False)
+        details = result.bulk_api_result
+    except BulkWriteError as exc:
+        details = exc.details
+        for write_error in details.get("writeErrors", []):
+            index = write_error["index"]
+            report.error(row_numbers[index], keys[index], [write_error.get("errmsg", "write failed")])
+    report.inserted += details.get("nUpserted", 0)
+    report.updated += details.get("nModified", 0)
+    report.unchanged += details.get("nMatched", 0) - details.get("nModified", 0)
+    # One read per batch picks up generated ids for new rows so derived indexes get whole documents
+    await emit_many("employees", "update", await db.employees.find({"email_key": {"$in": keys}}, {"_id": 0}).to_list(None))
+
+
+async def import_employees(file: UploadFile, dry_run: bool = False) -> dict:
+    fmt = file_format(file.filename, file.content_type)
+    rows = iter_csv(file.file) if fmt == "csv" else iter_xlsx(file.file)
+    report = ImportReport()
+    while True:
+        # Parsing is blocking work; pull one batch at a time off the event loop
+        try:
+            chunk = await run_in_threadpool(_next_chunk, rows, IMPORT_BATCH_SIZE)
+        except (UnicodeDecodeError, csv.Error):
+            raise ImportFormatError(f"CSV could not be read after row {report.total_rows + 1}; files must be UTF-8 encoded")
+        if not chunk:
+            break
+        # Unordered bulk writes may apply in any order, so one email gets at most one upsert per batch
+        batch = {}
+        for row_number, record in chunk:
+            report.total_rows += 1
+            try:
+                email, operation = build_upsert(record)
+            except ValidationError as exc:
+                report.error(row_number, record.get("email"), validation_messages(exc))
+                continue
+            except ValueError as exc:
+                report.error(row_number, record.get("email"), [str(exc)])
+                continue
+            if email in batch:
+                report.error(batch[email][0], email, [f"email: duplicated on row {row_number}, which was imported instead"])
+            batch[email] = (row_number, operation)
+        if batch and not dry_run:
+            row_numbers = [row_number for row_number, _ in batch.values()]
+            operations = [operation for _, operation in batch.values()]
+            await write_batch(operations, row_numbers, list(batch), report)
+    result = report.as_dict()
+    result["dry_run"] = dry_run
+    return result
@@ -0,0 +1,218 @@
+from bisect import bisect_left, insort
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from database import db
+from services.employee_search import normalize, tokenize
+from services.fuzzy import fold, trigrams, max_distance, bounded_levenshtein
+import asyncio
+import heapq
+
+SUGGEST_FIELDS = ("id", "name", "email", "position", "department", "avatar_url")
+MAX_SUGGESTIONS = 20
+# Prefix hits scored per query; keeps one-letter prefixes as cheap as full names
+MAX_CANDIDATES = 500
+# Vocabulary tokens per query token that get an exact edit-distance check
+MAX_FUZZY_TOKENS = 200
+
+
+def _terms(record: dict) -> List[str]:
+    terms = set(tokenize(record.get("name", "")))
+    terms.update(tokenize(record.get("email", "")))
+    terms.update(tokenize(record.get("position", "")))
+    # The whole name lets multi-word prefixes like "budi san" hit a single entry
+    terms.add(" ".join(tokenize(record.get("name", ""))))
+    return sorted(term for term in terms if term)
+
+
+class EmployeeIndex:
+    # Sorted (term, employee id) pairs searched with bisect; records hold only the fields suggestions return
+    def __init__(self):
+        self.entries: List[Tuple[str, str]] = []
+        self.records: Dict[str, dict] = {}
+        self.terms: Dict[str, List[str]] = {}
+        self.names: Dict[str, Tuple[str, Tuple[str, ...]]] = {}
+        self.folded: Dict[str, Tuple[str, ...]] = {}
+        # Distinct folded tokens are far fewer than employees; fuzzy work happens over this vocabulary
+        self.token_ids: Dict[str, Set[str]] = defaultdict(set)
+        self.trigram_tokens: Dict[str, Set[str]] = defaultdict(set)
+        # Changes seen while a load is scanning; replayed onto the new index before it replaces this one
+        self.pending: Optional[list] = None
+        self.load_lock = asyncio.Lock()
+        self.loaded = False
+
+    async def ensure_loaded(self):
+        if not self.loaded:
+            await self.load()
+
+    async def load(self):
+        async with self.load_lock:
+            self.pending = []
+            fresh = EmployeeIndex()
+            projection = {"_id": 0, **{field: 1 for field in SUGGEST_FIELDS}}
+            try:
+                async for doc in db.employees.find({}, projection).batch_size(2000):
+                    fresh._store(doc)
+                    fresh.entries.extend((term, doc["id"]) for term in fresh.terms[doc["id"]])
+            except BaseException:
+                self.pending = None
+                raise
+            fresh.entries.sort()
+            # No await from here to the swap, so no change can slip between replay and swap
+            fresh.apply_changes(self.pending)
+            self.entries, self.records, self.terms, self.names = fresh.entries, fresh.records, fresh.terms, fresh.names
+            self.folded, self.token_ids, self.trigram_tokens = fresh.folded, fresh.token_ids, fresh.trigram_tokens
+            self.pending = None
+            self.loaded = True
+
+    def apply_changes(self, events):
+        if self.pending is not None:
+            self.pending.extend(events)
+        for event in events:
+            if event.op == "delete" and event.id:
+                self.remove(event.id)
+            elif event.doc is not None:
+                self.upsert(event.doc)
+
+    def _store(self, doc: dict):
+        record = {field: doc.get(field) for field in SUGGEST_FIELDS}
+        name = normalize(record.get("name") or "")
+        self.records[record["id"]] = record
+        self.terms[record["id"]] = _terms(record)
+        self.names[record["id"]] = (name, tuple(tokenize(name)))
+        self.folded[record["id"]] = tuple(fold(token) for token in tokenize(name))
+        for token in self.folded[record["id"]]:
+            if token not in self.token_ids:
+                for gram in trigrams(token):
+                    self.trigram_tokens[gram].add(token)
+            self.token_ids[token].add(record["id"])
+
+    def upsert(self, doc: dict):
+        self.remove(doc["id"])
+        self._store(doc)
+        for term in self.terms[doc["id"]]:
+            insort(self.entries, (term, doc["id"]))
+
+    def remove(self, employee_id: str):
+        for term in self.terms.pop(employee_id, []):
+            pos = bisect_left(self.entries, (term, employee_id))
+            if pos < len(self.entries) and self.entries[pos] == (term, employee_id):
+                del self.entries[pos]
+        self.records.pop(employee_id, None)
+        self.names.pop(employee_id, None)
+        for token in self.folded.pop(employee_id, ()):
+            ids = self.token_ids.get(token)
+            if ids is None:
+                continue
+            ids.discard(employee_id)
+            if not ids:
+                del self.token_ids[token]
+                for gram in trigrams(token):
+                    self.trigram_tokens[gram].discard(token)
+                    if not self.trigram_tokens[gram]:
+                        del self.trigram_tokens[gram]
+
+    def _prefix_ids(self, prefix: str, cap: int) -> List[str]:
+        ids = []
+        entries = self.entries
+        pos = bisect_left(entries, (prefix, ""))
+        while pos < len(entries) and len(ids) < cap:
+            term, employee_id = entries[pos]
+            if not term.startswith(prefix):
+                break
+            ids.append(employee_id)
+            pos += 1
+        return ids
+
+    def _score(self, employee_id: str, tokens: List[str], phrase: str) -> Optional[int]:
+        if len(tokens) > 1:
+            terms = self.terms[employee_id]
+            if not all(any(term.startswith(token) for term in terms) for token in tokens):
+                return None
+        name, name_tokens = self.names[employee_id]
+        score = 0
+        if name.startswith(phrase):
+            score += 100
+        for token in tokens:
+            if token in name_tokens:
+                score += 20
+            elif any(t.startswith(token) for t in name_tokens):
+                score += 10
+            else:
+                score += 1
+        return score
+
+    def suggest(self, query: str, limit: int = 8) -> List[dict]:
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+        phrase = " ".join(tokens)
+        # Whole-name hits first, then the longest token: it is the most selective prefix
+        candidates = set(self._prefix_ids(phrase, MAX_CANDIDATES))
+        if len(tokens) > 1:
+            candidates.update(self._prefix_ids(max(tokens, key=len), MAX_CANDIDATES))
+        scored = []
+        for employee_id in candidates:
+            score = self._score(employee_id, tokens, phrase)
+            if score is not None:
+                scored.append((-score, self.records[employee_id].get("name") or "", employee_id))
+        best = heapq.nsmallest(min(limit, MAX_SUGGESTIONS), scored)
+        return [self.records[employee_id] for _, _, employee_id in best]
+
+    def _close_tokens(self, token: str) -> Dict[str, int]:
+        # q-gram filter over the vocabulary, then a bounded edit-distance check per surviving token
+        bound = max_distance(token)
+        grams = trigrams(token)
+        needed = max(1, len(grams) - 3 * bound)
+        overlap = Counter()
+        for gram in grams:
+            overlap.update(self.trigram_tokens.get(gram, ()))
+        close = {}
+        for candidate, shared in overlap.most_common(MAX_FUZZY_TOKENS):
+            if shared < needed:
+                break
+            distance = bounded_levenshtein(token, candidate, bound)
+            if distance <= bound:
+                close[candidate] = distance
+        return close
+
+    def fuzzy_ids(self, query: str, limit: int, exclude: Iterable[str] = ()) -> List[str]:
+        tokens = [fold(token) for token in tokenize(query)]
+        tokens = [token for token in tokens if max_distance(token) > 0]
+        if not tokens:
+            return []
+        close = [self._close_tokens(token) for token in tokens]
+        anchor = min(close, key=lambda matches: sum(len(self.token_ids[t]) for t in matches))
+        excluded = set(exclude)
+        scored = []
+        examined = 0
+        for anchor_token in sorted(anchor, key=anchor.get):
+            if examined >= MAX_CANDIDATES:
+                break
+            for employee_id in self.token_ids[anchor_token]:
+                if employee_id in excluded:
+                    continue
+                examined += 1
+                if examined > MAX_CANDIDATES:
+                    break
+                name_tokens = self.folded[employee_id]
+                total = 0
+                for matches in close:
+                    best = min((matches[t] for t in name_tokens if t in matches), default=None)
+                    if best is None:
+                        break
+                    total += best
+                else:
+                    excluded.add(employee_id)
+                    scored.append((total, self.records[employee_id].get("name") or "", employee_id))
+        return [employee_id for _, _, employee_id in heapq.nsmallest(limit, scored)]
+
+    def suggest_with_fuzzy(self, query: str, limit: int = 8) -> List[dict]:
+        # Exact and prefix matches always rank ahead of spelling-variant matches
+        results = self.suggest(query, limit)
+        if len(results) < limit:
+            seen = [record["id"] for record in results]
+            results.extend(self.records[employee_id] for employee_id in self.fuzzy_ids(query, limit - len(results), seen))
+        return results
+
+
+employee_index = EmployeeIndex()
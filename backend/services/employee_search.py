@@ -0,0 +1,91 @@
+from typing import Iterable, List, Optional
+from pymongo import UpdateOne
+from database import db
+import re
+import unicodedata
+
+SEARCH_FIELDS = ("name", "email", "position", "department")
+# Candidate rows scored per query; bounded so broad prefixes ("a") cost the same at any directory size
+SEARCH_CANDIDATES = 1000
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def normalize(text: str) -> str:
+    decomposed = unicodedata.normalize("NFKD", text or "")
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch)).lower()
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN_RE.findall(normalize(text))
+
+
+def search_terms(doc: dict) -> List[str]:
+    terms = set()
+    for field in SEARCH_FIELDS:
+        terms.update(tokenize(doc.get(field) or ""))
+    return sorted(terms)
+
+
+def search_query(search: str) -> dict:
+    tokens = tokenize(search)
+    if not tokens:
+        return {"id": None}
+    # Anchored, case-sensitive prefixes on pre-lowercased terms are index range scans
+    return {"$and": [{"search_terms": {"$regex": f"^{re.escape(token)}"}} for token in tokens]}
+
+
+def exact_query(search: str) -> dict:
+    return {"search_terms": {"$all": tokenize(search)}}
+
+
+async def search_candidates(search: str, department: Optional[str], projection: dict, sort) -> List[dict]:
+    # Sorted so a capped candidate set is the same on every run
+    extra = {"department": department} if department else {}
+    candidates = await db.employees.find({**search_query(search), **extra}, projection).sort(sort).limit(SEARCH_CANDIDATES).to_list(SEARCH_CANDIDATES)
+    if len(candidates) < SEARCH_CANDIDATES or not tokenize(search):
+        return candidates
+    # A broad prefix hit the cap: whole-word matches outrank prefix-only ones, so they must not be the ones cut off
+    exact = await db.employees.find({**exact_query(search), **extra}, projection).sort(sort).limit(SEARCH_CANDIDATES).to_list(SEARCH_CANDIDATES)
+    seen = {doc["id"] for doc in exact}
+    return exact + [doc for doc in candidates if doc["id"] not in seen][:SEARCH_CANDIDATES - len(exact)]
+
+
+def relevance(doc: dict, tokens: List[str], phrase: str) -> int:
+    name = normalize(doc.get("name", ""))
+    name_tokens = tokenize(name)
+    email_tokens = tokenize(doc.get("email", ""))
+    score = 100 if name.startswith(phrase) else 0
+    for token in tokens:
+        if token in name_tokens:
+            score += 20
+        elif any(t.startswith(token) for t in name_tokens):
+            score += 10
+        elif any(t.startswith(token) for t in email_tokens):
+            score += 5
+        else:
+            score += 1
+    return score
+
+
+def rank(docs: Iterable[dict], search: str) -> List[dict]:
+    tokens = tokenize(search)
+    phrase = " ".join(tokens)
+    return sorted(docs, key=lambda doc: (-relevance(doc, tokens, phrase), doc.get("name", ""), doc.get("id", "")))
+
+
+async def backfill_search_terms(only_missing: bool = True, batch_size: int = 1000) -> int:
+    query = {"search_terms": {"$exists": False}} if only_missing else {}
+    projection = {"_id": 1, **{field: 1 for field in SEARCH_FIELDS}}
+    updated = 0
+    batch = []
+    async for doc in db.employees.find(query, projection).batch_size(batch_size):
+        batch.append(UpdateOne({"_id": doc["_id"]}, {"$set": {"search_terms": search_terms(doc)}}))
+        if len(batch) >= batch_size:
+            await db.employees.bulk_write(batch, ordered=False)
+            updated += len(batch)
+            batch = []
+    if batch:
+        await db.employees.bulk_write(batch, ordered=False)
+        updated += len(batch)
+    return updated
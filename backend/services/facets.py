@@ -0,0 +1,75 @@
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+from database import db
+from services.albums import resolve_album_titles
+from services.changes import change_bus
+import asyncio
+import os
+import time
+
+# collection -> facet fields counted, and query parameter -> field filters accepted
+FACETS = {
+    "news": {"fields": ("category", "is_featured"), "filters": {"featured": "is_featured", "category": "category"}},
+    "photos": {"fields": ("category", "album_id"), "filters": {"album_id": "album_id", "category": "category"}},
+    "events": {"fields": ("event_type",), "filters": {"event_type": "event_type"}},
+    "employees": {"fields": ("department",), "filters": {"department": "department"}},
+}
+FACET_CACHE_TTL = float(os.environ.get("FACET_CACHE_TTL", 300))
+FACET_CACHE_MAX_ENTRIES = int(os.environ.get("FACET_CACHE_MAX_ENTRIES", 256))
+
+# (collection, sorted filter items) -> (expires_at, result); cleared per collection on writes
+_cache: "OrderedDict[Tuple[str, tuple], Tuple[float, dict]]" = OrderedDict()
+
+
+@change_bus.subscribe([*FACETS, "albums"])
+def invalidate_facets(events):
+    # Album titles label the photos album_id facet
+    for collection in {"photos" if event.collection == "albums" else event.collection for event in events}:
+        for key in [key for key in _cache if key[0] == collection]:
+            del _cache[key]
+
+
+def facet_filters(collection: str, params: Dict[str, Optional[object]]) -> Dict[str, object]:
+    accepted = FACETS[collection]["filters"]
+    unknown = [name for name, value in params.items() if value is not None and name not in accepted]
+    if unknown:
+        raise ValueError(f"Filter(s) not supported for {collection}: {', '.join(sorted(unknown))}")
+    return {accepted[name]: value for name, value in params.items() if value is not None}
+
+
+async def count_field(collection: str, field: str, match: dict) -> list:
+    pipeline = [
+        {"$match": match},
+        {"$group": {"_id": f"${field}", "count": {"$sum": 1}}},
+        {"$sort": {"count": -1, "_id": 1}},
+    ]
+    return [{"value": row["_id"], "count": row["count"]} async for row in getattr(db, collection).aggregate(pipeline)]
+
+
+async def compute_facets(collection: str, filters: Dict[str, object]) -> dict:
+    fields = FACETS[collection]["fields"]
+    # Each facet ignores its own filter, so selecting one department still shows every department's count
+    counts, total = await asyncio.gather(
+        asyncio.gather(*(count_field(collection, field, {k: v for k, v in filters.items() if k != field}) for field in fields)),
+        getattr(db, collection).count_documents(filters),
+    )
+    facets = dict(zip(fields, counts))
+    if "album_id" in facets:
+        titles = await resolve_album_titles(row["value"] for row in facets["album_id"])
+        for row in facets["album_id"]:
+            row["label"] = titles.get(row["value"])
+    return {"collection": collection, "total": total, "filters": filters, "facets": facets}
+
+
+async def get_facets(collection: str, filters: Dict[str, object]) -> dict:
+    key = (collection, tuple(sorted(filters.items())))
+    cached = _cache.get(key)
+    if cached and cached[0] > time.monotonic():
+        _cache.move_to_end(key)
+        return cached[1]
+    result = await compute_facets(collection, filters)
+    _cache[key] = (time.monotonic() + FACET_CACHE_TTL, result)
+    _cache.move_to_end(key)
+    while len(_cache) > FACET_CACHE_MAX_ENTRIES:
+        _cache.popitem(last=False)
+    return result
@@ -0,0 +1,47 @@
+from typing import List
+import re
+
+# Old (pre-1972) Indonesian spellings and common variants folded to one form: Boedi -> budi, Djoko -> joko
+_FOLDS = [
+    (re.compile(r"oe"), "u"),
+    (re.compile(r"dj"), "j"),
+    (re.compile(r"tj"), "c"),
+    (re.compile(r"sj"), "sy"),
+    (re.compile(r"ie$"), "i"),
+    (re.compile(r"(.)\1+"), r"\1"),
+]
+
+
+def fold(token: str) -> str:
+    for pattern, replacement in _FOLDS:
+        token = pattern.sub(replacement, token)
+    return token
+
+
+def trigrams(token: str) -> List[str]:
+    padded = f"  {token} "
+    return [padded[i:i + 3] for i in range(len(padded) - 2)]
+
+
+def max_distance(token: str) -> int:
+    if len(token) <= 3:
+        return 0
+    return 1 if len(token) <= 5 else 2
+
+
+def bounded_levenshtein(a: str, b: str, limit: int) -> int:
+    # Returns limit + 1 as soon as the distance is known to exceed limit
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        row_min = i
+        for j, cb in enumerate(b, 1):
+            value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb))
+            current.append(value)
+            row_min = min(row_min, value)
+        if row_min > limit:
+            return limit + 1
+        previous = current
+    return min(previous[-1], limit + 1)
@@ -0,0 +1,216 @@
+from concurrent.futures import ProcessPoolExecutor
+from collections import OrderedDict
+from fastapi.concurrency import run_in_threadpool
+from typing import Dict, Iterable, Optional, Tuple
+from PIL import Image, ImageOps, features
+from services.media import INLINE_TYPES, MEDIA_ROOT, media_store, get_media
+import asyncio
+import os
+import re
+import tempfile
+
+CACHE_ROOT = os.environ.get('MEDIA_CACHE_ROOT', os.path.join(MEDIA_ROOT, '.derivatives'))
+CACHE_MAX_BYTES = int(os.environ.get('MEDIA_CACHE_MAX_BYTES', str(1024 * 1024 * 1024)))
+IMAGE_WORKERS = int(os.environ.get('IMAGE_WORKERS', str(max((os.cpu_count() or 2) // 2, 1))))
+
+MAX_DIMENSION = 4096
+FITS = {"cover", "contain"}
+FORMATS = {"webp": "WEBP", "avif": "AVIF", "jpeg": "JPEG", "png": "PNG"}
+CONTENT_TYPES = {"webp": "image/webp", "avif": "image/avif", "jpeg": "image/jpeg", "png": "image/png"}
+# Names the cache owns under its shard directories; renders in flight carry TEMP_SUFFIX until renamed
+VARIANT_NAME_RE = re.compile(r"^[0-9a-f]{64}_\d+x\d+_[a-z]+\.[a-z]+$")
+TEMP_SUFFIX = ".tmp"
+
+# (width, height, fit, fmt) variants generated ahead of time for the hero background
+HERO_VARIANTS = [(w, None, "cover", fmt) for w in (640, 1280, 1920) for fmt in ("webp", "jpeg")]
+# Gallery grid thumbnails and lightbox size
+GALLERY_VARIANTS = [(400, 400, "cover", "webp"), (1280, None, "contain", "webp")]
+
+_executor: Optional[ProcessPoolExecutor] = None
+_inflight: Dict[str, asyncio.Future] = {}
+
+
+class VariantError(ValueError):
+    pass
+
+
+def _render(src_path: str, dest_path: str, width: Optional[int], height: Optional[int], fit: str, fmt: str):
+    # Runs in a worker process: keep it free of event-loop and database state
+    with Image.open(src_path) as img:
+        img = ImageOps.exif_transpose(img)
+        # No dimensions: a format-only variant keeps the source size and is just transcoded
+        if width or height:
+            src_w, src_h = img.size
+            width = width or max(round(src_w * height / src_h), 1)
+            height = height or max(round(src_h * width / src_w), 1)
+            if fit == "cover":
+                img = ImageOps.fit(img, (width, height), Image.LANCZOS)
+            else:
+                img.thumbnail((width, height), Image.LANCZOS)
+        if fmt == "jpeg" and img.mode not in ("RGB", "L"):
+            img = img.convert("RGB")
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(dest_path), suffix=TEMP_SUFFIX)
+        with os.fdopen(fd, "wb") as out:
+            img.save(out, FORMATS[fmt], quality=82)
+    os.replace(tmp_path, dest_path)
+    return os.path.getsize(dest_path)
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=IMAGE_WORKERS)
+    return _executor
+
+
+def shutdown_executor():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+async def run_in_process(func, *args):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_executor(), func, *args)
+
+
+class DerivativeCache:
+    def __init__(self, root: str, max_bytes: int):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.entries: "OrderedDict[str, int]" = OrderedDict()
+        self.total_bytes = 0
+        self.loaded = False
+
+    def path_for(self, key: str) -> str:
+        return os.path.join(self.root, key[:2], key)
+
+    def _load(self):
+        # Seed the LRU order from disk so restarts keep the existing cache. Only finished variants in the
+        # two-character shard directories count: GridFS originals and in-flight renders are not the cache's to evict
+        found = []
+        try:
+            shards = [name for name in os.listdir(self.root) if len(name) == 2]
+        except FileNotFoundError:
+            shards = []
+        for shard in shards:
+            shard_dir = os.path.join(self.root, shard)
+            if not os.path.isdir(shard_dir):
+                continue
+            for filename in os.listdir(shard_dir):
+                if filename.endswith(TEMP_SUFFIX) or not VARIANT_NAME_RE.match(filename):
+                    continue
+                try:
+                    stat = os.stat(os.path.join(shard_dir, filename))
+                except FileNotFoundError:
+                    continue
+                found.append((stat.st_atime, filename, stat.st_size))
+        for _, key, size in sorted(found):
+            self.entries[key] = size
+            self.total_bytes += size
+        self.loaded = True
+
+    def get(self, key: str) -> Optional[str]:
+        if not self.loaded:
+            self._load()
+        path = self.path_for(key)
+        if key in self.entries and os.path.exists(path):
+            self.entries.move_to_end(key)
+            return path
+        if key in self.entries:
+            self.total_bytes -= self.entries.pop(key)
+        return None
+
+    def add(self, key: str, size: int):
+        if key in self.entries:
+            self.total_bytes -= self.entries.pop(key)
+        self.entries[key] = size
+        self.total_bytes += size
+        while self.total_bytes > self.max_bytes and len(self.entries) > 1:
+            old_key, old_size = self.entries.popitem(last=False)
+            self.total_bytes -= old_size
+            try:
+                os.unlink(self.path_for(old_key))
+            except FileNotFoundError:
+                pass
+
+
+derivative_cache = DerivativeCache(CACHE_ROOT, CACHE_MAX_BYTES)
+
+
+def normalize_variant(width: Optional[int], height: Optional[int], fit: Optional[str], fmt: Optional[str]) -> Tuple[Optional[int], Optional[int], str, str]:
+    for value in (width, height):
+        if value is not None and not 0 < value <= MAX_DIMENSION:
+            raise VariantError(f"Dimensions must be between 1 and {MAX_DIMENSION}")
+    if fit is not None and width is None and height is None:
+        raise VariantError("fit requires a width or height")
+    fit = fit or "cover"
+    fmt = fmt or "webp"
+    if fit not in FITS:
+        raise VariantError(f"Unsupported fit '{fit}'")
+    if fmt not in FORMATS or (fmt in ("webp", "avif") and not features.check(fmt)):
+        raise VariantError(f"Unsupported format '{fmt}'")
+    if fit == "cover" and (width is None or height is None):
+        # Cover needs a box; with a single dimension it degrades to a proportional resize
+        fit = "contain"
+    return width, height, fit, fmt
+
+
+def variant_key(media_id: str, width: Optional[int], height: Optional[int], fit: str, fmt: str) -> str:
+    return f"{media_id}_{width or 0}x{height or 0}_{fit}.{fmt}"
+
+
+async def source_path(media_id: str) -> str:
+    path = media_store.path_for(media_id)
+    if path:
+        return path
+    # GridFS originals are materialized once into the cache directory for the workers
+    local = os.path.join(CACHE_ROOT, "originals", media_id)
+    if not os.path.exists(local):
+        media = await get_media(media_id)
+        os.makedirs(os.path.dirname(local), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(local), suffix=TEMP_SUFFIX)
+        with os.fdopen(fd, "wb") as out:
+            async for chunk in media_store.iter_range(media_id, 0, media["size"] - 1):
+                await run_in_threadpool(out.write, chunk)
+        os.replace(tmp_path, local)
+    return local
+
+
+async def _generate(media_id: str, key: str, width, height, fit, fmt) -> str:
+    src_path = await source_path(media_id)
+    dest_path = derivative_cache.path_for(key)
+    os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+    size = await run_in_process(_render, src_path, dest_path, width, height, fit, fmt)
+    derivative_cache.add(key, size)
+    return dest_path
+
+
+async def get_variant(media_id: str, width: Optional[int], height: Optional[int], fit: str, fmt: str) -> str:
+    key = variant_key(media_id, width, height, fit, fmt)
+    path = derivative_cache.get(key)
+    if path:
+        return path
+    # Collapse concurrent requests for the same variant onto one render
+    future = _inflight.get(key)
+    if future is None:
+        future = asyncio.ensure_future(_generate(media_id, key, width, height, fit, fmt))
+        _inflight[key] = future
+        future.add_done_callback(lambda _: _inflight.pop(key, None))
+    return await asyncio.shield(future)
+
+
+def content_type_for(fmt: str) -> str:
+    return CONTENT_TYPES[fmt]
+
+
+async def pregenerate_variants(media_id: str, variants: Iterable[Tuple[Optional[int], Optional[int], str, str]]):
+    media = await get_media(media_id)
+    if not media or media["content_type"] not in INLINE_TYPES:
+        return
+    for width, height, fit, fmt in variants:
+        try:
+            await get_variant(media_id, *normalize_variant(width, height, fit, fmt))
+        except (VariantError, OSError, Image.DecompressionBombError):
+            continue
@@ -0,0 +1,160 @@
+from collections import Counter
+from typing import Iterable, List, Optional
+from database import db
+from services.changes import change_bus, ChangeEvent
+from services.site_search import site_index, SOURCES, matches_source, document_terms
+from services.employee_index import employee_index, SUGGEST_FIELDS
+from services.employee_search import backfill_search_terms, search_terms, SEARCH_FIELDS
+from services.employee_import import backfill_email_keys, duplicate_email_keys, email_key
+from services.albums import cached_album_titles, invalidate_album_title, adjust_photo_count, reconcile_photo_counts
+import time
+
+REBUILD_TARGETS = ("site_search", "employee_index", "album_titles", "photo_counts", "search_terms", "email_keys")
+# Ids listed per problem in a consistency report; counts are always exact
+MAX_REPORTED_IDS = 20
+
+
+# Subscribers apply each change as a delta; rebuild_indexes is only for recovery
+@change_bus.subscribe(SOURCES)
+def update_site_search(events: List[ChangeEvent]):
+    site_index.apply_changes(events)
+
+
+@change_bus.subscribe(["employees"])
+def update_employee_index(events: List[ChangeEvent]):
+    employee_index.apply_changes(events)
+
+
+@change_bus.subscribe(["albums"])
+def update_album_titles(events: List[ChangeEvent]):
+    for event in events:
+        invalidate_album_title(event.id)
+
+
+@change_bus.subscribe(["photos"])
+async def update_photo_counts(events: List[ChangeEvent]):
+    deltas = Counter()
+    for event in events:
+        # Counts are shared in Mongo; the process that wrote the photo already adjusted them
+        if event.remote:
+            continue
+        before = (event.previous or {}).get("album_id")
+        after = (event.doc or {}).get("album_id")
+        if event.op == "insert":
+            deltas[after] += 1
+        elif event.op == "delete":
+            deltas[before] -= 1
+        elif event.previous is not None and event.doc is not None and before != after:
+            deltas[before] -= 1
+            deltas[after] += 1
+    for album_id, delta in deltas.items():
+        await adjust_photo_count(album_id, delta)
+
+
+async def rebuild_indexes(targets: Optional[Iterable[str]] = None) -> dict:
+    results = {}
+    for target in targets or REBUILD_TARGETS:
+        started = time.perf_counter()
+        if target == "site_search":
+            await site_index.load()
+            result = {"documents": len(site_index.docs)}
+        elif target == "employee_index":
+            await employee_index.load()
+            result = {"employees": len(employee_index.records)}
+        elif target == "album_titles":
+            invalidate_album_title()
+            result = {}
+        elif target == "photo_counts":
+            result = await reconcile_photo_counts()
+        elif target == "search_terms":
+            result = {"updated": await backfill_search_terms(only_missing=False)}
+        elif target == "email_keys":
+            result = {"updated": await backfill_email_keys(only_missing=False)}
+        else:
+            raise ValueError(f"Unknown index: {target}")
+        result["took_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        results[target] = result
+    return results
+
+
+def _diff(expected: set, actual: set, outdated: List[str]) -> dict:
+    missing, stale = expected - actual, actual - expected
+    return {
+        "ok": not (missing or stale or outdated),
+        "missing": len(missing),
+        "stale": len(stale),
+        "outdated": len(outdated),
+        "sample": sorted(missing)[:MAX_REPORTED_IDS] + sorted(stale)[:MAX_REPORTED_IDS] + outdated[:MAX_REPORTED_IDS],
+    }
+
+
+async def check_site_search(deep: bool) -> dict:
+    expected, outdated = set(), []
+    for kind, source in SOURCES.items():
+        fields = [field for field, _ in source["fields"]] + list(source["filter"])
+        async for doc in getattr(db, kind).find(source["filter"], {"_id": 0, "id": 1, **{field: 1 for field in fields}}):
+            expected.add(f"{kind}:{doc['id']}")
+            if deep and matches_source(kind, doc):
+                docno = site_index.docnos.get((kind, doc["id"]))
+                if docno is not None and site_index.docs[docno].terms != document_terms(kind, doc)[0]:
+                    outdated.append(f"{kind}:{doc['id']}")
+    actual = {f"{kind}:{doc_id}" for kind, doc_id in site_index.docnos}
+    return _diff(expected, actual, outdated)
+
+
+async def check_employee_index(deep: bool) -> dict:
+    expected, outdated = set(), []
+    async for doc in db.employees.find({}, {"_id": 0, **{field: 1 for field in SUGGEST_FIELDS}}):
+        expected.add(doc["id"])
+        record = employee_index.records.get(doc["id"])
+        if deep and record is not None and record != {field: doc.get(field) for field in SUGGEST_FIELDS}:
+            outdated.append(doc["id"])
+    return _diff(expected, set(employee_index.records), outdated)
+
+
+async def check_album_titles() -> dict:
+    cached = cached_album_titles()
+    titles = {}
+    async for album in db.albums.find({"id": {"$in": list(cached)}}, {"_id": 0, "id": 1, "title": 1}):
+        titles[album["id"]] = album.get("title")
+    outdated = sorted(album_id for album_id, title in cached.items() if titles.get(album_id) != title)
+    return {"ok": not outdated, "cached": len(cached), "outdated": len(outdated), "sample": outdated[:MAX_REPORTED_IDS]}
+
+
+async def check_search_terms() -> dict:
+    outdated = []
+    async for doc in db.employees.find({}, {"_id": 0, "id": 1, "search_terms": 1, **{field: 1 for field in SEARCH_FIELDS}}):
+        if doc.get("search_terms") != search_terms(doc):
+            outdated.append(doc["id"])
+    return {"ok": not outdated, "outdated": len(outdated), "sample": outdated[:MAX_REPORTED_IDS]}
+
+
+async def check_email_keys(deep: bool) -> dict:
+    outdated = []
+    if deep:
+        async for doc in db.employees.find({}, {"_id": 0, "id": 1, "email": 1, "email_key": 1}):
+            if doc.get("email_key") != email_key(doc.get("email")):
+                outdated.append(doc["id"])
+    # Case duplicates are left for an admin to merge: which record to keep is not derivable
+    duplicates, sample = await duplicate_email_keys(MAX_REPORTED_IDS)
+    return {"ok": not (outdated or duplicates), "outdated": len(outdated), "duplicates": duplicates,
+            "sample": outdated[:MAX_REPORTED_IDS] + sample}
+
+
+async def check_consistency(deep: bool = False) -> dict:
+    checks = {
+        "site_search": await check_site_search(deep),
+        "employee_index": await check_employee_index(deep),
+        "album_titles": await check_album_titles(),
+        "photo_counts": await reconcile_photo_counts(dry_run=True),
+        "email_keys": await check_email_keys(deep),
+    }
+    checks["photo_counts"]["ok"] = checks["photo_counts"]["drifted"] == 0
+    if deep:
+        checks["search_terms"] = await check_search_terms()
+    return {
+        "ok": all(check["ok"] for check in checks.values()),
+        "checks": checks,
+        "published": dict(change_bus.published),
+        "subscriber_failures": list(change_bus.failures),
+    }
@@ -0,0 +1,30 @@
+from pymongo import ASCENDING, DESCENDING
+from database import db
+
+
+async def ensure_indexes():
+    # Keyset pagination: every list sort key is (field, id) so pages are index range scans
+    await db.news.create_index([("id", ASCENDING)])
+    await db.news.create_index([("created_at", DESCENDING), ("id", DESCENDING)])
+    await db.news.create_index([("is_featured", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)])
+    await db.news.create_index([("category", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)])
+    await db.events.create_index([("id", ASCENDING)])
+    await db.events.create_index([("event_date", ASCENDING), ("id", ASCENDING)])
+    await db.events.create_index([("event_type", ASCENDING), ("event_date", ASCENDING), ("id", ASCENDING)])
+    await db.albums.create_index([("id", ASCENDING)])
+    await db.albums.create_index([("created_at", DESCENDING), ("id", DESCENDING)])
+    await db.photos.create_index([("id", ASCENDING)])
+    await db.photos.create_index([("created_at", DESCENDING), ("id", DESCENDING)])
+    await db.photos.create_index([("album_id", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)])
+    await db.photos.create_index([("category", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)])
+    await db.employees.create_index([("id", ASCENDING)])
+    await db.employees.create_index([("name", ASCENDING), ("id", ASCENDING)])
+    await db.employees.create_index([("department", ASCENDING), ("name", ASCENDING), ("id", ASCENDING)])
+    await db.employees.create_index([("search_terms", ASCENDING)])
+    # Bulk import upserts are keyed by the case-folded email
+    await db.employees.create_index([("email_key", ASCENDING)])
+    await db.pages.create_index([("id", ASCENDING)])
+    await db.pages.create_index([("title", ASCENDING), ("id", ASCENDING)])
+    await db.pages.create_index([("is_published", ASCENDING), ("title", ASCENDING), ("id", ASCENDING)])
+    await db.users.create_index([("name", ASCENDING), ("id", ASCENDING)])
+    await db.media.create_index([("id", ASCENDING)], unique=True)
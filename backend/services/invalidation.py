@@ -0,0 +1,144 @@
+from collections import Counter, deque
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from pymongo import CursorType
+from pymongo.errors import CollectionInvalid, OperationFailure
+from database import db
+import asyncio
+import os
+
+# auto: change streams on a replica set / sharded cluster, capped-collection tailing otherwise; off: single process
+INVALIDATION_BUS = os.environ.get("INVALIDATION_BUS", "auto").lower()
+INVALIDATION_LOG_BYTES = int(os.environ.get("INVALIDATION_LOG_BYTES", 8 * 1024 * 1024))
+LOG_COLLECTION = "invalidations"
+MAX_IDS_PER_MESSAGE = 1000
+RETRY_SECONDS = 1.0
+# Tailing resumes from the last message time; writers' clocks may disagree by this much
+CLOCK_SKEW = timedelta(seconds=5)
+# ChangeStreamFatalError / ChangeStreamHistoryLost: the resume token is unusable, start from now
+UNRESUMABLE_CODES = (280, 286)
+
+_capped_logs = set()
+
+
+async def ensure_log():
+    # Created capped before the first write: an insert into a missing collection would create a plain one
+    if db.name in _capped_logs:
+        return
+    try:
+        await db.create_collection(LOG_COLLECTION, capped=True, size=INVALIDATION_LOG_BYTES)
+    except CollectionInvalid:
+        pass
+    _capped_logs.add(db.name)
+
+
+async def broadcast(events: list, origin: str):
+    if INVALIDATION_BUS == "off" or not events:
+        return
+    await ensure_log()
+    now = datetime.now(timezone.utc)
+    grouped = {}
+    for event in events:
+        grouped.setdefault((event.collection, event.op), []).append(event.id)
+    messages = [
+        {"origin": origin, "collection": collection, "op": op, "ids": ids[i:i + MAX_IDS_PER_MESSAGE], "at": now}
+        for (collection, op), ids in grouped.items()
+        for i in range(0, len(ids), MAX_IDS_PER_MESSAGE)
+    ]
+    await db[LOG_COLLECTION].insert_many(messages, ordered=False)
+
+
+async def detect_mode() -> str:
+    if INVALIDATION_BUS in ("change_stream", "tail"):
+        return INVALIDATION_BUS
+    hello = await db.client.admin.command("hello")
+    return "change_stream" if hello.get("setName") or hello.get("msg") == "isdbgrid" else "tail"
+
+
+class InvalidationListener:
+    # Delivers other processes' changes to this process's bus; the bus re-reads the documents and
+    # runs its subscribers with remote=True, so in-process caches and indexes converge everywhere
+    def __init__(self, mode: Optional[str] = None):
+        self.mode = mode
+        self.task: Optional[asyncio.Task] = None
+        self.stats = Counter()
+        self.errors = deque(maxlen=20)
+        self.resume_token = None
+        self.since: Optional[datetime] = None
+        self.seen = deque(maxlen=MAX_IDS_PER_MESSAGE)
+        self.last_lag_ms: Optional[float] = None
+
+    def start(self, bus):
+        if INVALIDATION_BUS == "off" or self.task is not None:
+            return
+        self.since = datetime.now(timezone.utc) - CLOCK_SKEW
+        self.task = asyncio.create_task(self.run(bus))
+
+    async def stop(self):
+        if self.task is None:
+            return
+        self.task.cancel()
+        try:
+            await self.task
+        except asyncio.CancelledError:
+            pass
+        self.task = None
+
+    async def run(self, bus):
+        while True:
+            try:
+                await ensure_log()
+                self.mode = self.mode or await detect_mode()
+                if self.mode == "change_stream":
+                    await self.watch(bus)
+                else:
+                    await self.tail(bus)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                if isinstance(e, OperationFailure) and e.code in UNRESUMABLE_CODES:
+                    self.resume_token = None
+                self.stats["errors"] += 1
+                self.errors.append({"error": repr(e), "at": datetime.now(timezone.utc).isoformat()})
+            await asyncio.sleep(RETRY_SECONDS)
+
+    async def watch(self, bus):
+        pipeline = [{"$match": {"operationType": "insert"}}]
+        async with db[LOG_COLLECTION].watch(pipeline, resume_after=self.resume_token) as stream:
+            async for change in stream:
+                self.resume_token = stream.resume_token
+                await self.deliver(bus, change["fullDocument"])
+
+    async def tail(self, bus):
+        cursor = db[LOG_COLLECTION].find({"at": {"$gte": self.since}}, cursor_type=CursorType.TAILABLE_AWAIT)
+        # A tailable cursor with no match dies immediately; run() re-opens it after a short pause
+        while cursor.alive:
+            async for message in cursor:
+                self.since = max(self.since, message["at"].replace(tzinfo=timezone.utc) - CLOCK_SKEW)
+                await self.deliver(bus, message)
+
+    async def deliver(self, bus, message: dict):
+        # Re-opened tails overlap by CLOCK_SKEW, so recently delivered messages are skipped
+        if message["_id"] in self.seen:
+            return
+        self.seen.append(message["_id"])
+        if message.get("origin") == bus.origin:
+            self.stats["own"] += 1
+            return
+        self.stats["received"] += 1
+        self.last_lag_ms = round((datetime.now(timezone.utc) - message["at"].replace(tzinfo=timezone.utc)).total_seconds() * 1000, 1)
+        await bus.receive(message["collection"], message["op"], message.get("ids") or [None])
+
+    def snapshot(self) -> dict:
+        return {
+            "mode": self.mode if self.task is not None else "off",
+            "running": self.task is not None and not self.task.done(),
+            "received": self.stats["received"],
+            "own": self.stats["own"],
+            "errors": self.stats["errors"],
+            "last_lag_ms": self.last_lag_ms,
+            "recent_errors": list(self.errors),
+        }
+
+
+invalidation_listener = InvalidationListener()
@@ -0,0 +1,246 @@
+from fastapi import UploadFile
+from fastapi.concurrency import run_in_threadpool
+from motor.motor_asyncio import AsyncIOMotorGridFSBucket
+from typing import AsyncIterator, Optional, Tuple
+from database import db
+from datetime import datetime, timezone
+import hashlib
+import os
+import re
+import shutil
+import tempfile
+
+MEDIA_BACKEND = os.environ.get('MEDIA_BACKEND', 'local')
+MEDIA_ROOT = os.environ.get('MEDIA_ROOT', os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'media'))
+MEDIA_PUBLIC_URL = os.environ.get('MEDIA_PUBLIC_URL', '').rstrip('/')
+CHUNK_SIZE = 1024 * 1024
+
+MEDIA_ID_RE = re.compile(r"^[0-9a-f]{64}$")
+MEDIA_URL_RE = re.compile(r"/api/media/([0-9a-f]{64})")
+
+# Raster formats browsers never execute; anything else (SVG, HTML, PDF, ...) is only served as a download
+INLINE_TYPES = {"image/jpeg", "image/png", "image/gif", "image/webp", "image/avif", "image/bmp"}
+SIGNATURES = [
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+    (b"BM", "image/bmp"),
+]
+SNIFF_BYTES = 16
+
+
+def media_url(media_id: str) -> str:
+    return f"{MEDIA_PUBLIC_URL}/api/media/{media_id}"
+
+
+def media_id_from_url(url: Optional[str]) -> Optional[str]:
+    if not url:
+        return None
+    match = MEDIA_URL_RE.search(url)
+    return match.group(1) if match else None
+
+
+def is_media_id(value: str) -> bool:
+    return bool(MEDIA_ID_RE.match(value))
+
+
+def sniff_content_type(head: bytes) -> Optional[str]:
+    for magic, content_type in SIGNATURES:
+        if head.startswith(magic):
+            return content_type
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp"
+    if head[4:8] == b"ftyp" and head[8:12] in (b"avif", b"avis"):
+        return "image/avif"
+    return None
+
+
+def stored_content_type(head: bytes, claimed: Optional[str]) -> str:
+    # The bytes decide for images; a claimed type is kept for anything else, which is never served inline
+    sniffed = sniff_content_type(head)
+    if sniffed:
+        return sniffed
+    claimed = (claimed or "").split(";")[0].strip().lower()
+    if not claimed or claimed in INLINE_TYPES:
+        # Claims to be an image the bytes do not match
+        return "application/octet-stream"
+    return claimed
+
+
+def serving_headers(content_type: str) -> dict:
+    headers = {"X-Content-Type-Options": "nosniff"}
+    if content_type not in INLINE_TYPES:
+        # Uploaded HTML or SVG opened from the API origin would run script there
+        headers["Content-Disposition"] = "attachment"
+        headers["Content-Security-Policy"] = "sandbox"
+    return headers
+
+
+class LocalMediaStore:
+    name = "local"
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def path_for(self, media_id: str) -> str:
+        return os.path.join(self.root, media_id[:2], media_id)
+
+    async def exists(self, media_id: str) -> bool:
+        return os.path.exists(self.path_for(media_id))
+
+    async def put_file(self, media_id: str, src_path: str):
+        dest = self.path_for(media_id)
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        # Same-filesystem rename keeps the write atomic for concurrent readers
+        await run_in_threadpool(shutil.move, src_path, dest)
+
+    async def iter_range(self, media_id: str, start: int, end: int) -> AsyncIterator[bytes]:
+        with open(self.path_for(media_id), "rb") as fh:
+            await run_in_threadpool(fh.seek, start)
+            remaining = end - start + 1
+            while remaining > 0:
+                chunk = await run_in_threadpool(fh.read, min(CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                yield chunk
+
+
+class GridFSMediaStore:
+    name = "gridfs"
+
+    def __init__(self, bucket: AsyncIOMotorGridFSBucket):
+        self.bucket = bucket
+
+    def path_for(self, media_id: str) -> Optional[str]:
+        return None
+
+    async def exists(self, media_id: str) -> bool:
+        return await db["media_files.files"].find_one({"_id": media_id}, {"_id": 1}) is not None
+
+    async def put_file(self, media_id: str, src_path: str):
+        with open(src_path, "rb") as fh:
+            grid_in = self.bucket.open_upload_stream_with_id(media_id, media_id, chunk_size_bytes=255 * 1024)
+            while True:
+                chunk = await run_in_threadpool(fh.read, CHUNK_SIZE)
+                if not chunk:
+                    break
+                await grid_in.write(chunk)
+            await grid_in.close()
+        os.unlink(src_path)
+
+    async def iter_range(self, media_id: str, start: int, end: int) -> AsyncIterator[bytes]:
+        grid_out = await self.bucket.open_download_stream(media_id)
+        grid_out.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = await grid_out.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+def _create_store():
+    if MEDIA_BACKEND == "gridfs":
+        return GridFSMediaStore(AsyncIOMotorGridFSBucket(db, bucket_name="media_files"))
+    return LocalMediaStore(MEDIA_ROOT)
+
+
+media_store = _create_store()
+
+
+def _staging_dir() -> Optional[str]:
+    # Stage next to the final location so the local store can rename instead of copy
+    if media_store.name == "local":
+        staging = os.path.join(MEDIA_ROOT, ".staging")
+        os.makedirs(staging, exist_ok=True)
+        return staging
+    return None
+
+
+async def _upload_chunks(file: UploadFile) -> AsyncIterator[bytes]:
+    while True:
+        chunk = await file.read(CHUNK_SIZE)
+        if not chunk:
+            break
+        yield chunk
+
+
+async def _bytes_chunks(data: bytes) -> AsyncIterator[bytes]:
+    for offset in range(0, len(data), CHUNK_SIZE):
+        yield data[offset:offset + CHUNK_SIZE]
+
+
+async def store_upload(file: UploadFile) -> dict:
+    return await store_stream(_upload_chunks(file), file.content_type, file.filename)
+
+
+async def store_bytes(data: bytes, content_type: Optional[str], filename: Optional[str] = None) -> dict:
+    return await store_stream(_bytes_chunks(data), content_type, filename)
+
+
+async def store_stream(chunks: AsyncIterator[bytes], content_type: Optional[str], filename: Optional[str]) -> dict:
+    digest = hashlib.sha256()
+    size = 0
+    head = b""
+    fd, tmp_path = tempfile.mkstemp(dir=_staging_dir())
+    try:
+        with os.fdopen(fd, "wb") as tmp:
+            async for chunk in chunks:
+                if len(head) < SNIFF_BYTES:
+                    head += chunk[:SNIFF_BYTES - len(head)]
+                digest.update(chunk)
+                size += len(chunk)
+                await run_in_threadpool(tmp.write, chunk)
+        media_id = digest.hexdigest()
+        if await media_store.exists(media_id):
+            os.unlink(tmp_path)
+        else:
+            await media_store.put_file(media_id, tmp_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+    media_doc = {
+        "id": media_id,
+        "content_type": stored_content_type(head, content_type),
+        "size": size,
+        "filename": filename,
+        "backend": media_store.name,
+        "created_at": datetime.now(timezone.utc).isoformat()
+    }
+    result = await db.media.update_one({"id": media_id}, {"$setOnInsert": media_doc}, upsert=True)
+    if result.upserted_id is None:
+        # Exact duplicate: hand back the object that is already stored
+        existing = await get_media(media_id)
+        return {**existing, "url": media_url(media_id), "duplicate": True}
+    return {**media_doc, "url": media_url(media_id), "duplicate": False}
+
+
+async def get_media(media_id: str) -> Optional[dict]:
+    return await db.media.find_one({"id": media_id}, {"_id": 0})
+
+
+# Single "bytes=" ranges only; multipart ranges fall back to a full response
+def parse_range(range_header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    if not range_header:
+        return None
+    unit, _, spec = range_header.partition("=")
+    if unit.strip() != "bytes" or "," in spec:
+        return None
+    first, _, last = spec.strip().partition("-")
+    if first:
+        start = int(first)
+        end = int(last) if last else size - 1
+    elif last:
+        start = max(size - int(last), 0)
+        end = size - 1
+    else:
+        raise ValueError("empty range")
+    end = min(end, size - 1)
+    if start > end or start >= size:
+        raise ValueError("unsatisfiable range")
+    return start, end
@@ -0,0 +1,104 @@
+from typing import Dict, List, Tuple
+from database import db
+from models.menu import MenuItemResponse
+from services.changes import change_bus
+from services.snapshot import content_snapshot
+import asyncio
+import json
+import os
+import time
+
+# Backstop only: writes from this and other workers rebuild the tree through the change bus
+MENU_TREE_TTL = float(os.environ.get("MENU_TREE_TTL", 60))
+MAX_MENU_ITEMS = 200
+
+
+def build_menu_tree(items: List[dict]) -> List[dict]:
+    # Build 3-level tree: root -> children -> grandchildren
+    items_map = {item["id"]: {**item, "children": []} for item in items}
+    root_items = []
+
+    for item in items:
+        pid = item.get("parent_id")
+        if not pid:
+            root_items.append(items_map[item["id"]])
+        elif pid in items_map:
+            items_map[pid]["children"].append(items_map[item["id"]])
+
+    # Sort children at every level
+    for item_id, item in items_map.items():
+        item["children"].sort(key=lambda x: x.get("order", 0))
+    root_items.sort(key=lambda x: x.get("order", 0))
+    return root_items
+
+
+class MenuTree:
+    __slots__ = ("items", "body", "version", "expires_at")
+
+    def __init__(self, items: List[dict], version: int):
+        self.items = items
+        # Encoded exactly as FastAPI's JSONResponse would, so handlers can return the bytes untouched
+        self.body = json.dumps(items, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode()
+        self.version = version
+        self.expires_at = time.monotonic() + MENU_TREE_TTL
+
+
+class MenuTreeCache:
+    # The navigation tree materialized once per menu version, for the visible-only and full variants
+    def __init__(self):
+        self.version = 0
+        self.trees: Dict[bool, MenuTree] = {}
+        self.builds = 0
+        self._lock = asyncio.Lock()
+
+    def invalidate(self):
+        self.version += 1
+        self.trees.clear()
+
+    async def get(self, visible_only: bool) -> MenuTree:
+        tree = self.trees.get(visible_only)
+        if tree is not None and tree.expires_at > time.monotonic():
+            return tree
+        async with self._lock:
+            tree = self.trees.get(visible_only)
+            if tree is None or tree.expires_at <= time.monotonic():
+                tree = await self.build(visible_only)
+        return tree
+
+    async def build(self, visible_only: bool) -> MenuTree:
+        version = self.version
+        query = {"is_visible": True} if visible_only else {}
+        items = await db.menus.find(query, {"_id": 0}).sort("order", 1).to_list(MAX_MENU_ITEMS)
+        tree = MenuTree([MenuItemResponse(**item).model_dump(mode="json") for item in build_menu_tree(items)], version)
+        self.builds += 1
+        # A write that landed while reading must not be masked by this (older) tree
+        if version == self.version:
+            self.trees[visible_only] = tree
+        return tree
+
+
+menu_trees = MenuTreeCache()
+
+
+@change_bus.subscribe(["menus"])
+def invalidate_menu_tree(events):
+    menu_trees.invalidate()
+
+
+async def get_menu_tree(visible_only: bool) -> Tuple[List[dict], bytes]:
+    tree = await menu_trees.get(visible_only)
+    return tree.items, tree.body
+
+
+def menu_snapshot_name(visible_only: bool) -> str:
+    return "menus_visible" if visible_only else "menus_all"
+
+
+@content_snapshot.section(menu_snapshot_name(True), ["menus"])
+async def visible_menu_body() -> bytes:
+    return (await menu_trees.get(True)).body
+
+
+@content_snapshot.section(menu_snapshot_name(False), ["menus"])
+async def all_menu_body() -> bytes:
+    return (await menu_trees.get(False)).body
@@ -0,0 +1,65 @@
+from fastapi import HTTPException, Response
+from typing import List, Optional, Tuple
+import base64
+import json
+
+MAX_PAGE_SIZE = 500
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+CURSOR_VALUE_TYPES = (str, int, float, bool)
+
+SortSpec = List[Tuple[str, int]]
+
+
+def clamp_limit(limit: int) -> int:
+    return max(1, min(limit, MAX_PAGE_SIZE))
+
+
+def encode_cursor(values: list) -> str:
+    raw = json.dumps(values, separators=(",", ":"), default=str).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(token: str, sort: SortSpec) -> list:
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        values = json.loads(raw)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not isinstance(values, list) or len(values) != len(sort):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    # Values land in $gt/$lt/equality clauses: a crafted object there would be read as a query operator
+    if not all(value is None or isinstance(value, CURSOR_VALUE_TYPES) for value in values):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return values
+
+
+def keyset_filter(sort: SortSpec, values: list) -> dict:
+    # (a, b) > (va, vb)  ==  a > va OR (a == va AND b > vb), honouring each field's direction
+    clauses = []
+    for i, (field, direction) in enumerate(sort):
+        clause = {sort[j][0]: values[j] for j in range(i)}
+        clause[field] = {"$gt" if direction == 1 else "$lt": values[i]}
+        clauses.append(clause)
+    return {"$or": clauses}
+
+
+def apply_cursor(query: dict, sort: SortSpec, cursor: Optional[str]) -> dict:
+    if not cursor:
+        return query
+    condition = keyset_filter(sort, decode_cursor(cursor, sort))
+    return {"$and": [query, condition]} if query else condition
+
+
+def finish_page(docs: list, sort: SortSpec, limit: int, response: Response) -> list:
+    # Callers fetch limit + 1 rows; the extra row only signals that another page exists
+    if len(docs) > limit:
+        docs = docs[:limit]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor([docs[-1].get(field) for field, _ in sort])
+    return docs
+
+
+async def fetch_page(collection, query: dict, sort: SortSpec, limit: int, cursor: Optional[str],
+                     response: Response, projection: Optional[dict] = None) -> list:
+    limit = clamp_limit(limit)
+    docs = await collection.find(apply_cursor(query, sort, cursor), projection or {"_id": 0}).sort(sort).limit(limit + 1).to_list(limit + 1)
+    return finish_page(docs, sort, limit, response)
@@ -0,0 +1,36 @@
+from fastapi import HTTPException, Response
+from pydantic import BaseModel
+from typing import Dict, List, Optional, Type
+from services.pagination import SortSpec
+from services.serialization import dumps, json_response
+
+
+def parse_fields(fields: Optional[str], view: Optional[str], model: Type[BaseModel],
+                 views: Optional[Dict[str, List[str]]] = None) -> Optional[List[str]]:
+    if fields:
+        requested = [field.strip() for field in fields.split(",") if field.strip()]
+        unknown = [field for field in requested if field not in model.model_fields]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    elif view:
+        if not views or view not in views:
+            raise HTTPException(status_code=400, detail=f"Unknown view '{view}'")
+        requested = views[view]
+    else:
+        return None
+    return ["id"] + [field for field in requested if field != "id"]
+
+
+def build_projection(field_list: List[str], sort: SortSpec = ()) -> dict:
+    # Sort keys ride along so the next-page cursor can still be built from the last row
+    projection = {"_id": 0}
+    for field in field_list:
+        projection[field] = 1
+    for field, _ in sort:
+        projection[field] = 1
+    return projection
+
+
+def partial_response(docs: list, response: Response) -> Response:
+    # Partial documents cannot satisfy the full response_model, so skip validation entirely
+    return json_response(dumps(docs), response)
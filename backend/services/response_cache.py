@@ -0,0 +1,229 @@
+from collections import Counter, OrderedDict, defaultdict
+from typing import Dict, FrozenSet, List, Optional, Tuple
+from services.changes import change_bus
+from services.conditional import cache_key, etag_matches, send_not_modified
+from services.compression import COMPRESSION_MIN_BYTES, choose_encoding, compress, encoded_headers, is_compressible
+import asyncio
+import os
+import time
+
+RESPONSE_CACHE_TTL = float(os.environ.get("RESPONSE_CACHE_TTL", 60))
+RESPONSE_CACHE_MAX_BYTES = int(os.environ.get("RESPONSE_CACHE_MAX_BYTES", 32 * 1024 * 1024))
+RESPONSE_CACHE_MAX_ENTRY_BYTES = int(os.environ.get("RESPONSE_CACHE_MAX_ENTRY_BYTES", 1024 * 1024))
+RESPONSE_CACHE_ENABLED = os.environ.get("RESPONSE_CACHE_ENABLED", "true").lower() != "false"
+
+# Public GET path -> collections whose writes invalidate it
+CACHED_ROUTES: Dict[str, FrozenSet[str]] = {
+    "/api/settings/hero": frozenset({"settings"}),
+    "/api/settings/ticker": frozenset({"settings"}),
+    "/api/news": frozenset({"news"}),
+    "/api/events": frozenset({"events"}),
+    "/api/photos": frozenset({"photos", "albums"}),
+    "/api/employees": frozenset({"employees"}),
+    "/api/menus": frozenset({"menus"}),
+    "/api/home": frozenset({"settings", "news", "events", "photos", "employees", "menus"}),
+}
+# Response headers that belong to one exchange rather than to the cached representation
+_UNCACHED_HEADERS = {b"set-cookie", b"date", b"server", b"content-length"}
+
+
+class CacheEntry:
+    # variants holds compressed copies of body, made on first request per encoding
+    __slots__ = ("status", "headers", "body", "tags", "expires_at", "size", "variants")
+
+    def __init__(self, status: int, headers: List[Tuple[bytes, bytes]], body: bytes, tags: FrozenSet[str], ttl: float):
+        self.status = status
+        self.headers = headers
+        self.body = body
+        self.tags = tags
+        self.expires_at = time.monotonic() + ttl
+        self.size = len(body) + sum(len(k) + len(v) for k, v in headers)
+        self.variants: Dict[str, bytes] = {}
+
+
+class ResponseCache:
+    # LRU over serialized responses, bounded by total bytes, with a TTL as a backstop to explicit invalidation
+    def __init__(self, max_bytes: int = RESPONSE_CACHE_MAX_BYTES, ttl: float = RESPONSE_CACHE_TTL):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self.by_tag: Dict[str, set] = defaultdict(set)
+        # Bumped on every invalidation so a response rendered before a write is never stored after it
+        self.generations: Counter = Counter()
+        self.bytes = 0
+        self.stats = Counter()
+        self.route_stats: Dict[str, Counter] = defaultdict(Counter)
+
+    def get(self, key: str, route: str) -> Optional[CacheEntry]:
+        entry = self.entries.get(key)
+        if entry is not None and entry.expires_at <= time.monotonic():
+            self._drop(key)
+            self.stats["expired"] += 1
+            entry = None
+        outcome = "hits" if entry is not None else "misses"
+        self.stats[outcome] += 1
+        self.route_stats[route][outcome] += 1
+        if entry is not None:
+            self.entries.move_to_end(key)
+        return entry
+
+    def generation(self, tags: FrozenSet[str]) -> Tuple[int, ...]:
+        return tuple(self.generations[tag] for tag in sorted(tags))
+
+    def put(self, key: str, entry: CacheEntry, generation: Tuple[int, ...]) -> bool:
+        if entry.size > RESPONSE_CACHE_MAX_ENTRY_BYTES or self.generation(entry.tags) != generation:
+            self.stats["skipped"] += 1
+            return False
+        self._drop(key)
+        self.entries[key] = entry
+        self.bytes += entry.size
+        for tag in entry.tags:
+            self.by_tag[tag].add(key)
+        self.stats["stores"] += 1
+        while self.bytes > self.max_bytes and self.entries:
+            self._drop(next(iter(self.entries)))
+            self.stats["evictions"] += 1
+        return True
+
+    def add_variant(self, key: str, entry: CacheEntry, encoding: str, body: bytes):
+        entry.variants[encoding] = body
+        # Entries already evicted or invalidated keep the variant only for the response in flight
+        if self.entries.get(key) is not entry:
+            return
+        entry.size += len(body)
+        self.bytes += len(body)
+        self.stats["compressions"] += 1
+        while self.bytes > self.max_bytes and self.entries:
+            self._drop(next(iter(self.entries)))
+            self.stats["evictions"] += 1
+
+    def _drop(self, key: str):
+        entry = self.entries.pop(key, None)
+        if entry is None:
+            return
+        self.bytes -= entry.size
+        for tag in entry.tags:
+            self.by_tag[tag].discard(key)
+
+    def invalidate(self, tag: str) -> int:
+        self.generations[tag] += 1
+        keys = list(self.by_tag.pop(tag, ()))
+        for key in keys:
+            self._drop(key)
+        self.stats["invalidations"] += len(keys)
+        return len(keys)
+
+    def clear(self):
+        for tag in list(self.generations) + list(self.by_tag):
+            self.generations[tag] += 1
+        self.entries.clear()
+        self.by_tag.clear()
+        self.bytes = 0
+
+    def snapshot(self) -> dict:
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {
+            "enabled": RESPONSE_CACHE_ENABLED,
+            "entries": len(self.entries),
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+            "ttl_seconds": self.ttl,
+            "hit_ratio": round(self.stats["hits"] / lookups, 4) if lookups else None,
+            **{name: self.stats[name] for name in ("hits", "misses", "coalesced", "stores", "skipped", "expired", "evictions", "invalidations", "compressions")},
+            "routes": {route: dict(counts) for route, counts in self.route_stats.items()},
+        }
+
+
+response_cache = ResponseCache()
+
+
+@change_bus.subscribe({tag for tags in CACHED_ROUTES.values() for tag in tags})
+def invalidate_responses(events):
+    for collection in {event.collection for event in events}:
+        response_cache.invalidate(collection)
+
+
+class ResponseCacheMiddleware:
+    def __init__(self, app, cache: ResponseCache = response_cache):
+        self.app = app
+        self.cache = cache
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    async def __call__(self, scope, receive, send):
+        tags = CACHED_ROUTES.get(scope.get("path")) if scope["type"] == "http" and scope["method"] == "GET" else None
+        if not tags or not RESPONSE_CACHE_ENABLED:
+            return await self.app(scope, receive, send)
+        headers = dict(scope["headers"])
+        # Signed-in (admin) requests always read through, so editors never see a cached copy
+        if b"authorization" in headers or b"no-cache" in headers.get(b"cache-control", b""):
+            return await self.app(scope, receive, send)
+
+        path = scope["path"]
+        key = cache_key(path, scope.get("query_string", b""))
+        entry = self.cache.get(key, path)
+        if entry is None and key in self._inflight:
+            # Single-flight: concurrent misses wait for the first render instead of all hitting Mongo
+            await asyncio.shield(self._inflight[key])
+            entry = self.cache.entries.get(key)
+            if entry is not None:
+                self.cache.stats["coalesced"] += 1
+        if entry is not None:
+            etag = dict(entry.headers).get(b"etag")
+            if etag and etag_matches(headers.get(b"if-none-match", b"").decode("latin-1"), etag.decode()):
+                return await send_not_modified(send, etag.decode(), None, dict(entry.headers).get(b"cache-control", b"no-cache").decode())
+            return await self.send_entry(send, key, entry, b"HIT", headers.get(b"accept-encoding"))
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            await self.render(scope, receive, send, key, tags)
+        finally:
+            self._inflight.pop(key, None)
+            future.set_result(None)
+
+    async def render(self, scope, receive, send, key: str, tags: FrozenSet[str]):
+        generation = self.cache.generation(tags)
+        accept_encoding = dict(scope["headers"]).get(b"accept-encoding")
+        start = {}
+        chunks = []
+        size = 0
+        streaming = False
+
+        async def capture(message):
+            nonlocal size, streaming
+            if message["type"] == "http.response.start":
+                start.update(message)
+                return
+            if message["type"] != "http.response.body" or streaming:
+                return await send(message)
+            chunks.append(message.get("body", b""))
+            size += len(chunks[-1])
+            more = message.get("more_body", False)
+            if start["status"] != 200 or size > RESPONSE_CACHE_MAX_ENTRY_BYTES:
+                # Not cacheable: release what was held and stream the rest through untouched
+                streaming = True
+                await send({**start, "headers": [*start.get("headers", []), (b"x-cache", b"MISS")]})
+                return await send({"type": "http.response.body", "body": b"".join(chunks), "more_body": more})
+            if more:
+                return
+            headers = [(k, v) for k, v in start.get("headers", []) if k.lower() not in _UNCACHED_HEADERS]
+            entry = CacheEntry(200, headers, b"".join(chunks), tags, self.cache.ttl)
+            self.cache.put(key, entry, generation)
+            await self.send_entry(send, key, entry, b"MISS", accept_encoding)
+
+        await self.app(scope, receive, capture)
+
+    async def send_entry(self, send, key: str, entry: CacheEntry, state: bytes, accept_encoding: Optional[bytes]):
+        encoding = choose_encoding(accept_encoding.decode("latin-1")) if accept_encoding else None
+        if encoding and len(entry.body) >= COMPRESSION_MIN_BYTES and is_compressible(entry.headers):
+            # Compressed once per entry (i.e. per content version) and encoding, then reused by every hit
+            body = entry.variants.get(encoding)
+            if body is None:
+                body = compress(entry.body, encoding, cached=True)
+                self.cache.add_variant(key, entry, encoding, body)
+            headers = [*encoded_headers(entry.headers, encoding, len(body)), (b"x-cache", state)]
+        else:
+            body = entry.body
+            headers = [*entry.headers, (b"content-length", str(len(body)).encode()), (b"x-cache", state)]
+        await send({"type": "http.response.start", "status": entry.status, "headers": headers})
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,322 @@
+from collections import defaultdict
+from html import escape, unescape
+from typing import Dict, Iterable, List, Optional, Tuple
+from database import db
+from services.employee_search import normalize, tokenize
+from bisect import bisect_left
+from operator import itemgetter
+import asyncio
+import heapq
+import math
+import re
+import time
+
+# Latency target: p99 under 25 ms for /api/search at ~5k news, 500 pages, 2k events and
+# 10k employees on one worker (benchmarks/bench_site_search.py). Everything is in memory;
+# Mongo is only read at startup and on writes.
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+# Weighted term frequency per field, so a title hit outranks the same word deep in a body
+SOURCES = {
+    "news": {
+        "filter": {},
+        "fields": (("title", 3.0), ("summary", 2.0), ("content", 1.0)),
+        "body": ("summary", "content"),
+        "meta": ("category", "created_at"),
+    },
+    "pages": {
+        "filter": {"is_published": True},
+        "fields": (("title", 3.0), ("description", 2.0), ("meta_description", 1.5), ("blocks", 1.0)),
+        "body": ("description", "blocks"),
+        "meta": ("slug",),
+    },
+    "events": {
+        "filter": {},
+        "fields": (("title", 3.0), ("description", 1.0), ("location", 1.0), ("event_type", 0.5)),
+        "body": ("description", "location"),
+        "meta": ("event_date", "event_type", "location"),
+    },
+    "employees": {
+        "filter": {},
+        "fields": (("name", 3.0), ("position", 1.5), ("department", 1.5), ("email", 1.0)),
+        "body": ("position", "department", "email"),
+        "meta": ("position", "department", "email"),
+    },
+}
+TITLE_FIELDS = {"news": "title", "pages": "title", "events": "title", "employees": "name"}
+MAX_GROUP_RESULTS = 20
+# Vocabulary terms the last (still being typed) query word may expand to
+MAX_PREFIX_EXPANSIONS = 30
+PREFIX_WEIGHT = 0.7
+SNIPPET_WORDS = 30
+MAX_SNIPPET_SOURCE = 20_000
+
+_TAG_RE = re.compile(r"<[^>]+>")
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+# Block keys that hold links, styling or layout rather than readable text
+_SKIP_KEYS = {"id", "type", "url", "image_url", "button_link", "link", "href", "icon", "color", "background", "style", "order", "overlay", "variant", "align"}
+
+
+def _strings(value, key: Optional[str] = None) -> Iterable[str]:
+    if key in _SKIP_KEYS:
+        return
+    if isinstance(value, str):
+        if not value.startswith(("http://", "https://", "data:", "/", "#")):
+            yield value
+    elif isinstance(value, dict):
+        for k, v in value.items():
+            yield from _strings(v, k)
+    elif isinstance(value, list):
+        for item in value:
+            yield from _strings(item)
+
+
+def strip_html(text: str) -> str:
+    return unescape(_TAG_RE.sub(" ", text)) if "<" in text else text
+
+
+def block_text(blocks: List[dict]) -> str:
+    ordered = sorted((b for b in blocks or [] if isinstance(b, dict)), key=lambda b: b.get("order", 0))
+    return "\n".join(strip_html(text) for block in ordered for text in _strings(block.get("content") or {}))
+
+
+def field_text(doc: dict, field: str) -> str:
+    value = doc.get(field)
+    if value is None:
+        return ""
+    if field == "blocks":
+        return block_text(value)
+    if not isinstance(value, str):
+        return " ".join(strip_html(text) for text in _strings(value))
+    return strip_html(value)
+
+
+def highlight(text: str, terms: set, prefix: Optional[str] = None, words: int = SNIPPET_WORDS) -> str:
+    text = text[:MAX_SNIPPET_SOURCE]
+    matches = list(_WORD_RE.finditer(text))
+    if not matches:
+        return ""
+
+    def is_hit(match) -> bool:
+        word = normalize(match.group())
+        return word in terms or (prefix is not None and word.startswith(prefix))
+
+    hits = [is_hit(m) for m in matches]
+    # Window of `words` words with the most hits; ties go to the earliest
+    best_start, best_count = 0, sum(hits[:words])
+    count = best_count
+    for start in range(1, max(1, len(matches) - words + 1)):
+        count += hits[start + words - 1] - hits[start - 1]
+        if count > best_count:
+            best_start, best_count = start, count
+    window = matches[best_start:best_start + words]
+    begin = window[0].start() if best_start > 0 else 0
+    end = window[-1].end() if best_start + words < len(matches) else len(text)
+    parts = []
+    cursor = begin
+    for match, hit in zip(window, hits[best_start:best_start + words]):
+        if hit:
+            parts.append(escape(text[cursor:match.start()]))
+            parts.append(f"<mark>{escape(match.group())}</mark>")
+            cursor = match.end()
+    parts.append(escape(text[cursor:end]))
+    snippet = " ".join("".join(parts).split())
+    return ("… " if begin > 0 else "") + snippet + (" …" if end < len(text) else "")
+
+
+def matches_source(kind: str, doc: dict) -> bool:
+    return all(doc.get(field) == value for field, value in SOURCES[kind]["filter"].items())
+
+
+def document_terms(kind: str, doc: dict) -> Tuple[Dict[str, float], int]:
+    terms: Dict[str, float] = defaultdict(float)
+    length = 0
+    for field, weight in SOURCES[kind]["fields"]:
+        tokens = tokenize(field_text(doc, field))
+        length += len(tokens)
+        for token in tokens:
+            terms[token] += weight
+    return dict(terms), length
+
+
+class SearchDoc:
+    __slots__ = ("kind", "id", "title", "body", "meta", "length", "terms")
+
+    def __init__(self, kind: str, doc_id: str, title: str, body: str, meta: dict, length: int, terms: Dict[str, float]):
+        self.kind = kind
+        self.id = doc_id
+        self.title = title
+        self.body = body
+        self.meta = meta
+        self.length = length
+        self.terms = terms
+
+
+class SiteSearchIndex:
+    def __init__(self):
+        # term -> kind -> docno -> BM25 term weight; per-kind lists make type filters and grouping free
+        self.postings: Dict[str, Dict[str, Dict[int, float]]] = {}
+        self.document_frequency: Dict[str, int] = defaultdict(int)
+        self.docs: Dict[int, SearchDoc] = {}
+        self.docnos: Dict[Tuple[str, str], int] = {}
+        self.kind_lengths: Dict[str, int] = defaultdict(int)
+        self.kind_counts: Dict[str, int] = defaultdict(int)
+        # Average lengths are snapshotted at load (as Lucene does per segment) so term weights can be precomputed
+        self.average_lengths: Dict[str, float] = {}
+        self.next_docno = 0
+        self._vocabulary: List[str] = []
+        self._vocabulary_dirty = True
+        # Changes seen while a load is scanning; replayed onto the new index before it replaces this one
+        self.pending: Optional[list] = None
+        self.load_lock = asyncio.Lock()
+        self.loaded = False
+
+    async def ensure_loaded(self):
+        if not self.loaded:
+            await self.load()
+
+    async def load(self):
+        async with self.load_lock:
+            self.pending = []
+            fresh = SiteSearchIndex()
+            try:
+                for kind, source in SOURCES.items():
+                    fields = [field for field, _ in source["fields"]] + list(source["meta"]) + list(source["filter"])
+                    projection = {"_id": 0, "id": 1, **{field: 1 for field in fields}}
+                    async for doc in getattr(db, kind).find(source["filter"], projection):
+                        fresh.upsert(kind, doc)
+            except BaseException:
+                self.pending = None
+                raise
+            fresh.reweight()
+            # No await from here to the swap, so no change can slip between replay and swap
+            fresh.apply_changes(self.pending)
+            fresh.load_lock = self.load_lock
+            self.__dict__.update(fresh.__dict__)
+            self.loaded = True
+
+    def apply_changes(self, events):
+        if self.pending is not None:
+            self.pending.extend(events)
+        for event in events:
+            if event.op == "delete" and event.id:
+                self.remove(event.collection, event.id)
+            elif event.doc is not None:
+                self.upsert(event.collection, event.doc)
+
+    def _weight(self, tf: float, length: int, kind: str) -> float:
+        average = self.average_lengths.get(kind) or length or 1
+        return tf * (BM25_K1 + 1) / (tf + BM25_K1 * (1 - BM25_B + BM25_B * length / average))
+
+    def reweight(self):
+        self.average_lengths = {kind: self.kind_lengths[kind] / count for kind, count in self.kind_counts.items() if count}
+        for docno, doc in self.docs.items():
+            for term, tf in doc.terms.items():
+                self.postings[term][doc.kind][docno] = self._weight(tf, doc.length, doc.kind)
+
+    def upsert(self, kind: str, doc: dict):
+        source = SOURCES[kind]
+        if not matches_source(kind, doc):
+            self.remove(kind, doc["id"])
+            return
+        terms, length = document_terms(kind, doc)
+        body = "\n".join(text for text in (field_text(doc, field) for field in source["body"]) if text)
+        meta = {field: doc.get(field) for field in source["meta"]}
+        self.remove(kind, doc["id"])
+        docno = self.next_docno
+        self.next_docno += 1
+        self.docs[docno] = SearchDoc(kind, doc["id"], str(doc.get(TITLE_FIELDS[kind]) or ""), body[:MAX_SNIPPET_SOURCE], meta, length, terms)
+        self.docnos[(kind, doc["id"])] = docno
+        self.kind_lengths[kind] += length
+        self.kind_counts[kind] += 1
+        for term, tf in terms.items():
+            by_kind = self.postings.get(term)
+            if by_kind is None:
+                by_kind = self.postings[term] = defaultdict(dict)
+                self._vocabulary_dirty = True
+            by_kind[kind][docno] = self._weight(tf, length, kind)
+            self.document_frequency[term] += 1
+
+    def remove(self, kind: str, doc_id: str):
+        docno = self.docnos.pop((kind, doc_id), None)
+        if docno is None:
+            return
+        doc = self.docs.pop(docno)
+        self.kind_lengths[kind] -= doc.length
+        self.kind_counts[kind] -= 1
+        for term in doc.terms:
+            by_kind = self.postings.get(term)
+            if by_kind is None:
+                continue
+            by_kind[kind].pop(docno, None)
+            self.document_frequency[term] -= 1
+            if self.document_frequency[term] <= 0:
+                del self.postings[term]
+                del self.document_frequency[term]
+                self._vocabulary_dirty = True
+
+    def _expand_prefix(self, prefix: str) -> List[str]:
+        if self._vocabulary_dirty:
+            self._vocabulary = sorted(self.postings)
+            self._vocabulary_dirty = False
+        start = bisect_left(self._vocabulary, prefix)
+        expanded = []
+        for term in self._vocabulary[start:]:
+            if not term.startswith(prefix) or len(expanded) >= MAX_PREFIX_EXPANSIONS:
+                break
+            if term != prefix:
+                expanded.append(term)
+        return expanded
+
+    def search(self, query: str, kinds: Optional[Iterable[str]] = None, limit: int = 5) -> dict:
+        started = time.perf_counter()
+        limit = max(1, min(limit, MAX_GROUP_RESULTS))
+        kinds = [kind for kind in SOURCES if kind in set(kinds or SOURCES)]
+        tokens = list(dict.fromkeys(tokenize(query)))
+        weighted = [(token, 1.0) for token in tokens]
+        # Search-as-you-type: the last word also matches longer terms, at a discount
+        prefix = tokens[-1] if tokens and len(tokens[-1]) >= 2 else None
+        if prefix:
+            weighted.extend((term, PREFIX_WEIGHT) for term in self._expand_prefix(prefix) if term not in tokens)
+        total_docs = max(1, len(self.docs))
+        scores: Dict[str, Dict[int, float]] = {kind: {} for kind in kinds}
+        for term, query_weight in weighted:
+            by_kind = self.postings.get(term)
+            if not by_kind:
+                continue
+            df = self.document_frequency[term]
+            idf = math.log(1 + (total_docs - df + 0.5) / (df + 0.5)) * query_weight
+            for kind in kinds:
+                kind_scores = scores[kind]
+                get = kind_scores.get
+                for docno, weight in by_kind.get(kind, {}).items():
+                    kind_scores[docno] = get(docno, 0.0) + idf * weight
+
+        terms = set(tokens)
+        groups = []
+        for kind, kind_scores in scores.items():
+            if not kind_scores:
+                continue
+            results = []
+            for docno, score in heapq.nlargest(limit, kind_scores.items(), key=itemgetter(1)):
+                doc = self.docs[docno]
+                results.append({
+                    "id": doc.id,
+                    "title": doc.title,
+                    "title_highlighted": highlight(doc.title, terms, prefix, words=MAX_SNIPPET_SOURCE),
+                    "snippet": highlight(doc.body, terms, prefix),
+                    "score": round(score, 4),
+                    "meta": doc.meta,
+                })
+            groups.append({"type": kind, "total": len(kind_scores), "results": results})
+        groups.sort(key=lambda group: -group["results"][0]["score"])
+        return {
+            "query": query,
+            "total": sum(group["total"] for group in groups),
+            "took_ms": round((time.perf_counter() - started) * 1000, 2),
+            "groups": groups,
+        }
+
+
+site_index = SiteSearchIndex()
@@ -0,0 +1,280 @@
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Dict, FrozenSet, Iterable, Optional
+from fastapi.encoders import jsonable_encoder
+from starlette.concurrency import run_in_threadpool
+from services.changes import change_bus
+from services.versions import get_versions
+import asyncio
+import fcntl
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+import tempfile
+
+# One file per content version, shared by every worker on the host. Workers map it read-only, so the
+# hot read models (hero, ticker, menus, templates, home bundle) cost one page-cache copy per host.
+SNAPSHOT_DIR = os.environ.get("SNAPSHOT_DIR", os.path.join(tempfile.gettempdir(), "gys-snapshot"))
+SNAPSHOT_ENABLED = os.environ.get("SNAPSHOT_ENABLED", "true").lower() != "false"
+# Writes usually come in bursts (imports, reorders); wait this long before rebuilding
+SNAPSHOT_DEBOUNCE = float(os.environ.get("SNAPSHOT_DEBOUNCE", 0.2))
+PUBLISH_ATTEMPTS = 50
+RETRY_SECONDS = 0.1
+
+MAGIC = b"GYSSNAP1"
+HEADER = struct.Struct("<8sI")
+POINTER = "current"
+LOCK_FILE = "publish.lock"
+
+
+def encode(value) -> bytes:
+    if isinstance(value, bytes):
+        return value
+    # Same encoding as FastAPI's JSONResponse, so snapshot bodies are byte-identical to rendered ones
+    return json.dumps(jsonable_encoder(value), ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode()
+
+
+def code_fingerprint() -> str:
+    # Builders and response models change with deploys: a file written by other code is never current
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    digest = hashlib.blake2b(digest_size=8)
+    paths = sorted({module.__file__ for module in list(sys.modules.values())
+                    if (getattr(module, "__file__", None) or "").startswith(root)})
+    for path in paths:
+        stat = os.stat(path)
+        digest.update(f"{os.path.relpath(path, root)}:{stat.st_size}:{stat.st_mtime_ns};".encode())
+    return digest.hexdigest()
+
+
+def snapshot_version(code: str, versions: Dict[str, int]) -> str:
+    material = code + json.dumps(sorted(versions.items()), separators=(",", ":"))
+    return hashlib.blake2b(material.encode(), digest_size=8).hexdigest()
+
+
+def write_snapshot(directory: str, code: str, versions: Dict[str, int], bodies: Dict[str, bytes]) -> str:
+    sections, offset = {}, 0
+    for name, body in bodies.items():
+        sections[name] = [offset, len(body)]
+        offset += len(body)
+    header = json.dumps({
+        "code": code,
+        "versions": versions,
+        "built_at": datetime.now(timezone.utc).isoformat(),
+        "sections": sections,
+    }, separators=(",", ":")).encode()
+    name = f"snapshot-{snapshot_version(code, versions)}.bin"
+    # Written under a private name and renamed: readers only ever see complete, immutable files
+    tmp = os.path.join(directory, f".{name}.{os.getpid()}.tmp")
+    with open(tmp, "wb") as f:
+        f.write(HEADER.pack(MAGIC, len(header)))
+        f.write(header)
+        for body in bodies.values():
+            f.write(body)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, os.path.join(directory, name))
+    pointer_tmp = os.path.join(directory, f".{POINTER}.{os.getpid()}.tmp")
+    with open(pointer_tmp, "w") as f:
+        f.write(name)
+    os.replace(pointer_tmp, os.path.join(directory, POINTER))
+    # Workers that still map an older file keep a valid mapping after the unlink
+    for stale in os.listdir(directory):
+        if stale.startswith("snapshot-") and stale != name:
+            try:
+                os.unlink(os.path.join(directory, stale))
+            except FileNotFoundError:
+                pass
+    return name
+
+
+class MappedSnapshot:
+    __slots__ = ("name", "code", "versions", "sections", "built_at", "data", "base")
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, header_length = HEADER.unpack_from(self.data, 0)
+        if magic != MAGIC:
+            raise ValueError(f"Not a content snapshot: {path}")
+        header = json.loads(self.data[HEADER.size:HEADER.size + header_length])
+        self.name = os.path.basename(path)
+        self.code = header["code"]
+        self.versions = header["versions"]
+        self.sections = header["sections"]
+        self.built_at = header["built_at"]
+        self.base = HEADER.size + header_length
+
+    def read(self, name: str) -> Optional[bytes]:
+        section = self.sections.get(name)
+        if section is None:
+            return None
+        offset, length = section
+        start = self.base + offset
+        # The mapping is shared; only the response being sent is copied out of it
+        return self.data[start:start + length]
+
+
+class Section:
+    __slots__ = ("name", "collections", "build")
+
+    def __init__(self, name: str, collections: FrozenSet[str], build: Callable[[], Awaitable]):
+        self.name = name
+        self.collections = collections
+        self.build = build
+
+
+class ContentSnapshot:
+    def __init__(self, directory: str = SNAPSHOT_DIR):
+        self.directory = directory
+        self.sections: Dict[str, Section] = {}
+        self.mapped: Optional[MappedSnapshot] = None
+        # collection -> lowest version this worker may serve; raised by every change it hears about
+        self.required: Dict[str, int] = {}
+        self.started = False
+        self.code = None
+        self.stats = Counter()
+        self.last_error: Optional[str] = None
+        self._pointer = None
+        self._refresh: Optional[asyncio.Task] = None
+
+    def section(self, name: str, collections: Iterable[str] = ()):
+        def register(build):
+            new = frozenset(collections) - self.collections
+            self.sections[name] = Section(name, frozenset(collections), build)
+            if new:
+                change_bus.subscribe(new)(self.on_change)
+            return build
+        return register
+
+    @property
+    def collections(self) -> FrozenSet[str]:
+        return frozenset(c for section in self.sections.values() for c in section.collections)
+
+    def is_fresh(self, name: str, mapped: Optional[MappedSnapshot] = None) -> bool:
+        mapped = mapped or self.mapped
+        if mapped is None or mapped.code != self.code or name not in mapped.sections:
+            return False
+        return all(mapped.versions.get(c, 0) >= self.required.get(c, 0) for c in self.sections[name].collections)
+
+    def get(self, name: str) -> Optional[bytes]:
+        if not self.started:
+            return None
+        if not self.is_fresh(name):
+            # Another worker may already have published; checking the pointer is one stat()
+            self.remap()
+            if not self.is_fresh(name):
+                self.stats["misses"] += 1
+                return None
+        self.stats["hits"] += 1
+        return self.mapped.read(name)
+
+    def remap(self):
+        pointer = os.path.join(self.directory, POINTER)
+        try:
+            stat = os.stat(pointer)
+        except FileNotFoundError:
+            return
+        if self._pointer == (stat.st_ino, stat.st_mtime_ns):
+            return
+        try:
+            with open(pointer) as f:
+                name = f.read().strip()
+            if self.mapped is None or self.mapped.name != name:
+                self.mapped = MappedSnapshot(os.path.join(self.directory, name))
+                self.stats["maps"] += 1
+            self._pointer = (stat.st_ino, stat.st_mtime_ns)
+        except (OSError, ValueError):
+            # Replaced between the stat and the open; the next call sees the new pointer
+            self._pointer = None
+
+    async def start(self):
+        if not SNAPSHOT_ENABLED or not self.sections:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        self.code = await run_in_threadpool(code_fingerprint)
+        await self.require(self.collections)
+        self.started = True
+        # A cold worker maps what is on disk and serves it from its first request when it is current;
+        # otherwise the handlers render normally until a worker has published a fresh one
+        self.remap()
+        if not all(self.is_fresh(name) for name in self.sections):
+            self._refresh = asyncio.create_task(self.refresh())
+
+    async def stop(self):
+        if self._refresh is not None and not self._refresh.done():
+            self._refresh.cancel()
+
+    async def require(self, collections: Iterable[str]):
+        for collection, (version, _) in (await get_versions(collections)).items():
+            self.required[collection] = max(self.required.get(collection, 0), version)
+
+    async def on_change(self, events):
+        if not self.started:
+            return
+        await self.require({event.collection for event in events})
+        if self._refresh is None or self._refresh.done():
+            self._refresh = asyncio.create_task(self.debounced_refresh())
+
+    async def debounced_refresh(self):
+        await asyncio.sleep(SNAPSHOT_DEBOUNCE)
+        await self.refresh()
+
+    async def refresh(self):
+        try:
+            for _ in range(PUBLISH_ATTEMPTS):
+                self.remap()
+                if all(self.is_fresh(name) for name in self.sections):
+                    return
+                if await self.publish_if_leader():
+                    continue
+                await asyncio.sleep(RETRY_SECONDS)
+        except Exception as e:
+            # Handlers keep rendering normally; the next change retries
+            self.stats["errors"] += 1
+            self.last_error = repr(e)
+
+    async def publish_if_leader(self) -> bool:
+        with open(os.path.join(self.directory, LOCK_FILE), "a") as lock:
+            try:
+                # One worker per host builds; the others pick the file up from the pointer
+                fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return False
+            try:
+                self.remap()
+                if not all(self.is_fresh(name) for name in self.sections):
+                    await self.publish()
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+        return True
+
+    async def publish(self):
+        # Versions are read before building, so a snapshot never claims to be newer than its content
+        versions = {c: version for c, (version, _) in (await get_versions(self.collections)).items()}
+        names = list(self.sections)
+        values = await asyncio.gather(*(self.sections[name].build() for name in names))
+        bodies = {name: encode(value) for name, value in zip(names, values)}
+        await run_in_threadpool(write_snapshot, self.directory, self.code, versions, bodies)
+        self.stats["publishes"] += 1
+        self.remap()
+
+    def snapshot(self) -> dict:
+        mapped = self.mapped
+        return {
+            "enabled": SNAPSHOT_ENABLED and self.started,
+            "file": mapped.name if mapped else None,
+            "built_at": mapped.built_at if mapped else None,
+            "versions": mapped.versions if mapped else {},
+            "required": dict(self.required),
+            "fresh": sorted(name for name in self.sections if self.is_fresh(name)),
+            "bytes": len(mapped.data) if mapped else 0,
+            **{name: self.stats[name] for name in ("hits", "misses", "maps", "publishes", "errors")},
+            "last_error": self.last_error,
+        }
+
+
+content_snapshot = ContentSnapshot()
+
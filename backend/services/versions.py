@@ -0,0 +1,54 @@
+from typing import Dict, FrozenSet, Iterable, Optional, Tuple
+from database import db
+from datetime import datetime, timezone
+
+# GET path prefix -> collections the response is derived from. Every write to those collections goes
+# through the change bus, which bumps their version, so (path, query, versions) identifies the body.
+VERSIONED_ROUTES: Tuple[Tuple[str, FrozenSet[str]], ...] = (
+    ("/api/settings", frozenset({"settings"})),
+    ("/api/news", frozenset({"news"})),
+    ("/api/events", frozenset({"events"})),
+    ("/api/photos", frozenset({"photos", "albums"})),
+    ("/api/albums", frozenset({"albums", "photos"})),
+    ("/api/employees", frozenset({"employees"})),
+    ("/api/menus", frozenset({"menus"})),
+    ("/api/pages", frozenset({"pages"})),
+    ("/api/search", frozenset({"news", "pages", "events", "employees"})),
+    ("/api/facets", frozenset({"news", "photos", "events", "employees", "albums"})),
+    ("/api/home", frozenset({"settings", "news", "events", "photos", "employees", "menus"})),
+)
+
+
+def tags_for_path(path: str) -> Optional[FrozenSet[str]]:
+    for prefix, tags in VERSIONED_ROUTES:
+        if path == prefix or path.startswith(prefix + "/"):
+            return tags
+    return None
+
+
+async def bump_versions(collections: Iterable[str]):
+    now = datetime.now(timezone.utc)
+    for collection in set(collections):
+        await db.content_versions.update_one(
+            {"_id": collection}, {"$inc": {"version": 1}, "$set": {"updated_at": now}}, upsert=True
+        )
+
+
+async def get_versions(collections: Iterable[str]) -> Dict[str, Tuple[int, Optional[datetime]]]:
+    wanted = sorted(set(collections))
+    versions = {collection: (0, None) for collection in wanted}
+    async for doc in db.content_versions.find({"_id": {"$in": wanted}}):
+        updated_at = doc.get("updated_at")
+        if updated_at is not None and updated_at.tzinfo is None:
+            updated_at = updated_at.replace(tzinfo=timezone.utc)
+        versions[doc["_id"]] = (doc.get("version", 0), updated_at)
+    return versions
+
+
+async def ensure_versions():
+    # Start every tracked collection at a known version so Last-Modified is available from the first request
+    now = datetime.now(timezone.utc)
+    for collection in {tag for _, tags in VERSIONED_ROUTES for tag in tags}:
+        await db.content_versions.update_one(
+            {"_id": collection}, {"$setOnInsert": {"version": 1, "updated_at": now}}, upsert=True
+        )
@@ -0,0 +1,125 @@
+"""
+Inline data URL migration tests
+- Data URLs decode from base64 and percent-encoding, with a default content type
+- Nested page blocks are rewritten wherever a data URL appears, and only then reported as changed
+- A running migration counts as active only while its heartbeat is fresh
+Runs without a database or server.
+"""
+import pytest
+import asyncio
+import binascii
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "test_data_url_migration")
+
+import services.data_url_migration as migration
+from bson import ObjectId
+from services.data_url_migration import decode_data_url, describe_state, is_active, rewrite_nested
+
+
+@pytest.fixture
+def extracted(monkeypatch):
+    calls = []
+
+    async def fake_extract(value, filename):
+        calls.append(value)
+        return f"/api/media/{len(calls)}"
+
+    monkeypatch.setattr(migration, "extract", fake_extract)
+    return calls
+
+
+def ago(seconds):
+    return (datetime.now(timezone.utc) - timedelta(seconds=seconds)).isoformat()
+
+
+class TestDecodeDataUrl:
+    """data: URL decoding tests"""
+
+    def test_base64(self):
+        """Test a base64 payload decodes with its declared type"""
+        assert decode_data_url("data:image/png;base64,aGVsbG8=") == (b"hello", "image/png")
+        print("✓ base64 data URL decoded")
+
+    def test_percent_encoded(self):
+        """Test a non-base64 payload is percent-decoded"""
+        assert decode_data_url("data:text/plain,a%20b") == (b"a b", "text/plain")
+        print("✓ Percent-encoded data URL decoded")
+
+    def test_missing_type(self):
+        """Test a data URL without a media type falls back to octet-stream"""
+        assert decode_data_url("data:;base64,aGk=") == (b"hi", "application/octet-stream")
+        print("✓ Missing media type defaults to octet-stream")
+
+    def test_invalid_base64(self):
+        """Test a truncated base64 payload raises instead of storing garbage"""
+        with pytest.raises(binascii.Error):
+            decode_data_url("data:image/png;base64,aGVsbG8")
+        print("✓ Invalid base64 rejected")
+
+
+class TestRewriteNested:
+    """Nested block rewrite tests"""
+
+    def test_nested_lists_and_dicts(self, extracted):
+        """Test data URLs inside nested lists and dicts are replaced in place"""
+        blocks = [{"type": "image", "content": {"src": "data:image/png;base64,aGk=", "caption": "Plant"}},
+                  {"type": "gallery", "content": {"images": ["data:image/gif;base64,aGk=", "/api/media/kept"]}}]
+        rewritten, changed = asyncio.run(rewrite_nested(blocks, "page"))
+        assert changed is True
+        assert rewritten[0]["content"] == {"src": "/api/media/1", "caption": "Plant"}
+        assert rewritten[1]["content"]["images"] == ["/api/media/2", "/api/media/kept"]
+        assert len(extracted) == 2
+        print("✓ Nested data URLs rewritten")
+
+    def test_unchanged(self, extracted):
+        """Test values without data URLs come back unchanged and unflagged"""
+        blocks = [{"type": "text", "content": {"body": "data is good", "order": 1, "tags": ["a", None]}}]
+        assert asyncio.run(rewrite_nested(blocks, "page")) == (blocks, False)
+        assert extracted == []
+        print("✓ Blocks without data URLs left alone")
+
+    def test_undecodable_kept(self, monkeypatch):
+        """Test a data URL that fails to decode is kept rather than aborting the page"""
+        async def failing_extract(value, filename):
+            raise binascii.Error("Incorrect padding")
+
+        monkeypatch.setattr(migration, "extract", failing_extract)
+        value = {"src": "data:image/png;base64,aGVsbG8"}
+        assert asyncio.run(rewrite_nested(value, "page")) == (value, False)
+        print("✓ Undecodable data URL kept")
+
+
+class TestMigrationState:
+    """Migration ownership state tests"""
+
+    def test_fresh_heartbeat_is_active(self):
+        """Test a running migration with a recent heartbeat is active"""
+        assert is_active({"status": "running", "heartbeat_at": ago(5)})
+        print("✓ Fresh heartbeat is active")
+
+    @pytest.mark.parametrize("state", [
+        {"status": "running", "heartbeat_at": ago(migration.MIGRATION_STALE_SECONDS + 60)},
+        {"status": "running"},
+        {"status": "interrupted", "heartbeat_at": ago(5)},
+        {"status": "pending", "collections": {}},
+    ])
+    def test_not_active(self, state):
+        """Test stale, heartbeat-less and finished runs can be taken over"""
+        assert not is_active(state)
+        print(f"✓ Not active: {state['status']}")
+
+    def test_describe_state(self):
+        """Test checkpoint ids are readable in the status response"""
+        last_id = ObjectId()
+        state = {"status": "running", "collections": {"photos": {"last_id": last_id, "scanned": 3},
+                                                      "news": {"last_id": None, "scanned": 0}}}
+        described = describe_state(state)
+        assert described["collections"]["photos"] == {"last_id": str(last_id), "scanned": 3}
+        assert described["collections"]["news"]["last_id"] is None
+        assert state["collections"]["photos"]["last_id"] is last_id
+        print("✓ Checkpoint ids stringified without touching the stored state")
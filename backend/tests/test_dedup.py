@@ -0,0 +1,164 @@
+"""
+Near-duplicate detection tests
+- dHash is stable under resizing and re-encoding and far apart for different images
+- BK-tree radius queries return exactly what a linear scan would
+- Photo and media changes from any process reach the in-memory index
+Runs without a database or server.
+"""
+import pytest
+import asyncio
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "test_dedup")
+
+import services.dedup as dedup
+from PIL import Image, ImageDraw
+from services.changes import ChangeEvent
+from services.dedup import BKTree, PerceptualIndex, _dhash, hamming, update_perceptual_index
+
+MEDIA_ID = "ab" * 32
+
+
+def picture(path, size, flip=False, fmt="PNG"):
+    img = Image.new("RGB", (400, 300), (240, 240, 240))
+    draw = ImageDraw.Draw(img)
+    for i in range(6):
+        draw.rectangle([i * 60, i * 40, i * 60 + 90, i * 40 + 70], fill=(40 * i, 200 - 30 * i, 90))
+    if flip:
+        img = img.transpose(Image.FLIP_LEFT_RIGHT)
+    img.resize(size).save(path, fmt)
+    return str(path)
+
+
+class TestDHash:
+    """Difference hash tests"""
+
+    def test_resized_and_reencoded_are_near(self, tmp_path):
+        """Test the same picture at another size and format hashes within the default distance"""
+        original = _dhash(picture(tmp_path / "a.png", (400, 300)))
+        smaller = _dhash(picture(tmp_path / "b.jpg", (160, 120), fmt="JPEG"))
+        assert hamming(original, smaller) <= dedup.DEFAULT_DISTANCE
+        print(f"✓ Resized JPEG within distance {hamming(original, smaller)}")
+
+    def test_different_pictures_are_far(self, tmp_path):
+        """Test a mirrored picture is well outside the default distance"""
+        original = _dhash(picture(tmp_path / "a.png", (400, 300)))
+        mirrored = _dhash(picture(tmp_path / "b.png", (400, 300), flip=True))
+        assert hamming(original, mirrored) > dedup.DEFAULT_DISTANCE
+        print(f"✓ Mirrored picture at distance {hamming(original, mirrored)}")
+
+    def test_hash_is_64_bits(self, tmp_path):
+        """Test the hash fits the stored 16 hex digits"""
+        assert 0 <= _dhash(picture(tmp_path / "a.png", (400, 300))) < 2 ** 64
+        print("✓ dHash is 64 bits")
+
+
+class TestBKTree:
+    """BK-tree query tests"""
+
+    def test_matches_linear_scan(self):
+        """Test radius queries agree with brute force on random hashes"""
+        rng = random.Random(7)
+        base = [rng.getrandbits(64) for _ in range(20)]
+        # Clusters of near variants around each base hash
+        values = {f"m{i}-{j}": value ^ sum(1 << rng.randrange(64) for _ in range(j)) for i, value in enumerate(base)
+                  for j in range(5)}
+        tree = BKTree()
+        for key, value in values.items():
+            tree.add(value, key)
+        for radius in (0, 3, 6, 12):
+            for probe in base[:5]:
+                expected = sorted((hamming(probe, value), key) for key, value in values.items()
+                                  if hamming(probe, value) <= radius)
+                assert tree.search(probe, radius) == expected
+        print("✓ BK-tree matches linear scan")
+
+    def test_exact_duplicates_share_a_node(self):
+        """Test identical hashes are kept once per key"""
+        tree = BKTree()
+        for key in ("a", "b", "a"):
+            tree.add(0xFF, key)
+        assert tree.search(0xFF, 0) == [(0, "a"), (0, "b")]
+        assert BKTree().search(0xFF, 10) == []
+        print("✓ Exact duplicates grouped")
+
+    def test_similar_and_groups(self):
+        """Test the index excludes the probe itself and groups each image once"""
+        index = PerceptualIndex()
+        index.loaded = True
+        for key, value in {"a": 0b0000, "b": 0b0001, "c": 0b0011, "far": 2 ** 63 - 1}.items():
+            index._add(key, value)
+        assert asyncio.run(index.similar("a", radius=1)) == [(1, "b")]
+        assert asyncio.run(index.similar("missing")) == []
+        assert asyncio.run(index.duplicate_groups(radius=2)) == [["a", "b", "c"]]
+        print("✓ Similar and duplicate groups")
+
+
+class TestIndexFollowsChanges:
+    """Change bus subscription tests"""
+
+    @pytest.fixture
+    def refreshed(self, monkeypatch):
+        calls = []
+
+        async def fake_refresh(media_ids):
+            calls.append(list(media_ids))
+
+        monkeypatch.setattr(dedup.perceptual_index, "refresh", fake_refresh)
+        return calls
+
+    def test_media_and_photo_events(self, refreshed):
+        """Test remote media hashes and photos pointing at media are looked up"""
+        events = [
+            ChangeEvent("media", "update", MEDIA_ID, {"id": MEDIA_ID}, remote=True),
+            ChangeEvent("photos", "insert", "p1", {"id": "p1", "image_url": f"/api/media/{'cd' * 32}"}, remote=True),
+            ChangeEvent("photos", "insert", "p2", {"id": "p2", "image_url": "https://example.com/a.jpg"}),
+            ChangeEvent("photos", "delete", "p3"),
+        ]
+        asyncio.run(update_perceptual_index(events))
+        assert refreshed == [[MEDIA_ID, "cd" * 32, None]]
+        print("✓ Media and photo changes refresh the index")
+
+    def test_refresh_before_load_is_noop(self):
+        """Test an index that has not loaded yet leaves the work to its first full load"""
+        index = PerceptualIndex()
+        asyncio.run(index.refresh([MEDIA_ID]))
+        assert index.hashes == {}
+        print("✓ Unloaded index not touched")
+
+    def test_refresh_skips_known(self):
+        """Test ids already indexed are not read again"""
+        index = PerceptualIndex()
+        index.loaded = True
+        index._add(MEDIA_ID, 1)
+        asyncio.run(index.refresh([MEDIA_ID, None]))
+        assert index.hashes == {MEDIA_ID: 1}
+        print("✓ Known ids skipped")
+
+
+class TestRegisterPerceptualHash:
+    """Hash registration failure tests"""
+
+    @pytest.mark.parametrize("error", [Image.DecompressionBombError("too many pixels"), OSError("truncated")])
+    def test_undecodable_image_is_skipped(self, monkeypatch, error):
+        """Test decompression bombs and broken files are stored unhashed instead of failing the upload"""
+        async def fake_source_path(media_id):
+            return "/nonexistent"
+
+        async def failing_run(func, *args):
+            raise error
+
+        monkeypatch.setattr(dedup, "source_path", fake_source_path)
+        monkeypatch.setattr(dedup, "run_in_process", failing_run)
+        media = {"id": MEDIA_ID, "content_type": "image/png"}
+        assert asyncio.run(dedup.register_perceptual_hash(media)) is None
+        print(f"✓ {type(error).__name__} skipped")
+
+    def test_non_images_are_not_hashed(self):
+        """Test markup and other downloads never reach the decoder"""
+        assert asyncio.run(dedup.register_perceptual_hash({"id": MEDIA_ID, "content_type": "text/html"})) is None
+        print("✓ Non-image skipped")
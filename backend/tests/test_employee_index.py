@@ -0,0 +1,131 @@
+"""
+Employee typeahead index tests
+- Prefix hits on name, email and position tokens and on the whole name
+- Upserts and removals keep the sorted entries consistent
+- Spelling variants fold together and typo matches stay within the edit-distance bound
+Runs without a database or server.
+"""
+import pytest
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "test_employee_index")
+
+from services.employee_index import EmployeeIndex
+from services.fuzzy import bounded_levenshtein, fold, max_distance
+
+EMPLOYEES = [
+    {"id": "e1", "name": "Budi Santoso", "email": "budi.santoso@gys.co.id", "position": "Engineer", "department": "IT"},
+    {"id": "e2", "name": "Boedi Hartono", "email": "bhartono@gys.co.id", "position": "Manager", "department": "HR"},
+    {"id": "e3", "name": "Djoko Widodo", "email": "djoko@gys.co.id", "position": "Operator", "department": "Production"},
+    {"id": "e4", "name": "Siti Rahayu", "email": "siti@gys.co.id", "position": "Engineer", "department": "IT"},
+    {"id": "e5", "name": "Bambang Santoso", "email": "bambang@gys.co.id", "position": "Supervisor", "department": "QA"},
+]
+
+
+@pytest.fixture
+def index():
+    index = EmployeeIndex()
+    for doc in EMPLOYEES:
+        index.upsert({**doc, "salary": 1})
+    index.loaded = True
+    return index
+
+
+def ids(records):
+    return [record["id"] for record in records]
+
+
+class TestPrefixHits:
+    """Prefix suggestion tests"""
+
+    def test_name_prefix(self, index):
+        """Test a name prefix ranks names starting with it first"""
+        assert ids(index.suggest("san")) == ["e5", "e1"]
+        assert ids(index.suggest("bu")) == ["e1"]
+        print("✓ Name prefix hits")
+
+    def test_whole_name_prefix(self, index):
+        """Test a multi-word prefix needs every token and prefers the whole-name match"""
+        assert ids(index.suggest("budi san")) == ["e1"]
+        assert ids(index.suggest("santoso b")) == ["e5", "e1"]
+        print("✓ Multi-word prefix hits")
+
+    def test_email_and_position(self, index):
+        """Test email and position tokens are searchable too"""
+        assert ids(index.suggest("bhartono")) == ["e2"]
+        assert ids(index.suggest("engineer")) == ["e1", "e4"]
+        print("✓ Email and position hits")
+
+    def test_records_hold_only_suggest_fields(self, index):
+        """Test suggestions never carry fields outside SUGGEST_FIELDS"""
+        assert "salary" not in index.suggest("siti")[0]
+        assert index.suggest("   ") == []
+        print("✓ Suggestion records trimmed")
+
+    def test_limit(self, index):
+        """Test the limit caps the suggestions"""
+        assert len(index.suggest("gys", limit=2)) == 2
+        print("✓ Limit respected")
+
+    def test_upsert_and_remove(self, index):
+        """Test a rename moves the entry and a removal drops it everywhere"""
+        index.upsert({**EMPLOYEES[3], "name": "Siti Nurhaliza"})
+        assert ids(index.suggest("nurh")) == ["e4"]
+        assert ids(index.suggest("rahayu")) == []
+        index.remove("e4")
+        assert ids(index.suggest("siti")) == []
+        assert all(employee_id != "e4" for _, employee_id in index.entries)
+        assert index.entries == sorted(index.entries)
+        assert "e4" not in index.records
+        print("✓ Upsert and remove keep entries consistent")
+
+
+class TestFuzzy:
+    """Spelling-variant and typo tests"""
+
+    @pytest.mark.parametrize("raw,folded", [
+        ("boedi", "budi"),
+        ("djoko", "joko"),
+        ("tjahjo", "cahjo"),
+        ("sjahrir", "syahrir"),
+        ("yulie", "yuli"),
+        ("annisa", "anisa"),
+    ])
+    def test_fold(self, raw, folded):
+        """Test old spellings and doubled letters fold to one form"""
+        assert fold(raw) == folded
+        print(f"✓ {raw} -> {folded}")
+
+    def test_old_spelling_matches(self, index):
+        """Test Boedi and Budi find each other, exact matches first"""
+        assert ids(index.suggest_with_fuzzy("budi")) == ["e1", "e2"]
+        assert ids(index.suggest_with_fuzzy("joko")) == ["e3"]
+        print("✓ Old spellings matched")
+
+    def test_distance_bound(self):
+        """Test the bound grows with token length and short tokens must match exactly"""
+        assert [max_distance("x" * n) for n in (3, 4, 5, 6, 12)] == [0, 1, 1, 2, 2]
+        assert bounded_levenshtein("santoso", "santosa", 2) == 1
+        assert bounded_levenshtein("santoso", "sentosi", 1) == 2
+        assert bounded_levenshtein("rahayu", "rahayuuuu", 2) == 3
+        print("✓ Edit distance bounded")
+
+    def test_typo_within_bound(self, index):
+        """Test one typo in a short token and two in a long one still match"""
+        assert ids(index.suggest_with_fuzzy("rahyu")) == ["e4"]
+        assert ids(index.suggest_with_fuzzy("santsoo")) == ["e5", "e1"]
+        print("✓ Typos within the bound matched")
+
+    def test_typo_beyond_bound(self, index):
+        """Test tokens too far away or too short for typos return nothing"""
+        assert index.fuzzy_ids("sontasa", 8) == []
+        assert index.fuzzy_ids("sit", 8) == []
+        print("✓ Typos beyond the bound rejected")
+
+    def test_fuzzy_excludes_prefix_hits(self, index):
+        """Test fuzzy matches never repeat ids already suggested"""
+        assert index.fuzzy_ids("budi", 8, exclude=["e1"]) == ["e2"]
+        print("✓ Fuzzy matches exclude earlier hits")
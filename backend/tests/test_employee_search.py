@@ -0,0 +1,67 @@
+"""
+Employee search unit tests
+- search_terms folds accents and case into sorted, de-duplicated tokens
+- The prefix query is anchored and escaped
+- rank orders by relevance, then name and id, so ties are stable across runs
+Runs without a database or server.
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "test_employee_search")
+
+from services.employee_search import exact_query, rank, search_query, search_terms
+
+
+def employee(id, name, email="", position="", department=""):
+    return {"id": id, "name": name, "email": email, "position": position, "department": department}
+
+
+class TestSearchTerms:
+    """Indexed search term tests"""
+
+    def test_terms_fold_accents_and_case(self):
+        """Test terms are lowercased, accent-free, split on punctuation and de-duplicated"""
+        doc = employee("1", "José Ñúñez", "jose.nunez@GYS.co.id", "QC Supervisor", "Quality Control")
+        assert search_terms(doc) == ["co", "control", "gys", "id", "jose", "nunez", "qc", "quality", "supervisor"]
+        print("✓ Search terms folded")
+
+    def test_prefix_query_is_anchored_and_escaped(self):
+        """Test every token becomes an anchored prefix and regex metacharacters are escaped"""
+        assert search_query("Dewi L.") == {"$and": [
+            {"search_terms": {"$regex": "^dewi"}},
+            {"search_terms": {"$regex": "^l"}},
+        ]}
+        assert search_query("a+b") == {"$and": [
+            {"search_terms": {"$regex": "^a"}},
+            {"search_terms": {"$regex": "^b"}},
+        ]}
+        assert search_query("!!!") == {"id": None}
+        assert exact_query("Budi Santoso") == {"search_terms": {"$all": ["budi", "santoso"]}}
+        print("✓ Prefix query anchored")
+
+
+class TestRank:
+    """Relevance ranking tests"""
+
+    def test_relevance_order(self):
+        """Test name phrase > whole name word > name prefix > email prefix > other fields"""
+        docs = [
+            employee("5", "Agus Halim", position="Budget Analyst"),
+            employee("4", "Rina Sari", email="budiman@gys.co.id"),
+            employee("3", "Siti Budiarti"),
+            employee("2", "Ahmad Budi"),
+            employee("1", "Budi Santoso"),
+        ]
+        assert [doc["id"] for doc in rank(docs, "budi")] == ["1", "2", "3", "4", "5"]
+        print("✓ Relevance order")
+
+    def test_ties_are_stable(self):
+        """Test equal scores fall back to name then id, whatever order the database returned"""
+        docs = [employee("b", "Budi Santoso"), employee("c", "Budi Halim"), employee("a", "Budi Santoso")]
+        expected = ["c", "a", "b"]
+        assert [doc["id"] for doc in rank(docs, "budi")] == expected
+        assert [doc["id"] for doc in rank(list(reversed(docs)), "budi")] == expected
+        print("✓ Ties ordered by name and id")
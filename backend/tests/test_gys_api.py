@@ -4,6 +4,9 @@ Tests for User Management, News, Albums, Photos, Hero Settings, Events
 """
 import pytest
 import requests
+import csv
+import io
+import json
 import os
 
 BASE_URL = os.environ.get('REACT_APP_BACKEND_URL', '').rstrip('/')
@@ -177,7 +180,33 @@ class TestNews:
         data = response.json()
         assert isinstance(data, list)
         print(f"✓ Got {len(data)} news articles")
-    
+
+    def test_news_cursor_pagination(self):
+        """Test walking news with X-Next-Cursor returns every article exactly once"""
+        full = requests.get(f"{BASE_URL}/api/news", params={"limit": 500}).json()
+        seen = []
+        cursor = None
+        while True:
+            params = {"limit": 2}
+            if cursor:
+                params["cursor"] = cursor
+            response = requests.get(f"{BASE_URL}/api/news", params=params)
+            assert response.status_code == 200
+            page = response.json()
+            assert len(page) <= 2
+            seen.extend(item["id"] for item in page)
+            cursor = response.headers.get("X-Next-Cursor")
+            if not cursor:
+                break
+        assert seen == [item["id"] for item in full]
+        print(f"✓ Cursor pagination walked {len(seen)} articles")
+
+    def test_invalid_cursor_rejected(self):
+        """Test a malformed cursor returns 400"""
+        response = requests.get(f"{BASE_URL}/api/news", params={"cursor": "not-a-cursor"})
+        assert response.status_code == 400
+        print("✓ Invalid cursor rejected")
+
     def test_get_news_by_id(self):
         """Test getting single news article by ID"""
         # First get list
@@ -404,6 +433,80 @@ class TestAlbumsAndPhotos:
         requests.delete(f"{BASE_URL}/api/photos/{photo_data['id']}", headers={"Authorization": f"Bearer {admin_token}"})
         requests.delete(f"{BASE_URL}/api/albums/{album_id}", headers={"Authorization": f"Bearer {admin_token}"})
 
+    def photo_count(self, album_id):
+        return requests.get(f"{BASE_URL}/api/albums/{album_id}").json()["photo_count"]
+
+    def test_photo_count_follows_photo_writes(self, admin_token):
+        """Test album photo_count tracks photo create, move and delete"""
+        headers = {"Authorization": f"Bearer {admin_token}"}
+        first = requests.post(f"{BASE_URL}/api/albums", json={"title": "TEST_Count A"}, headers=headers).json()["id"]
+        second = requests.post(f"{BASE_URL}/api/albums", json={"title": "TEST_Count B"}, headers=headers).json()["id"]
+        assert self.photo_count(first) == 0
+
+        photo_ids = []
+        for i in range(2):
+            response = requests.post(
+                f"{BASE_URL}/api/photos",
+                json={"title": f"TEST_Counted {i}", "image_url": "https://example.com/photo.jpg", "album_id": first},
+                headers=headers
+            )
+            photo_ids.append(response.json()["id"])
+        assert self.photo_count(first) == 2
+
+        # Moving a photo moves its count
+        requests.put(f"{BASE_URL}/api/photos/{photo_ids[0]}", json={"album_id": second}, headers=headers)
+        assert (self.photo_count(first), self.photo_count(second)) == (1, 1)
+
+        requests.delete(f"{BASE_URL}/api/photos/{photo_ids[0]}", headers=headers)
+        assert self.photo_count(second) == 0
+
+        # Counts already match, so reconciling repairs nothing for these albums
+        reconcile = requests.post(f"{BASE_URL}/api/albums/reconcile", headers=headers)
+        assert reconcile.status_code == 200
+        assert "checked" in reconcile.json() and "repaired" in reconcile.json()
+        assert (self.photo_count(first), self.photo_count(second)) == (1, 0)
+        print("✓ Album photo_count follows photo writes")
+
+        requests.delete(f"{BASE_URL}/api/photos/{photo_ids[1]}", headers=headers)
+        for album_id in (first, second):
+            requests.delete(f"{BASE_URL}/api/albums/{album_id}", headers=headers)
+
+    def test_bulk_upload_into_album(self, admin_token):
+        """Test bulk upload creates a photo per image and reports the rest as failed"""
+        headers = {"Authorization": f"Bearer {admin_token}"}
+        album_id = requests.post(f"{BASE_URL}/api/albums", json={"title": "TEST_Bulk Album"}, headers=headers).json()["id"]
+        files = [
+            ("files", ("plant-visit.jpg", JPEG_HEADER + b"bulk-1", "image/jpeg")),
+            ("files", ("safety-day.jpg", JPEG_HEADER + b"bulk-2", "image/jpeg")),
+            ("files", ("fake.png", b"<html><script>alert(1)</script></html>", "image/png")),
+            ("files", ("notes.txt", b"not an image", "text/plain")),
+        ]
+        response = requests.post(
+            f"{BASE_URL}/api/photos/bulk",
+            files=files,
+            data={"album_id": album_id, "description": "TEST_Bulk"},
+            headers=headers
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert (data["created"], data["failed"], data["album_title"]) == (2, 2, "TEST_Bulk Album")
+        assert [result["status"] for result in data["results"]] == ["created", "created", "failed", "failed"]
+        assert data["results"][2]["error"] == "Not an image"
+
+        photos = requests.get(f"{BASE_URL}/api/albums/{album_id}/photos").json()
+        assert sorted(photo["title"] for photo in photos) == ["plant-visit", "safety-day"]
+        assert all(photo["description"] == "TEST_Bulk" and "/api/media/" in photo["image_url"] for photo in photos)
+        assert self.photo_count(album_id) == 2
+        print("✓ Bulk upload created 2 photos and rejected 2 files")
+
+        missing = requests.post(f"{BASE_URL}/api/photos/bulk", files=files[:1], data={"album_id": "no-such-album"},
+                                headers=headers)
+        assert missing.status_code == 404
+
+        for photo in photos:
+            requests.delete(f"{BASE_URL}/api/photos/{photo['id']}", headers=headers)
+        requests.delete(f"{BASE_URL}/api/albums/{album_id}", headers=headers)
+
 
 # ===================== HERO SETTINGS TESTS =====================
 
@@ -540,6 +643,13 @@ class TestEvents:
 
 # ===================== FILE UPLOAD TESTS =====================
 
+# Smallest byte sequence that starts and ends like a JPEG
+JPEG_HEADER = bytes([
+    0xFF, 0xD8, 0xFF, 0xE0, 0x00, 0x10, 0x4A, 0x46, 0x49, 0x46, 0x00, 0x01,
+    0x01, 0x00, 0x00, 0x01, 0x00, 0x01, 0x00, 0x00, 0xFF, 0xD9
+])
+
+
 class TestFileUpload:
     """File upload tests"""
     
@@ -560,26 +670,536 @@ class TestFileUpload:
         assert response.status_code == 401
         print("✓ Photo upload requires authentication")
     
-    def test_upload_photo_success(self, admin_token):
-        """Test successful photo upload returns data URL"""
+    def upload(self, admin_token, name, data, content_type):
         import io
-        # Create a minimal valid JPEG header
-        jpeg_header = bytes([
-            0xFF, 0xD8, 0xFF, 0xE0, 0x00, 0x10, 0x4A, 0x46, 0x49, 0x46, 0x00, 0x01,
-            0x01, 0x00, 0x00, 0x01, 0x00, 0x01, 0x00, 0x00, 0xFF, 0xD9
-        ])
-        
-        files = {"file": ("test.jpg", io.BytesIO(jpeg_header), "image/jpeg")}
+        files = {"file": (name, io.BytesIO(data), content_type)}
         response = requests.post(
             f"{BASE_URL}/api/photos/upload",
             files=files,
             headers={"Authorization": f"Bearer {admin_token}"}
         )
         assert response.status_code == 200
+        return response.json()
+    
+    def test_upload_photo_success(self, admin_token):
+        """Test successful photo upload returns a media URL that serves the bytes"""
+        data = self.upload(admin_token, "test.jpg", JPEG_HEADER, "image/jpeg")
+        assert "/api/media/" in data["image_url"]
+        assert data["image_url"].endswith(data["media_id"])
+        
+        response = requests.get(f"{BASE_URL}/api/media/{data['media_id']}")
+        assert response.status_code == 200
+        assert response.content == JPEG_HEADER
+        assert response.headers["Content-Type"] == "image/jpeg"
+        assert response.headers["X-Content-Type-Options"] == "nosniff"
+        print("✓ Photo upload returns a media URL")
+    
+    def test_media_range_and_revalidation(self, admin_token):
+        """Test byte ranges answer 206/416 and a matching If-None-Match answers 304"""
+        media_id = self.upload(admin_token, "test.jpg", JPEG_HEADER, "image/jpeg")["media_id"]
+        url = f"{BASE_URL}/api/media/{media_id}"
+        
+        partial = requests.get(url, headers={"Range": "bytes=0-3"})
+        assert partial.status_code == 206
+        assert partial.content == JPEG_HEADER[:4]
+        assert partial.headers["Content-Range"] == f"bytes 0-3/{len(JPEG_HEADER)}"
+        
+        unsatisfiable = requests.get(url, headers={"Range": f"bytes={len(JPEG_HEADER)}-"})
+        assert unsatisfiable.status_code == 416
+        assert unsatisfiable.headers["Content-Range"] == f"bytes */{len(JPEG_HEADER)}"
+        
+        etag = requests.get(url).headers["ETag"]
+        assert requests.get(url, headers={"If-None-Match": etag}).status_code == 304
+        print("✓ Media ranges and revalidation")
+    
+    def test_html_upload_is_not_served_inline(self, admin_token):
+        """Test uploaded markup claiming to be HTML or SVG is only ever served as a download"""
+        for name, content_type in (("page.html", "text/html"), ("icon.svg", "image/svg+xml")):
+            media_id = self.upload(admin_token, name, b"<svg onload=alert(1)><script>alert(1)</script></svg>", content_type)["media_id"]
+            response = requests.get(f"{BASE_URL}/api/media/{media_id}")
+            assert response.headers["Content-Disposition"] == "attachment"
+            assert response.headers["X-Content-Type-Options"] == "nosniff"
+        print("✓ Markup uploads served as attachments")
+
+
+# ===================== EMPLOYEE DIRECTORY TESTS =====================
+
+class TestEmployeeSearch:
+    """Employee directory search tests"""
+    
+    @pytest.fixture(scope="class")
+    def admin_token(self):
+        response = requests.post(f"{BASE_URL}/api/auth/login", json={
+            "email": "admin@gys.co.id",
+            "password": "admin123"
+        })
+        return response.json()["token"]
+    
+    def test_search_rejects_cursor(self):
+        """Test relevance-ordered search refuses a name-order cursor instead of ignoring it"""
+        response = requests.get(f"{BASE_URL}/api/employees", params={"search": "budi", "cursor": "abc"})
+        assert response.status_code == 400
+        print("✓ Search with cursor rejected")
+    
+    def test_fuzzy_name_match(self, admin_token):
+        """Test that misspelled and old-spelling names still find the employee"""
+        headers = {"Authorization": f"Bearer {admin_token}"}
+        create_response = requests.post(f"{BASE_URL}/api/employees", json={
+            "name": "Boedi Prasetio Fuzzytest",
+            "email": "test_fuzzy@gys.co.id",
+            "department": "IT",
+            "position": "Engineer"
+        }, headers=headers)
+        assert create_response.status_code == 200
+        employee_id = create_response.json()["id"]
+        
+        try:
+            for query in ["budi prasetyo fuzzytest", "Boedi Fuzytest"]:
+                response = requests.get(f"{BASE_URL}/api/employees", params={"search": query})
+                assert response.status_code == 200
+                assert employee_id in [e["id"] for e in response.json()], f"No fuzzy match for {query}"
+                
+                suggest_response = requests.get(f"{BASE_URL}/api/employees/suggest", params={"q": query})
+                assert suggest_response.status_code == 200
+                assert employee_id in [e["id"] for e in suggest_response.json()]
+            
+            response = requests.get(f"{BASE_URL}/api/employees", params={"search": "Boedi Fuzytest", "fuzzy": "false"})
+            assert employee_id not in [e["id"] for e in response.json()]
+            print("✓ Fuzzy employee name matching works")
+        finally:
+            requests.delete(f"{BASE_URL}/api/employees/{employee_id}", headers=headers)
+
+    def test_bulk_import_csv(self, admin_token):
+        """Test CSV import upserts by email and reports invalid rows"""
+        headers = {"Authorization": f"Bearer {admin_token}"}
+        csv_data = (
+            "Name,Email,Department,Position\n"
+            "TEST_Import One,test_import1@gys.co.id,IT,Engineer\n"
+            "TEST_Import Two,test_import2@gys.co.id,HR,\n"
+            "TEST_Import One Renamed,test_import1@gys.co.id,IT,Engineer\n"
+        )
+        response = requests.post(
+            f"{BASE_URL}/api/employees/import",
+            files={"file": ("employees.csv", csv_data, "text/csv")},
+            headers=headers
+        )
+        assert response.status_code == 200
+        report = response.json()
+        assert report["total_rows"] == 3
+        assert report["inserted"] == 1
+        assert sorted(e["row"] for e in report["errors"]) == [2, 3]
+        
+        employees = requests.get(f"{BASE_URL}/api/employees", params={"search": "test_import1@gys.co.id", "fuzzy": "false"}).json()
+        assert [e["name"] for e in employees] == ["TEST_Import One Renamed"]
+        requests.delete(f"{BASE_URL}/api/employees/{employees[0]['id']}", headers=headers)
+        print("✓ Employee CSV import works")
+
+    def test_import_matches_email_case_insensitively(self, admin_token):
+        """Test re-importing an employee with a differently cased email updates instead of duplicating"""
+        headers = {"Authorization": f"Bearer {admin_token}"}
+        created = requests.post(
+            f"{BASE_URL}/api/employees",
+            json={"name": "TEST_Case Employee", "email": "TEST_Case@GYS.co.id", "department": "IT", "position": "Engineer"},
+            headers=headers
+        ).json()
+        # Stored as entered; only matching ignores case
+        assert created["email"] == "TEST_Case@GYS.co.id"
+        assert "email_key" not in created
+        try:
+            csv_data = "Name,Email,Department,Position\nTEST_Case Employee Renamed,Test_Case@gys.CO.ID,IT,Engineer\n"
+            report = requests.post(
+                f"{BASE_URL}/api/employees/import",
+                files={"file": ("employees.csv", csv_data, "text/csv")},
+                headers=headers
+            ).json()
+            assert (report["inserted"], report["updated"]) == (0, 1)
+            employees = requests.get(f"{BASE_URL}/api/employees", params={"search": "test_case", "fuzzy": "false"}).json()
+            assert [(e["id"], e["name"]) for e in employees] == [(created["id"], "TEST_Case Employee Renamed")]
+            assert "email_key" not in employees[0]
+            print("✓ Import matched the existing employee regardless of email case")
+        finally:
+            requests.delete(f"{BASE_URL}/api/employees/{created['id']}", headers=headers)
+
+
+# ===================== EXPORT TESTS =====================
+
+class TestExport:
+    """Streaming export tests"""
+    
+    @pytest.fixture(scope="class")
+    def admin_token(self):
+        response = requests.post(f"{BASE_URL}/api/auth/login", json={
+            "email": "admin@gys.co.id",
+            "password": "admin123"
+        })
+        return response.json()["token"]
+    
+    @pytest.fixture(scope="class")
+    def export_news(self, admin_token):
+        headers = {"Authorization": f"Bearer {admin_token}"}
+        created = []
+        for category in ("test_export_a", "test_export_b"):
+            response = requests.post(f"{BASE_URL}/api/news", json={
+                "title": f"TEST_Export {category}",
+                "summary": "Export summary, with a comma",
+                "content": "<p>Export</p>",
+                "category": category
+            }, headers=headers)
+            assert response.status_code == 200
+            created.append(response.json())
+        yield created
+        for news in created:
+            requests.delete(f"{BASE_URL}/api/news/{news['id']}", headers=headers)
+    
+    def test_export_requires_auth(self):
+        """Test exports are admin-only"""
+        assert requests.get(f"{BASE_URL}/api/export/news").status_code == 401
+        print("✓ Export requires authentication")
+    
+    def test_ndjson_category_filter(self, admin_token, export_news):
+        """Test NDJSON export returns one JSON object per line, filtered like the list view"""
+        response = requests.get(f"{BASE_URL}/api/export/news", params={"category": "test_export_a"},
+                                headers={"Authorization": f"Bearer {admin_token}"})
+        assert response.status_code == 200
+        assert response.headers["Content-Type"].startswith("application/x-ndjson")
+        assert "attachment" in response.headers["Content-Disposition"]
+        rows = [json.loads(line) for line in response.text.splitlines()]
+        assert [row["id"] for row in rows] == [export_news[0]["id"]]
+        assert "_id" not in rows[0]
+        print("✓ NDJSON export filtered by category")
+    
+    def test_csv_shape(self, admin_token, export_news):
+        """Test CSV export has the model's columns as header and quotes cells with commas"""
+        response = requests.get(f"{BASE_URL}/api/export/news", params={"format": "csv", "category": "test_export_b"},
+                                headers={"Authorization": f"Bearer {admin_token}"})
+        assert response.status_code == 200
+        rows = list(csv.reader(io.StringIO(response.text)))
+        header, body = rows[0], rows[1:]
+        assert header[:3] == ["id", "title", "summary"]
+        assert len(body) == 1
+        record = dict(zip(header, body[0]))
+        assert record["id"] == export_news[1]["id"]
+        assert record["summary"] == "Export summary, with a comma"
+        print("✓ CSV export shape")
+    
+    def test_unknown_collection_and_format(self, admin_token):
+        """Test unknown collections 404 and unknown formats 400"""
+        headers = {"Authorization": f"Bearer {admin_token}"}
+        assert requests.get(f"{BASE_URL}/api/export/users", headers=headers).status_code == 404
+        assert requests.get(f"{BASE_URL}/api/export/news", params={"format": "xml"}, headers=headers).status_code == 400
+        print("✓ Export rejects unknown collections and formats")
+
+
+# ===================== RESPONSE CACHE TESTS =====================
+
+class TestResponseCache:
+    """Public GET response cache tests"""
+    
+    @pytest.fixture(scope="class")
+    def admin_token(self):
+        response = requests.post(f"{BASE_URL}/api/auth/login", json={
+            "email": "admin@gys.co.id",
+            "password": "admin123"
+        })
+        return response.json()["token"]
+    
+    def test_cached_list_invalidated_by_write(self, admin_token):
+        """Test a repeated public GET is served from cache and a write makes the change visible"""
+        headers = {"Authorization": f"Bearer {admin_token}"}
+        requests.get(f"{BASE_URL}/api/events", params={"limit": 200})
+        cached = requests.get(f"{BASE_URL}/api/events", params={"limit": 200})
+        assert cached.status_code == 200
+        assert cached.headers.get("X-Cache") == "HIT"
+        
+        create_response = requests.post(f"{BASE_URL}/api/events", json={
+            "title": "TEST_Cache Event",
+            "description": "Cache invalidation check",
+            "event_date": "2026-03-01"
+        }, headers=headers)
+        assert create_response.status_code == 200
+        event_id = create_response.json()["id"]
+        
+        fresh = requests.get(f"{BASE_URL}/api/events", params={"limit": 200})
+        assert event_id in [e["id"] for e in fresh.json()]
+        requests.delete(f"{BASE_URL}/api/events/{event_id}", headers=headers)
+        print("✓ Response cache invalidated on write")
+    
+    def test_cache_stats_admin_only(self, admin_token):
+        """Test cache metrics are exposed to admins"""
+        response = requests.get(f"{BASE_URL}/api/cache/stats", headers={"Authorization": f"Bearer {admin_token}"})
+        assert response.status_code == 200
+        assert {"hits", "misses", "entries", "bytes"} <= set(response.json())
+        assert requests.get(f"{BASE_URL}/api/cache/stats").status_code in [401, 403]
+        print("✓ Cache stats available")
+
+
+# ===================== CONDITIONAL GET TESTS =====================
+
+class TestConditionalGet:
+    """ETag / If-None-Match revalidation tests"""
+    
+    @pytest.fixture(scope="class")
+    def admin_token(self):
+        response = requests.post(f"{BASE_URL}/api/auth/login", json={
+            "email": "admin@gys.co.id",
+            "password": "admin123"
+        })
+        return response.json()["token"]
+    
+    def test_hero_revalidates_with_304(self):
+        """Test an unchanged hero payload is answered with an empty 304"""
+        first = requests.get(f"{BASE_URL}/api/settings/hero")
+        assert first.status_code == 200
+        etag = first.headers.get("ETag")
+        assert etag and etag.startswith('"')
+        
+        repeat = requests.get(f"{BASE_URL}/api/settings/hero", headers={"If-None-Match": etag})
+        assert repeat.status_code == 304
+        assert repeat.content == b""
+        assert repeat.headers.get("ETag") == etag
+        print("✓ Hero settings revalidated with 304")
+    
+    def test_write_changes_etag(self, admin_token):
+        """Test a write invalidates the previous ETag"""
+        headers = {"Authorization": f"Bearer {admin_token}"}
+        etag = requests.get(f"{BASE_URL}/api/news", params={"limit": 5}).headers["ETag"]
+        
+        create_response = requests.post(f"{BASE_URL}/api/news", json={
+            "title": "TEST_ETag News",
+            "summary": "Conditional GET check",
+            "content": "Body"
+        }, headers=headers)
+        assert create_response.status_code == 200
+        news_id = create_response.json()["id"]
+        
+        response = requests.get(f"{BASE_URL}/api/news", params={"limit": 5}, headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.headers["ETag"] != etag
+        requests.delete(f"{BASE_URL}/api/news/{news_id}", headers=headers)
+        print("✓ ETag changes after a write")
+
+
+# ===================== HOMEPAGE BUNDLE TESTS =====================
+
+class TestHomeBundle:
+    """Aggregated homepage endpoint tests"""
+    
+    def test_home_contains_every_section(self):
+        """Test /api/home returns all homepage sections in one document"""
+        response = requests.get(f"{BASE_URL}/api/home")
+        assert response.status_code == 200
         data = response.json()
-        assert "image_url" in data
-        assert data["image_url"].startswith("data:image/jpeg;base64,")
-        print("✓ Photo upload returns base64 data URL")
+        assert {"hero", "ticker", "featured_news", "latest_news", "events", "recent_photos", "directory", "menus"} <= set(data)
+        assert all(item["is_featured"] for item in data["featured_news"])
+        assert len(data["recent_photos"]) <= 8
+        assert response.headers.get("ETag")
+        print(f"✓ Home bundle returned {len(data['latest_news'])} news, {len(data['events'])} events")
+    
+    def test_home_menus_match_menu_tree(self):
+        """Test the bundled menu tree is the visible menu tree"""
+        home = requests.get(f"{BASE_URL}/api/home").json()
+        menus = requests.get(f"{BASE_URL}/api/menus", params={"visible_only": True}).json()
+        assert home["menus"] == menus
+        print("✓ Home menus match visible menu tree")
+
+
+# ===================== MENU TREE TESTS =====================
+
+class TestMenuTree:
+    """Materialized navigation tree tests"""
+    
+    @pytest.fixture(scope="class")
+    def admin_token(self):
+        response = requests.post(f"{BASE_URL}/api/auth/login", json={
+            "email": "admin@gys.co.id",
+            "password": "admin123"
+        })
+        return response.json()["token"]
+    
+    def test_tree_follows_menu_writes(self, admin_token):
+        """Test menu create, hide and delete are reflected in the served tree"""
+        headers = {"Authorization": f"Bearer {admin_token}"}
+        create_response = requests.post(f"{BASE_URL}/api/menus", json={"label": "TEST_Menu", "order": 99}, headers=headers)
+        assert create_response.status_code == 200
+        menu_id = create_response.json()["id"]
+        
+        visible = requests.get(f"{BASE_URL}/api/menus", params={"visible_only": True}, headers=headers).json()
+        assert menu_id in [item["id"] for item in visible]
+        
+        requests.put(f"{BASE_URL}/api/menus/{menu_id}", json={"is_visible": False}, headers=headers)
+        visible = requests.get(f"{BASE_URL}/api/menus", params={"visible_only": True}, headers=headers).json()
+        full = requests.get(f"{BASE_URL}/api/menus", headers=headers).json()
+        assert menu_id not in [item["id"] for item in visible]
+        assert menu_id in [item["id"] for item in full]
+        
+        requests.delete(f"{BASE_URL}/api/menus/{menu_id}", headers=headers)
+        full = requests.get(f"{BASE_URL}/api/menus", headers=headers).json()
+        assert menu_id not in [item["id"] for item in full]
+        print("✓ Menu tree rebuilt after writes")
+
+
+# ===================== CONTENT SNAPSHOT TESTS =====================
+
+class TestContentSnapshot:
+    """Shared read-model snapshot tests"""
+    
+    @pytest.fixture(scope="class")
+    def admin_token(self):
+        response = requests.post(f"{BASE_URL}/api/auth/login", json={
+            "email": "admin@gys.co.id",
+            "password": "admin123"
+        })
+        return response.json()["token"]
+    
+    def test_ticker_write_visible_immediately(self, admin_token):
+        """Test a settings write is never hidden by the snapshot"""
+        headers = {"Authorization": f"Bearer {admin_token}"}
+        original = requests.get(f"{BASE_URL}/api/settings/ticker").json()
+        
+        requests.put(f"{BASE_URL}/api/settings/ticker", json={"badge_text": "TEST_Snapshot"}, headers=headers)
+        assert requests.get(f"{BASE_URL}/api/settings/ticker", headers=headers).json()["badge_text"] == "TEST_Snapshot"
+        assert requests.get(f"{BASE_URL}/api/home", headers=headers).json()["ticker"]["badge_text"] == "TEST_Snapshot"
+        
+        requests.put(f"{BASE_URL}/api/settings/ticker", json={"badge_text": original["badge_text"]}, headers=headers)
+        print("✓ Ticker change visible through the snapshot")
+    
+    def test_snapshot_stats(self, admin_token):
+        """Test snapshot state is reported with the cache stats"""
+        response = requests.get(f"{BASE_URL}/api/cache/stats", headers={"Authorization": f"Bearer {admin_token}"})
+        assert response.status_code == 200
+        assert {"file", "fresh", "hits", "misses"} <= set(response.json()["snapshot"])
+        print("✓ Snapshot stats available")
+
+
+class TestCompression:
+    """Response compression tests"""
+    
+    def test_home_gzip(self):
+        """Test the home bundle is served gzipped with a weak ETag that still revalidates"""
+        response = requests.get(f"{BASE_URL}/api/home", headers={"Accept-Encoding": "gzip"})
+        assert response.status_code == 200
+        assert response.headers.get("Content-Encoding") == "gzip"
+        assert "Accept-Encoding" in response.headers.get("Vary", "")
+        assert response.headers["ETag"].startswith("W/")
+        assert "menus" in response.json()
+        
+        revalidated = requests.get(f"{BASE_URL}/api/home", headers={"Accept-Encoding": "gzip", "If-None-Match": response.headers["ETag"]})
+        assert revalidated.status_code == 304
+        print("✓ Home bundle gzipped and revalidated")
+    
+    def test_identity_when_not_accepted(self):
+        """Test clients that don't accept compression get the plain body"""
+        response = requests.get(f"{BASE_URL}/api/home", headers={"Accept-Encoding": "identity"})
+        assert response.status_code == 200
+        assert "Content-Encoding" not in response.headers
+        assert not response.headers["ETag"].startswith("W/")
+        print("✓ Identity response when compression not accepted")
+
+
+class TestFastSerialization:
+    """Single-validation response path tests"""
+    
+    def test_pages_keep_cursor_and_shape(self):
+        """Test pages served through model_response keep X-Next-Cursor and the full PageResponse shape"""
+        response = requests.get(f"{BASE_URL}/api/pages", params={"limit": 1})
+        assert response.status_code == 200
+        pages = response.json()
+        if pages:
+            assert {"id", "title", "slug", "blocks", "is_published", "created_at", "updated_at"} <= set(pages[0])
+            assert "_id" not in pages[0]
+        if len(requests.get(f"{BASE_URL}/api/pages").json()) > 1:
+            assert response.headers.get("X-Next-Cursor")
+        print("✓ Pages shape and cursor preserved")
+
+
+# ===================== FACET TESTS =====================
+
+class TestFacets:
+    """Facet count tests"""
+    
+    def test_news_facets(self):
+        """Test news category facet counts add up to the total"""
+        response = requests.get(f"{BASE_URL}/api/facets/news")
+        assert response.status_code == 200
+        data = response.json()
+        assert sum(row["count"] for row in data["facets"]["category"]) == data["total"]
+        print(f"✓ News facets: {len(data['facets']['category'])} categories")
+    
+    def test_facets_combine_with_filters(self):
+        """Test that a filter narrows the total but its own facet keeps every value"""
+        all_counts = requests.get(f"{BASE_URL}/api/facets/employees").json()
+        if not all_counts["facets"]["department"]:
+            pytest.skip("No employees")
+        department = all_counts["facets"]["department"][0]
+        filtered = requests.get(f"{BASE_URL}/api/facets/employees", params={"department": department["value"]}).json()
+        assert filtered["total"] == department["count"]
+        assert filtered["facets"]["department"] == all_counts["facets"]["department"]
+        print("✓ Facets combine with filters")
+    
+    def test_facets_reject_unknown(self):
+        """Test unknown collections and filters are rejected"""
+        assert requests.get(f"{BASE_URL}/api/facets/users").status_code == 404
+        assert requests.get(f"{BASE_URL}/api/facets/events", params={"department": "IT"}).status_code == 400
+        print("✓ Unknown facets rejected")
+
+
+# ===================== SITE SEARCH TESTS =====================
+
+class TestSiteSearch:
+    """Cross-collection search tests"""
+    
+    @pytest.fixture(scope="class")
+    def admin_token(self):
+        response = requests.post(f"{BASE_URL}/api/auth/login", json={
+            "email": "admin@gys.co.id",
+            "password": "admin123"
+        })
+        return response.json()["token"]
+    
+    def test_search_finds_page_block_text(self, admin_token):
+        """Test that text inside published page blocks is searchable and unpublished pages are not"""
+        headers = {"Authorization": f"Bearer {admin_token}"}
+        create_response = requests.post(f"{BASE_URL}/api/pages", json={
+            "title": "TEST_Search Page",
+            "slug": "test-search-page",
+            "blocks": [{"type": "text", "content": {"heading": "Visitors", "body": "Quokkaquest helmets are mandatory"}, "order": 0}]
+        }, headers=headers)
+        assert create_response.status_code == 200
+        page_id = create_response.json()["id"]
+        
+        try:
+            response = requests.get(f"{BASE_URL}/api/search", params={"q": "quokkaquest"})
+            assert response.status_code == 200
+            data = response.json()
+            pages = [g for g in data["groups"] if g["type"] == "pages"]
+            assert pages and pages[0]["results"][0]["id"] == page_id
+            assert "<mark>Quokkaquest</mark>" in pages[0]["results"][0]["snippet"]
+            
+            requests.put(f"{BASE_URL}/api/pages/{page_id}", json={"is_published": False}, headers=headers)
+            response = requests.get(f"{BASE_URL}/api/search", params={"q": "quokkaquest"})
+            assert response.json()["total"] == 0
+            print("✓ Page block text is searchable")
+        finally:
+            requests.delete(f"{BASE_URL}/api/pages/{page_id}", headers=headers)
+    
+    def test_index_consistency_check(self, admin_token):
+        """Test that derived indexes agree with the database after writes"""
+        headers = {"Authorization": f"Bearer {admin_token}"}
+        response = requests.get(f"{BASE_URL}/api/indexes/check", headers=headers)
+        assert response.status_code == 200
+        data = response.json()
+        assert set(data["checks"]) >= {"site_search", "employee_index", "album_titles", "photo_counts", "email_keys"}
+        assert data["ok"], f"Index drift: {data['checks']}"
+        
+        no_auth = requests.get(f"{BASE_URL}/api/indexes/check")
+        assert no_auth.status_code in [401, 403]
+        print("✓ Index consistency check passes")
+    
+    def test_search_unknown_type_rejected(self):
+        """Test that an unknown type filter returns 400"""
+        response = requests.get(f"{BASE_URL}/api/search", params={"q": "steel", "types": "bogus"})
+        assert response.status_code == 400
+        print("✓ Unknown search type rejected")
 
 
 # ===================== CLEANUP =====================
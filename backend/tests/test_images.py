@@ -0,0 +1,105 @@
+"""
+Image variant tests
+- Width-only and height-only variants keep the aspect ratio
+- Format-only variants keep the source size and are only transcoded
+- Invalid parameter combinations are rejected before anything is rendered
+- The derivative cache only counts and evicts the variants it rendered
+Runs without a database or server.
+"""
+import pytest
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "test_images")
+
+from PIL import Image
+from services.images import DerivativeCache, VariantError, normalize_variant, variant_key, _render
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / "source.png"
+    Image.new("RGB", (800, 400), (200, 30, 30)).save(path, "PNG")
+    return str(path)
+
+
+def render(source, tmp_path, w=None, h=None, fit=None, fmt=None):
+    width, height, fit, fmt = normalize_variant(w, h, fit, fmt)
+    dest = str(tmp_path / f"variant.{fmt}")
+    _render(source, dest, width, height, fit, fmt)
+    with Image.open(dest) as img:
+        return img.size, img.format
+
+
+class TestImageVariants:
+    """On-the-fly image variant tests"""
+
+    def test_width_only(self, source, tmp_path):
+        """Test a width-only variant scales the height proportionally"""
+        assert render(source, tmp_path, w=200) == ((200, 100), "WEBP")
+        print("✓ Width-only variant keeps aspect ratio")
+
+    def test_height_only(self, source, tmp_path):
+        """Test a height-only variant scales the width proportionally"""
+        assert render(source, tmp_path, h=50, fmt="png") == ((100, 50), "PNG")
+        print("✓ Height-only variant keeps aspect ratio")
+
+    def test_box_cover(self, source, tmp_path):
+        """Test cover crops to the exact box"""
+        assert render(source, tmp_path, w=100, h=100, fit="cover", fmt="jpeg") == ((100, 100), "JPEG")
+        print("✓ Cover variant fills the box")
+
+    @pytest.mark.parametrize("fmt,expected", [("webp", "WEBP"), ("jpeg", "JPEG")])
+    def test_format_only(self, source, tmp_path, fmt, expected):
+        """Test a format-only variant is transcoded at the source size"""
+        assert render(source, tmp_path, fmt=fmt) == ((800, 400), expected)
+        print(f"✓ {fmt}-only variant transcoded at source size")
+
+    @pytest.mark.parametrize("params", [
+        {"fit": "cover"},
+        {"fit": "contain"},
+        {"w": 0},
+        {"h": 5000},
+        {"w": 100, "fit": "stretch"},
+        {"w": 100, "fmt": "gif"},
+    ])
+    def test_bad_params(self, params):
+        """Test invalid sizes, fits, formats and dimensionless fits are rejected"""
+        with pytest.raises(VariantError):
+            normalize_variant(params.get("w"), params.get("h"), params.get("fit"), params.get("fmt"))
+        print(f"✓ Rejected {params}")
+
+
+class TestDerivativeCache:
+    """Derivative cache ownership tests"""
+
+    def write(self, path, size):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(b"x" * size)
+        return path
+
+    def test_load_ignores_files_it_does_not_own(self, tmp_path):
+        """Test originals, in-flight temp files and stray files are neither counted nor evicted"""
+        first = variant_key("ab" * 32, 200, None, "contain", "webp")
+        second = variant_key("cd" * 32, None, None, "cover", "jpeg")
+        self.write(tmp_path / first[:2] / first, 100)
+        self.write(tmp_path / second[:2] / second, 100)
+        original = self.write(tmp_path / "originals" / ("ef" * 32), 5000)
+        in_flight = self.write(tmp_path / "ab" / "tmpk3j2l1.tmp", 5000)
+        stray = self.write(tmp_path / "ab" / "notes.txt", 5000)
+
+        cache = DerivativeCache(str(tmp_path), max_bytes=250)
+        assert cache.get(first) is not None
+        assert set(cache.entries) == {first, second}
+        assert cache.total_bytes == 200
+
+        # Over budget: only the least recently used variant goes
+        third = variant_key("12" * 32, 100, 100, "cover", "png")
+        self.write(tmp_path / third[:2] / third, 100)
+        cache.add(third, 100)
+        assert set(cache.entries) == {first, third}
+        assert not (tmp_path / second[:2] / second).exists()
+        assert original.exists() and in_flight.exists() and stray.exists()
+        print("✓ Cache seeded and evicted only its own variants")
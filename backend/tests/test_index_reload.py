@@ -0,0 +1,116 @@
+"""
+In-memory index reload tests
+- Changes delivered while a load is scanning Mongo survive the swap to the new index
+- A failed load leaves the live index serving and stops buffering
+Runs without a database or server.
+"""
+import pytest
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "test_index_reload")
+
+import services.employee_index as employee_module
+import services.site_search as site_module
+from services.changes import ChangeEvent
+from services.employee_index import EmployeeIndex
+from services.site_search import SiteSearchIndex
+
+BUDI = {"id": "e1", "name": "Budi Santoso", "email": "budi@gys.co.id", "position": "Engineer", "department": "IT"}
+SITI = {"id": "e2", "name": "Siti Rahayu", "email": "siti@gys.co.id", "position": "Manager", "department": "HR"}
+
+
+class FakeCollection:
+    # Yields control to the event loop between documents, as a Motor cursor does between batches
+    def __init__(self, docs, during_scan=None, fail=False):
+        self.docs = docs
+        self.during_scan = during_scan
+        self.fail = fail
+
+    def find(self, query, projection=None):
+        return self
+
+    def batch_size(self, size):
+        return self
+
+    async def __aiter__(self):
+        for position, doc in enumerate(self.docs):
+            yield dict(doc)
+            if position == 0 and self.during_scan:
+                await self.during_scan()
+            await asyncio.sleep(0)
+        if self.fail:
+            raise ConnectionError("connection reset")
+
+
+class FakeDb:
+    # Only employees hold documents; every other collection is empty
+    def __init__(self, employees, during_scan=None, fail=False):
+        self.employees = FakeCollection(employees, during_scan, fail)
+
+    def __getattr__(self, name):
+        return FakeCollection([])
+
+
+@pytest.fixture
+def use_db(monkeypatch):
+    def install(fake):
+        monkeypatch.setattr(employee_module, "db", fake)
+        monkeypatch.setattr(site_module, "db", fake)
+    return install
+
+
+class TestEmployeeIndexReload:
+    """Employee suggest index reload tests"""
+
+    def test_changes_during_load_survive(self, use_db):
+        """Test a rename and a delete delivered mid-scan are in the loaded index"""
+        index = EmployeeIndex()
+
+        async def concurrent_writes():
+            index.apply_changes([
+                ChangeEvent("employees", "update", "e1", {**BUDI, "name": "Budi Hartono"}, remote=True),
+                ChangeEvent("employees", "delete", "e2", remote=True),
+            ])
+
+        use_db(FakeDb([BUDI, SITI], concurrent_writes))
+        asyncio.run(index.load())
+        assert [record["name"] for record in index.suggest("budi")] == ["Budi Hartono"]
+        assert index.suggest("siti") == []
+        assert index.pending is None
+        print("✓ Mid-load employee changes kept")
+
+    def test_failed_load_keeps_serving(self, use_db):
+        """Test a load that dies mid-scan leaves the previous index and stops buffering"""
+        index = EmployeeIndex()
+        index.upsert(SITI)
+        index.loaded = True
+        use_db(FakeDb([BUDI], fail=True))
+        with pytest.raises(ConnectionError):
+            asyncio.run(index.load())
+        assert [record["id"] for record in index.suggest("siti")] == ["e2"]
+        assert index.pending is None
+        print("✓ Failed load left the live index in place")
+
+
+class TestSiteSearchReload:
+    """Site search index reload tests"""
+
+    def test_changes_during_load_survive(self, use_db):
+        """Test an insert delivered mid-scan is searchable after the swap"""
+        index = SiteSearchIndex()
+
+        async def concurrent_writes():
+            index.apply_changes([ChangeEvent("employees", "insert", "e3", {
+                "id": "e3", "name": "Dewi Lestari", "email": "dewi@gys.co.id", "position": "Analyst", "department": "Finance",
+            }, remote=True)])
+
+        use_db(FakeDb([BUDI, SITI], concurrent_writes))
+        asyncio.run(index.load())
+        assert ("employees", "e3") in index.docnos
+        assert {("employees", "e1"), ("employees", "e2")} <= set(index.docnos)
+        assert index.pending is None
+        print("✓ Mid-load site search change kept")
@@ -0,0 +1,86 @@
+"""
+Cross-worker invalidation bus tests
+- A change published by one process reaches another process's subscribers with the document re-read
+- A process ignores its own broadcasts
+- Change streams are used on a replica set; capped-collection tailing works everywhere
+Requires a reachable MongoDB (MONGO_URL); the change stream test needs a replica set
+(e.g. a single-node `mongod --replSet rs0` after `rs.initiate()`). Uses a throwaway database.
+"""
+import pytest
+import asyncio
+import os
+import sys
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+MONGO_URL = os.environ.get('MONGO_URL')
+
+pytestmark = pytest.mark.skipif(not MONGO_URL, reason="MONGO_URL not set")
+
+
+async def wait_for(condition, timeout=10.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        if asyncio.get_running_loop().time() > deadline:
+            return False
+        await asyncio.sleep(0.05)
+    return True
+
+
+async def deliver_between_processes(mode, monkeypatch):
+    from motor.motor_asyncio import AsyncIOMotorClient
+    import services.changes as changes
+    import services.invalidation as invalidation
+    import services.versions as versions
+
+    client = AsyncIOMotorClient(MONGO_URL)
+    if mode == "change_stream":
+        hello = await client.admin.command("hello")
+        if not hello.get("setName"):
+            client.close()
+            pytest.skip("MongoDB is not a replica set")
+    test_db = client[f"test_invalidation_{uuid.uuid4().hex[:8]}"]
+    for module in (changes, invalidation, versions):
+        monkeypatch.setattr(module, "db", test_db)
+
+    writer, reader = changes.ChangeBus(), changes.ChangeBus()
+    written, received = [], []
+    writer.subscribe(["menus"])(written.extend)
+    reader.subscribe(["menus"])(received.extend)
+    writer_listener, reader_listener = invalidation.InvalidationListener(mode), invalidation.InvalidationListener(mode)
+    try:
+        await invalidation.ensure_log()
+        writer_listener.start(writer)
+        reader_listener.start(reader)
+        await asyncio.sleep(1.5)
+
+        await test_db.menus.insert_one({"id": "menu-1", "label": "Home", "order": 0})
+        await writer.publish([changes.ChangeEvent("menus", "insert", "menu-1", {"id": "menu-1", "label": "Home"})])
+        assert await wait_for(lambda: received), reader_listener.snapshot()
+
+        event = received[0]
+        assert event.remote and event.op == "insert" and event.id == "menu-1"
+        assert event.doc["label"] == "Home"
+        assert await wait_for(lambda: writer_listener.stats["own"] >= 1)
+        assert len(written) == 1, "the writer must not re-apply its own broadcast"
+        return reader_listener.snapshot()
+    finally:
+        await writer_listener.stop()
+        await reader_listener.stop()
+        await client.drop_database(test_db.name)
+        client.close()
+
+
+class TestInvalidationBus:
+    """Changes written by one worker must reach the in-process caches of the others"""
+
+    def test_tailing_fallback(self, monkeypatch):
+        snapshot = asyncio.run(deliver_between_processes("tail", monkeypatch))
+        assert snapshot["mode"] == "tail" and snapshot["received"] == 1
+        print(f"✓ Tailing delivered the change in {snapshot['last_lag_ms']} ms")
+
+    def test_change_stream(self, monkeypatch):
+        snapshot = asyncio.run(deliver_between_processes("change_stream", monkeypatch))
+        assert snapshot["mode"] == "change_stream" and snapshot["received"] == 1
+        print(f"✓ Change stream delivered the change in {snapshot['last_lag_ms']} ms")
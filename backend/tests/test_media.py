@@ -0,0 +1,72 @@
+"""
+Media store unit tests
+- Range header parsing for 206/416 responses
+- Stored content types come from the bytes for images, and only raster images are served inline
+Runs without a database or server.
+"""
+import pytest
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "test_media")
+
+from services.media import parse_range, serving_headers, sniff_content_type, stored_content_type
+
+
+class TestParseRange:
+    """Range header parsing tests"""
+
+    @pytest.mark.parametrize("header,expected", [
+        (None, None),
+        ("bytes=0-99", (0, 99)),
+        ("bytes=100-", (100, 999)),
+        ("bytes=-100", (900, 999)),
+        ("bytes=-5000", (0, 999)),
+        ("bytes=900-5000", (900, 999)),
+        ("bytes=0-1,5-9", None),
+        ("items=0-9", None),
+    ])
+    def test_satisfiable(self, header, expected):
+        """Test single ranges, suffix ranges and clamping; multipart and other units fall back to 200"""
+        assert parse_range(header, 1000) == expected
+        print(f"✓ {header!r} -> {expected}")
+
+    @pytest.mark.parametrize("header", ["bytes=1000-", "bytes=500-100", "bytes=-"])
+    def test_unsatisfiable(self, header):
+        """Test ranges past the end or inverted raise for a 416"""
+        with pytest.raises(ValueError):
+            parse_range(header, 1000)
+        print(f"✓ {header!r} unsatisfiable")
+
+
+class TestContentTypes:
+    """Upload content-type tests"""
+
+    def test_sniffed_images(self):
+        """Test raster images are recognised from their first bytes"""
+        assert sniff_content_type(b"\xff\xd8\xff\xe0\x00\x10JFIF") == "image/jpeg"
+        assert sniff_content_type(b"\x89PNG\r\n\x1a\n\x00\x00") == "image/png"
+        assert sniff_content_type(b"GIF89a\x01\x00") == "image/gif"
+        assert sniff_content_type(b"RIFF\x00\x00\x00\x00WEBPVP8 ") == "image/webp"
+        assert sniff_content_type(b"<html><script>") is None
+        print("✓ Image signatures recognised")
+
+    def test_bytes_override_claimed_type(self):
+        """Test the stored type follows the bytes, not the client, for images"""
+        assert stored_content_type(b"\x89PNG\r\n\x1a\n", "text/html") == "image/png"
+        assert stored_content_type(b"<svg/>", "image/svg+xml; charset=utf-8") == "image/svg+xml"
+        assert stored_content_type(b"", None) == "application/octet-stream"
+        assert stored_content_type(b"<html><script>", "image/png") == "application/octet-stream"
+        assert stored_content_type(b"<html><script>", "IMAGE/JPEG; q=1") == "application/octet-stream"
+        print("✓ Stored type follows the bytes")
+
+    def test_only_raster_images_inline(self):
+        """Test markup types are served as sandboxed downloads and everything gets nosniff"""
+        assert serving_headers("image/jpeg") == {"X-Content-Type-Options": "nosniff"}
+        for content_type in ("text/html", "image/svg+xml", "application/octet-stream"):
+            headers = serving_headers(content_type)
+            assert headers["Content-Disposition"] == "attachment"
+            assert headers["X-Content-Type-Options"] == "nosniff"
+        print("✓ Only raster images served inline")
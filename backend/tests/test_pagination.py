@@ -0,0 +1,56 @@
+"""
+Keyset pagination unit tests
+- Cursors round-trip the sort values of the last row
+- Tampered cursors are rejected with a 400 instead of reaching the query
+Runs without a database or server.
+"""
+import pytest
+import base64
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import HTTPException
+from services.pagination import apply_cursor, decode_cursor, encode_cursor
+
+SORT = [("created_at", -1), ("id", -1)]
+
+
+def raw_cursor(values) -> str:
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode().rstrip("=")
+
+
+class TestCursor:
+    """Cursor encoding tests"""
+
+    def test_round_trip(self):
+        """Test a cursor decodes back to the values it was built from"""
+        values = ["2026-01-01T00:00:00+00:00", "abc"]
+        assert decode_cursor(encode_cursor(values), SORT) == values
+        print("✓ Cursor round-trips")
+
+    def test_keyset_filter(self):
+        """Test the cursor becomes a strict keyset condition honouring each direction"""
+        query = apply_cursor({"album_id": "a1"}, SORT, encode_cursor(["2026", "p9"]))
+        assert query == {"$and": [{"album_id": "a1"}, {"$or": [
+            {"created_at": {"$lt": "2026"}},
+            {"created_at": "2026", "id": {"$lt": "p9"}},
+        ]}]}
+        print("✓ Keyset filter built")
+
+    @pytest.mark.parametrize("cursor", [
+        "not-base64-json!",
+        raw_cursor({"created_at": "2026"}),
+        raw_cursor(["2026"]),
+        raw_cursor([{"$ne": None}, "p9"]),
+        raw_cursor(["2026", {"$gt": ""}]),
+        raw_cursor([["2026"], "p9"]),
+    ])
+    def test_rejects_tampered_cursor(self, cursor):
+        """Test malformed cursors and cursors carrying objects or arrays answer 400"""
+        with pytest.raises(HTTPException) as excinfo:
+            decode_cursor(cursor, SORT)
+        assert excinfo.value.status_code == 400
+        print("✓ Tampered cursor rejected")
@@ -0,0 +1,81 @@
+"""
+Query-count regression test for GET /api/photos
+- Album titles are resolved in one batched query, not one query per photo
+- Database commands per request stay constant as the page size grows
+Requires a reachable MongoDB (MONGO_URL); uses a throwaway database.
+"""
+import pytest
+import asyncio
+import os
+import sys
+import uuid
+from datetime import datetime, timezone
+from fastapi import Response
+from pymongo import monitoring
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+MONGO_URL = os.environ.get('MONGO_URL')
+
+pytestmark = pytest.mark.skipif(not MONGO_URL, reason="MONGO_URL not set")
+
+
+class CommandCounter(monitoring.CommandListener):
+    def __init__(self):
+        self.commands = []
+
+    def started(self, event):
+        self.commands.append(event.command_name)
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
+async def count_commands_for_page(page_size, monkeypatch):
+    from motor.motor_asyncio import AsyncIOMotorClient
+    import routes.photos as photos_routes
+    import services.albums as album_service
+
+    counter = CommandCounter()
+    client = AsyncIOMotorClient(MONGO_URL, event_listeners=[counter])
+    test_db = client[f"test_photos_{uuid.uuid4().hex[:8]}"]
+    monkeypatch.setattr(photos_routes, "db", test_db)
+    monkeypatch.setattr(album_service, "db", test_db)
+    album_service.invalidate_album_title()
+    try:
+        now = datetime.now(timezone.utc).isoformat()
+        albums = [{"id": str(uuid.uuid4()), "title": f"Album {i}", "created_at": now} for i in range(page_size)]
+        await test_db.albums.insert_many(albums)
+        await test_db.photos.insert_many([
+            {"id": str(uuid.uuid4()), "title": f"Photo {i}", "image_url": "https://example.com/p.jpg",
+             "album_id": albums[i]["id"], "created_at": now}
+            for i in range(page_size)
+        ])
+
+        counter.commands.clear()
+        photos = await photos_routes.get_photos(Response(), limit=page_size)
+        assert len(photos) == page_size
+        assert all(p.album_title for p in photos)
+        cold = [c for c in counter.commands if c in ("find", "aggregate", "getMore")]
+
+        counter.commands.clear()
+        await photos_routes.get_photos(Response(), limit=page_size)
+        warm = [c for c in counter.commands if c in ("find", "aggregate", "getMore")]
+        return cold, warm
+    finally:
+        await client.drop_database(test_db.name)
+        client.close()
+
+
+class TestPhotosQueryCount:
+    """GET /api/photos must not issue one album lookup per photo"""
+
+    def test_command_count_constant_across_page_sizes(self, monkeypatch):
+        small_cold, small_warm = asyncio.run(count_commands_for_page(5, monkeypatch))
+        large_cold, large_warm = asyncio.run(count_commands_for_page(50, monkeypatch))
+        assert len(small_cold) == len(large_cold) == 2, f"{small_cold} vs {large_cold}"
+        assert len(small_warm) == len(large_warm) == 1, f"{small_warm} vs {large_warm}"
+        print(f"✓ {len(large_cold)} commands cold, {len(large_warm)} warm at 5 and 50 photos")
@@ -4,11 +4,13 @@ import { Search, Mail, Phone, Building2, User } from 'lucide-react';
 import { Input } from '../../components/ui/input';
 import { Select, SelectContent, SelectItem, SelectTrigger, SelectValue } from '../../components/ui/select';
 import { apiService } from '../../lib/api';
+import { useHomeSection } from '../../context/HomeDataContext';
 
 export const DirectorySection = () => {
   const [employees, setEmployees] = useState([]);
   const [filteredEmployees, setFilteredEmployees] = useState([]);
   const [loading, setLoading] = useState(true);
+  const loadHome = useHomeSection();
   const [searchQuery, setSearchQuery] = useState('');
   const [selectedDepartment, setSelectedDepartment] = useState('all');
   const [departments, setDepartments] = useState([]);
@@ -16,7 +18,7 @@ export const DirectorySection = () => {
   useEffect(() => {
     const fetchEmployees = async () => {
       try {
-        const response = await apiService.getEmployees({ limit: 100 });
+        const response = await loadHome((home) => home.directory, () => apiService.getEmployees({ limit: 100 }));
         setEmployees(response.data);
         setFilteredEmployees(response.data);
         
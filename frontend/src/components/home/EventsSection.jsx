@@ -9,6 +9,7 @@ import { Select, SelectContent, SelectItem, SelectTrigger, SelectValue } from '.
 import { apiService } from '../../lib/api';
 import { format, parseISO, isSameDay } from 'date-fns';
 import { useAuth } from '../../context/AuthContext';
+import { useHomeSection } from '../../context/HomeDataContext';
 
 export const EventsSection = () => {
   const [events, setEvents] = useState([]);
@@ -23,14 +24,15 @@ export const EventsSection = () => {
     location: '',
   });
   const { user } = useAuth();
+  const loadHome = useHomeSection();
 
   useEffect(() => {
-    fetchEvents();
+    fetchEvents(() => loadHome((home) => home.events, () => apiService.getEvents({ limit: 50 })));
   }, []);
 
-  const fetchEvents = async () => {
+  const fetchEvents = async (load = () => apiService.getEvents({ limit: 50 })) => {
     try {
-      const response = await apiService.getEvents({ limit: 50 });
+      const response = await load();
       setEvents(response.data);
     } catch (error) {
       console.error('Error fetching events:', error);
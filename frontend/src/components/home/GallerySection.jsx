@@ -2,17 +2,19 @@ import React, { useState, useEffect } from 'react';
 import { motion, AnimatePresence } from 'framer-motion';
 import { X, ZoomIn, ChevronLeft, ChevronRight } from 'lucide-react';
 import { apiService } from '../../lib/api';
+import { useHomeSection } from '../../context/HomeDataContext';
 
 export const GallerySection = () => {
   const [photos, setPhotos] = useState([]);
   const [loading, setLoading] = useState(true);
+  const loadHome = useHomeSection();
   const [selectedPhoto, setSelectedPhoto] = useState(null);
   const [selectedIndex, setSelectedIndex] = useState(0);
 
   useEffect(() => {
     const fetchPhotos = async () => {
       try {
-        const response = await apiService.getPhotos({ limit: 8 });
+        const response = await loadHome((home) => home.recent_photos, () => apiService.getPhotos({ limit: 8, fields: 'title,description,image_url' }));
         setPhotos(response.data);
       } catch (error) {
         console.error('Error fetching photos:', error);
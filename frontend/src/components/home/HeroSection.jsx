@@ -2,6 +2,7 @@ import React, { useEffect, useState, useRef } from 'react';
 import { motion, useScroll, useTransform } from 'framer-motion';
 import { Factory, Shield, Users, TrendingUp, Volume2, VolumeX } from 'lucide-react';
 import { apiService } from '../../lib/api';
+import { useHomeSection } from '../../context/HomeDataContext';
 
 const stats = [
   {
@@ -78,6 +79,7 @@ export const HeroSection = () => {
     show_welcome_badge: true,
   });
   const { scrollY } = useScroll();
+  const loadHome = useHomeSection();
   
   // Parallax transforms based on scroll
   const backgroundY = useTransform(scrollY, [0, 500], [0, 150]);
@@ -88,7 +90,7 @@ export const HeroSection = () => {
   useEffect(() => {
     const fetchSettings = async () => {
       try {
-        const response = await apiService.getHeroSettings();
+        const response = await loadHome((home) => home.hero, apiService.getHeroSettings);
         const data = response.data;
         setHeroSettings(data);
         setIsMuted(data.video_muted !== false);
@@ -3,16 +3,18 @@ import { motion } from 'framer-motion';
 import { ArrowRight } from 'lucide-react';
 import { Link } from 'react-router-dom';
 import { apiService } from '../../lib/api';
+import { useHomeSection } from '../../context/HomeDataContext';
 import { format } from 'date-fns';
 
 export const NewsSection = () => {
   const [news, setNews] = useState([]);
   const [loading, setLoading] = useState(true);
+  const loadHome = useHomeSection();
 
   useEffect(() => {
     const fetchNews = async () => {
       try {
-        const response = await apiService.getNews({ limit: 20 });
+        const response = await loadHome((home) => home.latest_news, () => apiService.getNews({ limit: 20, view: 'summary' }));
         setNews(response.data);
       } catch (error) {
         console.error('Error fetching news:', error);
@@ -2,6 +2,7 @@ import React, { useState, useEffect } from 'react';
 import { motion, AnimatePresence } from 'framer-motion';
 import { Sparkles, X, Bell, Megaphone, Zap, Info, AlertCircle, Radio } from 'lucide-react';
 import { apiService } from '../../lib/api';
+import { useHomeSection } from '../../context/HomeDataContext';
 
 const ICONS = {
   sparkles: Sparkles,
@@ -24,13 +25,14 @@ export const StickyNewsBanner = () => {
   });
   const [isVisible, setIsVisible] = useState(false);
   const [isDismissed, setIsDismissed] = useState(false);
+  const loadHome = useHomeSection();
 
   useEffect(() => {
     const fetchData = async () => {
       try {
         const [newsRes, tickerRes] = await Promise.all([
-          apiService.getNews({ limit: 5 }),
-          apiService.getTickerSettings(),
+          loadHome((home) => home.latest_news.slice(0, 5), () => apiService.getNews({ limit: 5, fields: 'title' })),
+          loadHome((home) => home.ticker, apiService.getTickerSettings),
         ]);
         setNews(newsRes.data);
         setTickerSettings(tickerRes.data);
@@ -3,6 +3,7 @@ import { Link, useLocation } from 'react-router-dom';
 import { motion, AnimatePresence } from 'framer-motion';
 import { Menu, X, ChevronDown, Building2, FileText, Users, MessageSquare } from 'lucide-react';
 import { apiService } from '../../lib/api';
+import { useHomeSection } from '../../context/HomeDataContext';
 import { Level2Item, MobileSection } from './NavParts';
 
 var ICONS = { 'building': Building2, 'file-text': FileText, 'users': Users, 'message-square': MessageSquare };
@@ -13,6 +14,7 @@ export function Header() {
   var [activeDD, setActiveDD] = useState(null);
   var [items, setItems] = useState([]);
   var loc = useLocation();
+  var loadHome = useHomeSection();
 
   useEffect(function() {
     function onScroll() { setIsScrolled(window.scrollY > 20); }
@@ -23,7 +25,7 @@ export function Header() {
   useEffect(function() { setMobileOpen(false); setActiveDD(null); }, [loc]);
 
   useEffect(function() {
-    apiService.getMenus({ visible_only: true }).then(function(r) { setItems(r.data); }).catch(function() {});
+    loadHome(function(home) { return home.menus; }, function() { return apiService.getMenus({ visible_only: true }); }).then(function(r) { setItems(r.data); }).catch(function() {});
   }, []);
 
   var hdrCls = 'fixed top-0 left-0 right-0 z-50 transition-all duration-300 ';
@@ -0,0 +1,21 @@
+import React, { createContext, useContext, useState } from 'react';
+import { apiService } from '../lib/api';
+
+const HomeDataContext = createContext(null);
+
+// The homepage loads /api/home once and every section reads its slice from that single response
+export const HomeDataProvider = ({ children }) => {
+  const [home] = useState(() => apiService.getHome().then((response) => response.data));
+
+  return (
+    <HomeDataContext.Provider value={home}>
+      {children}
+    </HomeDataContext.Provider>
+  );
+};
+
+// Resolves like an axios response; outside the homepage, or if /api/home fails, the section's own request is used
+export const useHomeSection = () => {
+  const home = useContext(HomeDataContext);
+  return (select, fallback) => (home ? home.then((data) => ({ data: select(data) }), fallback) : fallback());
+};
@@ -47,6 +47,9 @@ export const apiService = {
   uploadPhoto: (formData) => api.post('/photos/upload', formData, {
     headers: { 'Content-Type': 'multipart/form-data' },
   }),
+  bulkUploadPhotos: (formData) => api.post('/photos/bulk', formData, {
+    headers: { 'Content-Type': 'multipart/form-data' },
+  }),
   updatePhoto: (id, data) => api.put(`/photos/${id}`, data),
   deletePhoto: (id) => api.delete(`/photos/${id}`),
 
@@ -60,10 +63,15 @@ export const apiService = {
 
   // Employees
   getEmployees: (params) => api.get('/employees', { params }),
+  suggestEmployees: (q, limit = 8) => api.get('/employees/suggest', { params: { q, limit } }),
   getEmployeeById: (id) => api.get(`/employees/${id}`),
   createEmployee: (data) => api.post('/employees', data),
   updateEmployee: (id, data) => api.put(`/employees/${id}`, data),
   deleteEmployee: (id) => api.delete(`/employees/${id}`),
+  importEmployees: (formData, params) => api.post('/employees/import', formData, {
+    params,
+    headers: { 'Content-Type': 'multipart/form-data' },
+  }),
 
   // Users (Admin only)
   getUsers: () => api.get('/users'),
@@ -96,6 +104,15 @@ export const apiService = {
   deleteMenuItem: (id) => api.delete(`/menus/${id}`),
   reorderMenus: (items) => api.put('/menus/reorder', { items }),
 
+  // Facet counts (news, photos, events, employees)
+  getFacets: (collection, params) => api.get(`/facets/${collection}`, { params }),
+
+  // Site search
+  search: (q, params) => api.get('/search', { params: { q, ...params } }),
+
+  // Homepage bundle (hero, ticker, news, events, photos, directory, menus)
+  getHome: () => api.get('/home'),
+
   // Templates
   getTemplates: () => api.get('/templates'),
 
@@ -9,6 +9,7 @@ import { ServicesHub } from '../components/home/ServicesHub';
 import { DirectorySection } from '../components/home/DirectorySection';
 import { StickyNewsBanner } from '../components/home/StickyNewsBanner';
 import { apiService } from '../lib/api';
+import { HomeDataProvider } from '../context/HomeDataContext';
 
 export const HomePage = () => {
   useEffect(() => {
@@ -24,19 +25,21 @@ export const HomePage = () => {
   }, []);
 
   return (
-    <div className="min-h-screen bg-white" data-testid="home-page">
-      <Header />
-      <main>
-        <HeroSection />
-        <NewsSection />
-        <EventsSection />
-        <GallerySection />
-        <ServicesHub />
-        <DirectorySection />
-      </main>
-      <Footer />
-      <StickyNewsBanner />
-    </div>
+    <HomeDataProvider>
+      <div className="min-h-screen bg-white" data-testid="home-page">
+        <Header />
+        <main>
+          <HeroSection />
+          <NewsSection />
+          <EventsSection />
+          <GallerySection />
+          <ServicesHub />
+          <DirectorySection />
+        </main>
+        <Footer />
+        <StickyNewsBanner />
+      </div>
+    </HomeDataProvider>
   );
 };
 